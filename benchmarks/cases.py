@@ -0,0 +1,130 @@
+import importlib
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+from decimal import Decimal, localcontext
+from functools import partial
+from calculator.calculation import Calculation
+from calculator.calculations import FLUSH_THRESHOLD, Calculations
+from calculator.calculator import Calculator
+from calculator.commands import AddCommand, DivideCommand, MultiplyCommand
+from calculator.operations import add, subtract
+
+# History sizes and Decimal precisions the scaling benchmarks cover
+HISTORY_SIZES = (1_000, 10_000, 100_000)
+PRECISIONS = (10, 28, 100)
+# History size for the logged append benchmark, which writes every entry to disk
+LOGGED_HISTORY_SIZE = 1_000
+
+def fill_history(size: int):
+    """Reset the shared history and fill it with alternating add/subtract calculations."""
+    Calculations.configure()
+    Calculations.clear_history()
+    for value in range(size):
+        operation = add if value % 2 else subtract
+        Calculations.add_calculation(Calculation(Decimal(value), Decimal('1'), operation))
+    Calculations.get_history()  # Merge the queued tail now rather than in the first timed flush
+
+def bench_compute():
+    calc = Calculator()
+    a, b = Decimal('12.5'), Decimal('3.25')
+    # A fresh command per call, since a command keeps its result after the first execution;
+    # clearing avoids growing calc.history without bound while timing
+    return lambda: (calc.compute(MultiplyCommand(a, b)), calc.history.clear())
+
+def bench_add_calculation(size):
+    def setup():
+        calc = Calculation(Decimal('1'), Decimal('2'), add)
+
+        def run():
+            # A full queue per call: every enqueue plus the flush that merges them into the history
+            for _ in range(FLUSH_THRESHOLD):
+                Calculations.add_calculation(calc)
+        # Refilled before each run, so the history stays near `size` instead of growing while timed
+        return run, partial(fill_history, size)
+    return setup
+
+@contextmanager
+def bench_add_calculation_logged():
+    with tempfile.TemporaryDirectory() as directory:
+        Calculations.attach_log(os.path.join(directory, 'history.log'), restore=False)
+        try:
+            calc = Calculation(Decimal('1'), Decimal('2'), add)
+            # Each logged entry is flushed and written to the log before add_calculation returns
+            yield (lambda: Calculations.add_calculation(calc)), partial(fill_history, LOGGED_HISTORY_SIZE)
+        finally:
+            Calculations.detach_log()
+
+def bench_find_by_operation(size):
+    def setup():
+        fill_history(size)
+        return lambda: Calculations.find_by_operation('add', -10)
+    return setup
+
+def bench_count_by_operation(size):
+    def setup():
+        fill_history(size)
+        return lambda: Calculations.count_by_operation('add')
+    return setup
+
+def bench_divide_precision(precision):
+    def setup():
+        command = DivideCommand(Decimal(1), Decimal(7))
+
+        def run():
+            with localcontext() as context:
+                context.prec = precision
+                command.execute()
+        return run
+    return setup
+
+@contextmanager
+def bench_load_plugin():
+    calc = Calculator()
+    name = 'calculator.plugins.multiply_plugin'
+    package = importlib.import_module('calculator.plugins')
+    loaded = sys.modules.get(name)
+
+    def run():
+        # Evicted on every call, or load_plugin would just return the module already imported
+        sys.modules.pop(name, None)
+        package.__dict__.pop('multiply_plugin', None)
+        importlib.invalidate_caches()  # Make the import search the plugin directory again
+        calc.load_plugin('multiply_plugin')
+    try:
+        yield run
+    finally:
+        # Put back the original module, so its command class stays the one other code refers to
+        if loaded is None:
+            sys.modules.pop(name, None)
+            package.__dict__.pop('multiply_plugin', None)
+        else:
+            sys.modules[name] = package.multiply_plugin = loaded
+
+@contextmanager
+def bench_multiprocessing_call():
+    with Calculator(max_workers=1) as calc:  # Shuts the worker pool down once timed
+        calc.submit(AddCommand(1, 1)).result()  # Start the worker before timing
+        yield lambda: calc.submit(AddCommand(1, 1)).result()
+
+def all_cases():
+    """Map benchmark names to setup functions that return the callable to time.
+
+    A setup may instead return a context manager giving the callable, for cases
+    that hold resources such as a worker pool, and either may give a (callable,
+    reset) pair for cases that accumulate state; see harness.time_case.
+    """
+    cases = {
+        'compute/multiply': bench_compute,
+        'plugins/load_plugin': bench_load_plugin,
+        'multiprocessing/submit_roundtrip': bench_multiprocessing_call,
+        f'history/add_calculation_logged[{LOGGED_HISTORY_SIZE}]': bench_add_calculation_logged,
+    }
+    for size in HISTORY_SIZES:
+        cases[f'history/add_calculation[{size}]'] = bench_add_calculation(size)
+        cases[f'history/find_by_operation[{size}]'] = bench_find_by_operation(size)
+        cases[f'history/count_by_operation[{size}]'] = bench_count_by_operation(size)
+    for precision in PRECISIONS:
+        cases[f'compute/divide_prec[{precision}]'] = bench_divide_precision(precision)
+    return cases
@@ -0,0 +1,22 @@
+import pytest
+from benchmarks.harness import DEFAULT_BASELINE, DEFAULT_THRESHOLD, load_baseline, save_baseline
+
+def pytest_addoption(parser):
+    parser.addoption("--benchmark-baseline", action="store", default=DEFAULT_BASELINE,
+                     help="JSON file with baseline timings")
+    parser.addoption("--benchmark-threshold", action="store", default=DEFAULT_THRESHOLD, type=float,
+                     help="Allowed slowdown before a benchmark fails (0.25 = 25%%)")
+    parser.addoption("--benchmark-save", action="store_true", default=False,
+                     help="Save the measured timings as the new baseline")
+
+@pytest.fixture(scope="session")
+def benchmark_results(request):
+    """Collects timings during the session and saves them as a baseline when asked."""
+    results = {}
+    yield results
+    if request.config.getoption("benchmark_save") and results:
+        save_baseline(results, request.config.getoption("benchmark_baseline"))
+
+@pytest.fixture(scope="session")
+def benchmark_baseline(request):
+    return load_baseline(request.config.getoption("benchmark_baseline"))
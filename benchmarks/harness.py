@@ -0,0 +1,91 @@
+import json
+import os
+import time
+from typing import Callable, Dict, List, Optional
+
+# Where baselines are stored unless a path is given
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+# Fail when a benchmark gets this much slower than its baseline (0.25 = 25%)
+DEFAULT_THRESHOLD = float(os.environ.get('CALCULATOR_BENCHMARK_THRESHOLD', '0.25'))
+# Minimum duration of one timed run, used to pick the number of calls per run
+MIN_RUN_SECONDS = 0.02
+
+def measure(func: Callable[[], object], repeat: int = 5, number: Optional[int] = None,
+            reset: Optional[Callable[[], object]] = None) -> float:
+    """Return the best per-call time of func in seconds over `repeat` runs.
+
+    `reset`, when given, runs untimed before every run, including the calibration
+    runs, to undo state that func accumulates.
+    """
+    reset = reset or (lambda: None)
+    if number is None:
+        # Calibrate: double the calls per run until one run takes long enough to time
+        number = 1
+        while True:
+            reset()
+            start = time.perf_counter()
+            for _ in range(number):
+                func()
+            if time.perf_counter() - start >= MIN_RUN_SECONDS:
+                break
+            number *= 2
+    best = float('inf')
+    for _ in range(repeat):
+        reset()
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+def time_case(setup: Callable[[], object], repeat: int = 5) -> float:
+    """Set up a benchmark case and measure it, releasing what a context manager case holds.
+
+    The case, or the value its context manager gives, is the callable to time or a
+    (callable, reset) pair; see measure.
+    """
+    case = setup()
+    if hasattr(case, '__enter__'):
+        with case as func:
+            return _measure_case(func, repeat)
+    return _measure_case(case, repeat)
+
+def _measure_case(case, repeat: int) -> float:
+    func, reset = case if isinstance(case, tuple) else (case, None)
+    return measure(func, repeat, reset=reset)
+
+def load_baseline(path: str = DEFAULT_BASELINE) -> Dict[str, float]:
+    """Load saved per-call timings, or an empty baseline if none exists."""
+    try:
+        with open(path, encoding='utf-8') as baseline_file:
+            return json.load(baseline_file)['results']
+    except FileNotFoundError:
+        return {}
+
+def save_baseline(results: Dict[str, float], path: str = DEFAULT_BASELINE):
+    """Merge timings into the baseline file."""
+    merged = load_baseline(path)
+    merged.update(results)
+    with open(path, 'w', encoding='utf-8') as baseline_file:
+        json.dump({'results': merged}, baseline_file, indent=2, sort_keys=True)
+
+def compare(results: Dict[str, float], baseline: Dict[str, float],
+            threshold: float = DEFAULT_THRESHOLD) -> List[dict]:
+    """Return the benchmarks that are slower than their baseline by more than threshold."""
+    regressions = []
+    for name, seconds in sorted(results.items()):
+        reference = baseline.get(name)
+        if reference and seconds > reference * (1 + threshold):
+            regressions.append({'name': name, 'baseline': reference, 'current': seconds,
+                                'ratio': seconds / reference})
+    return regressions
+
+def format_report(results: Dict[str, float], baseline: Dict[str, float]) -> str:
+    """Render timings next to their baselines as a text table."""
+    lines = [f"{'benchmark':<48} {'per call':>12} {'baseline':>12} {'change':>8}"]
+    for name, seconds in sorted(results.items()):
+        reference = baseline.get(name)
+        change = f"{(seconds / reference - 1) * 100:+.0f}%" if reference else 'new'
+        base = f"{reference * 1e6:.2f}us" if reference else '-'
+        lines.append(f"{name:<48} {seconds * 1e6:>10.2f}us {base:>12} {change:>8}")
+    return '\n'.join(lines)
@@ -0,0 +1,33 @@
+import argparse
+import sys
+from benchmarks.cases import all_cases
+from benchmarks.harness import (DEFAULT_BASELINE, DEFAULT_THRESHOLD, compare, format_report,
+                                load_baseline, save_baseline, time_case)
+
+def main(argv=None) -> int:
+    """Run the benchmarks, print a report and return 1 if any regressed."""
+    parser = argparse.ArgumentParser(description="Run the calculator benchmarks.")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="Baseline JSON file")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed slowdown before failing (0.25 = 25%%)")
+    parser.add_argument('--save', action='store_true', help="Save the timings as the new baseline")
+    parser.add_argument('-k', dest='pattern', default='', help="Only run benchmarks containing this text")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name, setup in all_cases().items():
+        if args.pattern in name:
+            results[name] = time_case(setup)
+    baseline = load_baseline(args.baseline)
+    print(format_report(results, baseline))
+    if args.save:
+        save_baseline(results, args.baseline)
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+    regressions = compare(results, baseline, args.threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression['name']}: {regression['ratio']:.2f}x slower")
+    return 1 if regressions else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,22 @@
+import pytest
+from benchmarks.cases import all_cases
+from benchmarks.harness import compare, time_case
+from calculator.calculations import Calculations
+
+CASES = all_cases()
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("name", list(CASES))
+def test_benchmark(name, request, benchmark_results, benchmark_baseline):
+    """Time a hot path and fail if it regressed beyond the threshold."""
+    try:
+        seconds = time_case(CASES[name])
+    finally:
+        Calculations.configure()
+        Calculations.clear_history()
+    benchmark_results[name] = seconds
+    threshold = request.config.getoption("benchmark_threshold")
+    regressions = compare({name: seconds}, benchmark_baseline, threshold)
+    assert not regressions, (
+        f"{name} regressed {regressions[0]['ratio']:.2f}x: "
+        f"{seconds * 1e6:.2f}us vs baseline {regressions[0]['baseline'] * 1e6:.2f}us")
@@ -0,0 +1,101 @@
+import decimal
+from contextlib import contextmanager, nullcontext
+from decimal import Decimal, InvalidOperation
+from typing import Optional, Union
+from calculator.registry import integer_division
+
+class NumericBackend:
+    """How operands are parsed and which arithmetic context commands run under."""
+
+    name = 'base'
+
+    def convert(self, text):
+        raise NotImplementedError("Subclasses must implement the 'convert' method.")
+
+    def context(self):
+        """A context manager to execute commands in."""
+        return nullcontext()
+
+    def __repr__(self):
+        return f"{type(self).__name__}()"
+
+class IntBackend(NumericBackend):
+    """Plain Python integers: exact and fastest for whole-number traffic.
+
+    Every result is an exact int: dividing two ints gives their quotient when
+    it is a whole number and raises ValueError otherwise, rather than
+    returning a float.
+    """
+
+    name = 'int'
+
+    @contextmanager
+    def context(self):
+        token = integer_division.set(True)
+        try:
+            yield
+        finally:
+            integer_division.reset(token)
+
+    def convert(self, text):
+        try:
+            return int(text)
+        except (TypeError, ValueError):
+            # Raise the same error as Decimal so callers report invalid input uniformly
+            raise InvalidOperation(f"invalid integer: {text!r}") from None
+
+class FloatBackend(NumericBackend):
+    """Binary floating point: fast, with about 15 significant digits."""
+
+    name = 'float'
+
+    def convert(self, text):
+        try:
+            return float(text)
+        except (TypeError, ValueError):
+            raise InvalidOperation(f"invalid float: {text!r}") from None
+
+class DecimalBackend(NumericBackend):
+    """Decimal arithmetic at a chosen precision and rounding mode."""
+
+    name = 'decimal'
+
+    def __init__(self, precision: int = 28, rounding: str = decimal.ROUND_HALF_EVEN):
+        if precision < 1:
+            raise ValueError("precision must be at least 1")
+        if rounding not in _ROUNDING_MODES:
+            raise ValueError(f"Unknown rounding mode: {rounding}")
+        self.precision = precision
+        self.rounding = rounding
+
+    def convert(self, text):
+        return Decimal(text)  # Exact: operands are only rounded by the arithmetic itself
+
+    def context(self):
+        context = decimal.getcontext().copy()
+        context.prec = self.precision
+        context.rounding = self.rounding
+        return decimal.localcontext(context)
+
+    def __repr__(self):
+        return f"DecimalBackend(precision={self.precision}, rounding={self.rounding})"
+
+_ROUNDING_MODES = frozenset(
+    getattr(decimal, name) for name in dir(decimal) if name.startswith('ROUND_'))
+
+def get_backend(spec: Union[str, NumericBackend, None]) -> Optional[NumericBackend]:
+    """Resolve a backend from an instance or a spec like 'int', 'float' or 'decimal:50:ROUND_HALF_UP'."""
+    if spec is None or isinstance(spec, NumericBackend):
+        return spec
+    name, _, options = spec.partition(':')
+    if name == 'int' and not options:
+        return IntBackend()
+    if name == 'float' and not options:
+        return FloatBackend()
+    if name == 'decimal':
+        precision, _, rounding = options.partition(':')
+        if precision and not precision.isdigit():
+            raise ValueError(f"Invalid decimal precision: {precision}")
+        return DecimalBackend(int(precision) if precision else 28,
+                              rounding.upper() if rounding else decimal.ROUND_HALF_EVEN)
+    raise ValueError(f"Unknown numeric backend: {spec}")
@@ -0,0 +1,123 @@
+import sys
+from array import array
+from decimal import Decimal
+from typing import Sequence
+from calculator.registry import REGISTRY
+
+# array.array typecodes grouped by the kind of number they hold
+FLOAT_TYPECODES = frozenset('fd')
+INT_TYPECODES = frozenset('bBhHiIlLqQ')
+# Relative margin below the integer limits within which a float64 estimate cannot rule out overflow
+_OVERFLOW_MARGIN = 1 - 2 ** -40
+
+class BatchResult:
+    """Result of a batch computation: the values plus a mask of invalid operands (e.g. zero divisors)."""
+
+    def __init__(self, values, mask):
+        self.values = values  # Results; masked positions hold zero
+        self.mask = mask  # Truthy where the operation was not defined, e.g. a zero divisor
+
+    @property
+    def error_count(self) -> int:
+        """Number of elements that could not be computed."""
+        return int(sum(self.mask))
+
+    def __len__(self):
+        return len(self.values)
+
+    def __repr__(self):
+        return f"BatchResult(size={len(self.values)}, errors={self.error_count})"
+
+def _numpy():
+    # NumPy is optional and slow to import, so it is never imported here: an operand
+    # can only be a NumPy array if the caller has already imported it
+    return sys.modules.get('numpy')
+
+def _is_numpy(value) -> bool:
+    numpy = _numpy()
+    return numpy is not None and isinstance(value, numpy.ndarray)
+
+def batch_operation(op_name: str):
+    """The registered binary operation for a batch, or ValueError."""
+    operation = REGISTRY.get(op_name)
+    if operation is None or operation.arity != 2:
+        raise ValueError(f"Unknown operation: {op_name}")
+    return operation
+
+def _numpy_kernel(op_name: str, a, b) -> BatchResult:
+    """Run the operation as a single NumPy ufunc call."""
+    numpy = _numpy()
+    operation = batch_operation(op_name)
+    a = numpy.asarray(a)
+    b = numpy.asarray(b)
+    if a.dtype == object or b.dtype == object or operation.vector is None:
+        # Object arrays (e.g. Decimal) cannot be vectorised
+        return _object_kernel(op_name, a, b)
+    ufunc = getattr(numpy, operation.vector)
+    if operation.invalid is None:
+        mask = numpy.zeros(a.shape, dtype=bool)
+        values = ufunc(a, b)
+    else:
+        mask = numpy.asarray(operation.invalid(a, b), dtype=bool)
+        values = numpy.zeros(numpy.broadcast(a, b).shape, dtype=ufunc(a[:0], b[:0]).dtype)
+        ufunc(a, b, out=values, where=~mask)
+    if values.dtype.kind in 'iu' and _may_overflow(ufunc, a, b, mask, values):
+        # Integer ufuncs wrap around silently; Python ints give the exact results instead
+        return _object_kernel(op_name, a.astype(object), b.astype(object))
+    return BatchResult(values, mask)
+
+def _object_kernel(op_name: str, a, b) -> BatchResult:
+    numpy = _numpy()
+    values, mask = _sequence_kernel(op_name, a.tolist(), b.tolist())
+    return BatchResult(numpy.array(list(values), dtype=object), numpy.frombuffer(mask, dtype=bool))
+
+def _may_overflow(ufunc, a, b, mask, values) -> bool:
+    """Whether an integer ufunc result may have left its dtype's range, from a float64 estimate."""
+    numpy = _numpy()
+    info = numpy.iinfo(values.dtype)
+    estimate = numpy.zeros(values.shape, dtype=float)
+    ufunc(a.astype(float), b.astype(float), out=estimate, where=~mask)
+    # Results near the limits are ambiguous in float64, so they count as overflowing too
+    return bool((estimate >= info.max * _OVERFLOW_MARGIN).any()
+                or (estimate < info.min * _OVERFLOW_MARGIN).any())
+
+def _sequence_kernel(op_name: str, a: Sequence, b: Sequence):
+    """Apply the operation over two sequences, returning (values, mask)."""
+    operation = batch_operation(op_name)
+    if operation.batch is not None:
+        return operation.batch(a, b)
+    if operation.invalid is None:
+        return map(operation.scalar, a, b), bytearray(len(a))  # map() keeps the loop in C
+    mask = bytearray(map(operation.invalid, a, b))
+    zero = Decimal(0) if a and isinstance(a[0], Decimal) else 0
+    values = [zero if flag else operation.scalar(x, y) for x, y, flag in zip(a, b, mask)]
+    return values, mask
+
+def _result_typecode(op_name: str, a: array, b: array) -> str:
+    """Choose an array.array typecode wide enough for the result."""
+    if op_name == 'divide' or a.typecode in FLOAT_TYPECODES or b.typecode in FLOAT_TYPECODES:
+        return 'd'
+    return 'q'
+
+def _result_array(typecode: str, values):
+    """Pack results into an array.array, or keep exact Python ints when one overflows int64."""
+    if typecode != 'q':
+        return array(typecode, values)
+    values = list(values)
+    try:
+        return array(typecode, values)
+    except OverflowError:
+        return values
+
+def compute_batch(op_name: str, a, b) -> BatchResult:
+    """Apply a named operation element-wise to two operand arrays."""
+    batch_operation(op_name)
+    if len(a) != len(b):
+        raise ValueError(f"Operand arrays differ in length: {len(a)} != {len(b)}")
+    if _is_numpy(a) or _is_numpy(b):
+        return _numpy_kernel(op_name, a, b)
+    values, mask = _sequence_kernel(op_name, a, b)
+    if isinstance(a, array) and isinstance(b, array):
+        return BatchResult(_result_array(_result_typecode(op_name, a, b), values), mask)
+    # Decimal and other Python numbers: plain list of results
+    return BatchResult(list(values), mask)
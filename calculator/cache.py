@@ -0,0 +1,58 @@
+from collections import OrderedDict
+from decimal import Decimal, getcontext
+from typing import Optional
+from calculator.commands import Command, operand_names
+
+def _operand_key(value):
+    # Decimals that compare equal can still differ in exponent (1.0 vs 1), which changes results
+    if isinstance(value, Decimal):
+        return Decimal, str(value)
+    return type(value), value
+
+def command_key(command: Command) -> tuple:
+    """Build a cache key from the command type, its operands and the active decimal context."""
+    context = getcontext()
+    operands = tuple(_operand_key(getattr(command, name)) for name in operand_names(type(command)))
+    return type(command), operands, context.prec, context.rounding
+
+class ResultCache:
+    """A least-recently-used cache of command results with hit and miss counters."""
+
+    def __init__(self, maxsize: Optional[int] = 1024):
+        if maxsize is not None and maxsize < 1:
+            raise ValueError("maxsize must be a positive integer or None")
+        self.maxsize = maxsize  # None means unbounded
+        self.hits = 0
+        self.misses = 0
+        self._results = OrderedDict()
+
+    def execute(self, command: Command):
+        """Return the cached result for an equivalent command, computing it on a miss."""
+        key = command_key(command)
+        try:
+            result = self._results[key]
+        except KeyError:
+            self.misses += 1
+            result = command.execute()  # Errors propagate and are not cached
+            self._results[key] = result
+            if self.maxsize is not None and len(self._results) > self.maxsize:
+                self._results.popitem(last=False)  # Evict the least recently used result
+        else:
+            self.hits += 1
+            self._results.move_to_end(key)
+        command.result = result  # Store on the command so repr never recomputes
+        return result
+
+    def clear(self):
+        """Drop every cached result and reset the counters."""
+        self._results.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def info(self) -> dict:
+        """Return the cache statistics."""
+        return {'hits': self.hits, 'misses': self.misses,
+                'size': len(self._results), 'maxsize': self.maxsize}
+
+    def __len__(self):
+        return len(self._results)
@@ -4,6 +4,8 @@ from calculator.operations import add, subtract, multiply, divide
 
 # Definition of the Calculation class, including annotations for clarity and maintainability
 class Calculation:
+    __slots__ = ('operation', 'a', 'b')  # No per-instance __dict__ keeps history entries small
+
     # Initialization method with slight reordering of logic to avoid exact code duplication
     def __init__(self, a: Decimal, b: Decimal, operation: Callable[[Decimal, Decimal], Decimal]):
         self.operation = operation  # Store the operation first for readability
@@ -18,8 +20,8 @@ class Calculation:
 
     def perform(self) -> Decimal:
         """Execute the stored operation and return the resulting value."""
-        # A simple execution call to perform the provided mathematical operation
-        return self.operation(self.a, self.b)
+        # Registered operations expose their checked kernel as `call`; plain callables are used as is
+        return getattr(self.operation, 'call', self.operation)(self.a, self.b)
 
     def __repr__(self):
         """String representation showing the operation and operands."""
@@ -1,34 +1,219 @@
+import atexit
+import threading
+import time
+from itertools import islice
 from decimal import Decimal
-from typing import Callable, List
+from typing import TYPE_CHECKING, Callable, List, Optional
 from calculator.calculation import Calculation
+from calculator.columnar import ColumnarHistory
+from calculator.history import (DropOldest, HistoryView, OperationIndex, RingBuffer,
+                                ShardedAppendBuffer, make_eviction_policy, operation_name)
+from calculator.stats import OperationStats, RunningStats, stats_value
+
+if TYPE_CHECKING:  # Imported by attach_log, so histories without a log never load mmap
+    from calculator.history_log import HistoryLog
+
+# Queued appends per thread before the appending thread tries to merge them itself
+FLUSH_THRESHOLD = 1024
 
 class Calculations:
-    history: List[Calculation] = []  # Class-level attribute for storing calculation history
+    history: RingBuffer = RingBuffer()  # Class-level ring buffer storing calculation history
+    eviction_policy = DropOldest()  # What happens to entries pushed out of a bounded history
+    index = OperationIndex()  # Sequence numbers of the entries of each operation
+    stats = OperationStats(windowed=False)  # Running aggregates of the results of each operation
+    log: Optional['HistoryLog'] = None  # Append-only on-disk log of added calculations
+
+    # Storage backends for the history buffer
+    backends = {'object': RingBuffer, 'columnar': ColumnarHistory}
+
+    # Clock of the entry timestamps that find_by_operation_between ranges over
+    clock: Callable[[], float] = time.monotonic
+
+    # Appends go to per-thread queues; readers merge them into the history under _lock
+    _pending = ShardedAppendBuffer()
+    _lock = threading.RLock()
+
+    @classmethod
+    def configure(cls, capacity: Optional[int] = None, eviction: str = 'drop_oldest',
+                  spill_path: Optional[str] = None, backend: str = 'object'):
+        """Set the history capacity, eviction policy and storage backend, keeping the newest entries."""
+        if backend not in cls.backends:
+            raise ValueError(f"Unknown history backend: {backend}")
+        policy = make_eviction_policy(eviction, spill_path)
+        buffer = cls.backends[backend](capacity)
+        with cls._lock:
+            cls._flush()
+            buffer.total = cls.history.first_seq  # Keep sequence numbers stable for the index
+            for calculation in cls.history:
+                evicted = buffer.append(calculation)
+                if evicted is not None:
+                    policy.evict(evicted)
+            cls.index.evict_before(buffer.first_seq)
+            # Statistics only keep each value when the history can evict it, so they are rebuilt
+            stats = OperationStats(windowed=capacity is not None)
+            for calculation in buffer:
+                stats.add(operation_name(calculation), stats_value(calculation))
+            cls.eviction_policy.close()
+            cls.history, cls.eviction_policy, cls.stats = buffer, policy, stats
+
+    @classmethod
+    def attach_log(cls, path: str, sync_every: int = 256, restore: bool = True) -> 'HistoryLog':
+        """Persist history to an append-only log, optionally restoring its newest entries."""
+        from calculator.history_log import HistoryLog
+        cls.detach_log()
+        log = HistoryLog(path, sync_every=sync_every)
+        with cls._lock:
+            cls._flush()
+            if restore:
+                # Only decode the entries that fit in the in-memory history
+                count = len(log) if cls.history.capacity is None else cls.history.capacity
+                now = cls.clock()
+                for calculation in log.tail(count):
+                    cls._store(calculation, now)
+            cls.log = log
+        atexit.register(cls.detach_log)  # Sync the records still in the file buffer on exit
+        return log
+
+    @classmethod
+    def detach_log(cls):
+        """Sync and close the history log, if one is attached."""
+        with cls._lock:
+            cls._flush()
+            if cls.log is not None:
+                cls.log.close()
+                cls.log = None
+        atexit.unregister(cls.detach_log)
 
     @classmethod
     def add_calculation(cls, calculation: Calculation):
         """Add a new calculation to the history."""
-        cls.history.append(calculation)
+        # Everything that can reject the entry runs here, in the caller's thread and decimal
+        # context, so a bad entry raises to the code that added it rather than to a later reader
+        log = cls.log
+        payload = log.encode(calculation) if log is not None else None
+        item = (cls.clock(), calculation, stats_value(calculation), payload)
+        # Without a log this is lock-free: the entry waits in this thread's queue until the next
+        # read merges it. A logged entry is written before returning, so it survives a crash
+        # (once synced), and a full queue is merged even if that means waiting for a reader
+        if cls._pending.append(item) >= FLUSH_THRESHOLD or log is not None:
+            with cls._lock:
+                cls._flush()
+
+    @classmethod
+    def _flush(cls):
+        """Merge queued appends into the history in order. Callers hold _lock."""
+        pending = cls._pending.drain()
+        for timestamp, calculation, value, payload in pending:
+            try:
+                if cls.log is not None:
+                    cls.log.append(calculation, payload)
+                cls._store(calculation, timestamp, value)
+            except Exception:
+                cls._pending.requeue(pending)  # Only the failing entry is lost; later ones stay queued
+                raise
 
     @classmethod
-    def get_history(cls) -> List[Calculation]:
+    def _store(cls, calculation: Calculation, timestamp: float, value=None):
+        """Add a calculation to the in-memory history, index and statistics."""
+        # Computed before any state changes, so a failure leaves history, index and stats consistent
+        name = operation_name(calculation)
+        if value is None:
+            value = stats_value(calculation)
+        seq = cls.history.total
+        evicted = cls.history.append(calculation)
+        cls.index.add(name, seq, timestamp)
+        cls.stats.add(name, value)
+        if evicted is not None:
+            evicted_name = operation_name(evicted)
+            cls.index.evict(evicted_name)
+            cls.stats.evict(evicted_name)
+            cls.eviction_policy.evict(evicted)
+
+    @classmethod
+    def export_history(cls, path: str, format: str = 'binary', chunk_size: Optional[int] = None) -> int:
+        """Write the history to a binary or CSV file in chunks and return the entry count."""
+        from calculator.history_export import EXPORT_CHUNK_SIZE, export_entries
+        with cls._lock:
+            cls._flush()
+            return export_entries(cls.history, path, format, chunk_size or EXPORT_CHUNK_SIZE)
+
+    @classmethod
+    def import_history(cls, path: str, chunk_size: Optional[int] = None) -> int:
+        """Append the entries of an exported file to the history and return how many were read."""
+        from calculator.history_export import EXPORT_CHUNK_SIZE, import_entries
+        entries, chunk_size = import_entries(path), chunk_size or EXPORT_CHUNK_SIZE
+        count = 0
+        while True:
+            chunk = list(islice(entries, chunk_size))
+            if not chunk:
+                return count
+            with cls._lock:
+                cls._flush()  # Keep entries added before the import ahead of it
+                now = cls.clock()
+                for calculation in chunk:
+                    if cls.log is not None:
+                        cls.log.append(calculation)
+                    cls._store(calculation, now)
+            count += len(chunk)
+
+    @classmethod
+    def get_history(cls, snapshot: bool = False) -> HistoryView:
         """Retrieve the entire calculation history."""
-        # Return a copy of the history to avoid accidental modification
-        return cls.history.copy()
+        with cls._lock:
+            cls._flush()
+            if snapshot:
+                # A copy that later appends and clears cannot change
+                return HistoryView(tuple(cls.history))
+            # Return a read-only view so callers cannot modify the history and nothing is copied
+            return HistoryView(cls.history)
 
     @classmethod
     def clear_history(cls):
         """Completely clear the stored history of calculations."""
-        cls.history.clear()
+        with cls._lock:
+            cls._flush()  # Entries added before the clear are logged before the clear marker
+            cls.history.clear()
+            cls.index.clear()
+            cls.stats.clear()
+            if cls.log is not None:
+                cls.log.clear()
 
     @classmethod
     def get_latest(cls) -> Calculation:
         """Get the latest calculation. Returns None if no history exists."""
-        # Simplified return expression for clarity
-        return cls.history[-1] if cls.history else None
+        with cls._lock:
+            cls._flush()
+            return cls.history[-1] if cls.history else None
+
+    @classmethod
+    def find_by_operation(cls, operation_name: str, start: Optional[int] = None,
+                          stop: Optional[int] = None) -> List[Calculation]:
+        """Find and return a list of calculations by operation name, optionally sliced."""
+        with cls._lock:
+            cls._flush()
+            # Look up the matching sequence numbers in the index instead of scanning the history
+            return [cls.history.get_by_seq(seq) for seq in cls.index.seqs(operation_name, start, stop)]
+
+    @classmethod
+    def find_by_operation_between(cls, operation_name: str, since: float, until: float) -> List[Calculation]:
+        """Find calculations of an operation added between two `Calculations.clock()` readings."""
+        with cls._lock:
+            cls._flush()
+            return [cls.history.get_by_seq(seq)
+                    for seq in cls.index.seqs_between(operation_name, since, until)]
+
+    @classmethod
+    def count_by_operation(cls, operation_name: str) -> int:
+        """Return the number of calculations in the history for an operation."""
+        with cls._lock:
+            cls._flush()
+            return cls.index.count(operation_name)
 
     @classmethod
-    def find_by_operation(cls, operation_name: str) -> List[Calculation]:
-        """Find and return a list of calculations by operation name."""
-        # Use list comprehension to search for calculations with the specified operation
-        return [calc for calc in cls.history if calc.operation.__name__ == operation_name]
+    def stats_by_operation(cls, operation_name: str) -> dict:
+        """Return the count, total, mean, min, max and variance of an operation's results."""
+        with cls._lock:
+            cls._flush()
+            # Maintained as entries are stored and evicted, so this does not scan the history
+            stats = cls.stats.get(operation_name)
+            return stats.summary() if stats is not None else RunningStats().summary()
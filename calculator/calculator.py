@@ -1,36 +1,200 @@
-import importlib
-import multiprocessing
+import time
+from typing import TYPE_CHECKING, Iterable, Iterator, Optional, Union
+from calculator.backends import NumericBackend, get_backend
 from calculator.commands import Command  # Import the Command class for command-based operations
+from calculator.history import operation_name
+
+if TYPE_CHECKING:  # Imported where used, keeping them out of the CLI's startup
+    from concurrent.futures import Future
+    from calculator.batch import BatchResult
+    from calculator.dag import CommandGraph
+    from calculator.discovery import PluginRegistry
+    from calculator.metrics import Metrics
+    from calculator.pool import WorkerPool
+    from calculator.reduction import ReductionCommand
+    from calculator.shared_batch import SharedBatch
 
 # Define a top-level function that can be used in multiprocessing
-def execute_command(command: Command, result_queue):
+def execute_command(command: Command, result_queue=None):
     result = command.execute()
-    result_queue.put(result)  # Put the result into the result queue
+    if result_queue is not None:
+        result_queue.put(result)  # Put the result into the result queue
+    return result
 
 class Calculator:
-    def __init__(self):
+    def __init__(self, max_workers: Optional[int] = None, start_method: Optional[str] = None,
+                 cache_size: Optional[int] = None, metrics: Optional['Metrics'] = None,
+                 backend: Union[str, NumericBackend, None] = None):
         self.history = []  # Maintain a history of executed commands
         self.plugins = {}  # Dictionary to store loaded plugins
+        self.registry = None  # Discovered plugins, imported lazily on first use
+        # Optional LRU cache of results for repeated (operation, a, b) requests
+        self.cache = None
+        if cache_size:
+            from calculator.cache import ResultCache
+            self.cache = ResultCache(cache_size)
+        # Optional counters and latency histograms; None keeps the hot path untimed
+        self.metrics = metrics
+        # Numeric backend whose context commands run under; None uses the current decimal context
+        self.backend = get_backend(backend)
+        # Worker processes are only started the first time they are needed
+        self.max_workers = max_workers
+        self.start_method = start_method
+        self._pool = None
+
+    @property
+    def pool(self) -> 'WorkerPool':
+        """The worker pool, created (but not started) on first access."""
+        if self._pool is None:
+            from calculator.pool import WorkerPool
+            self._pool = WorkerPool(max_workers=self.max_workers, start_method=self.start_method)
+        return self._pool
 
-    def compute(self, command: Command):
+    def compute(self, command: Command, backend: Union[str, NumericBackend, None] = None):
         """Execute a command and store it in the history."""
-        result = command.execute()  # Execute the provided command
+        backend = self.backend if backend is None else get_backend(backend)
+        if backend is not None:
+            with backend.context():  # e.g. the precision and rounding of a Decimal backend
+                return self._dispatch(command)
+        return self._dispatch(command)
+
+    def _dispatch(self, command: Command):
+        if self.metrics is not None:
+            return self._timed(command, 'compute', self._compute)
+        return self._compute(command)
+
+    def _compute(self, command: Command):
+        if self.cache is not None and command.cacheable:
+            result = self.cache.execute(command)  # Reuse the result of an identical command
+        else:
+            result = command.result  # Execute the command once and keep the result on it
         self.history.append(command)  # Store the command in history
         return result  # Return the result of the command
 
+    def _timed(self, target, path: str, run, name: Optional[str] = None):
+        """Call run(target), recording its latency and any error under the operation name."""
+        name = name or operation_name(target)
+        start = time.perf_counter()
+        try:
+            result = run(target)
+        except Exception:
+            self.metrics.record(name, path, time.perf_counter() - start, error=True)
+            raise
+        self.metrics.record(name, path, time.perf_counter() - start)
+        return result
+
+    def evaluate(self, *commands: Command, parallel: bool = False) -> list:
+        """Evaluate commands whose operands may be other commands, returning their results.
+
+        Identical subcommands are computed once, and only what the given commands
+        depend on is computed. With parallel=True, independent branches run on
+        the worker pool at the same time.
+        """
+        from calculator.dag import CommandGraph
+        graph = CommandGraph()
+        nodes = [graph.add(command) for command in commands]
+        if self.backend is not None:
+            with self.backend.context():
+                self._evaluate_graph(graph, nodes, parallel)
+        else:
+            self._evaluate_graph(graph, nodes, parallel)
+        self.history.extend(commands)
+        return [graph.results[node] for node in nodes]
+
+    def _evaluate_graph(self, graph: 'CommandGraph', nodes: list, parallel: bool):
+        if parallel:
+            graph.evaluate_parallel(self.pool.executor, nodes, self.backend)
+        else:
+            graph.evaluate(nodes)
+
+    def compute_batch(self, op_name: str, a_array, b_array) -> 'BatchResult':
+        """Apply an operation element-wise to two operand arrays in one call."""
+        from calculator.batch import compute_batch
+        # Batches are not added to the command history; only the result is returned
+        return compute_batch(op_name, a_array, b_array)
+
+    def compute_batch_shared(self, op_name: str, a_array, b_array) -> 'SharedBatch':
+        """Compute a large batch on the worker pool through shared memory.
+
+        Operands and results live in shared memory blocks, so only block names
+        and error counts are pickled. Close the returned batch (or use it as a
+        context manager) once its `result` has been read.
+        """
+        from calculator.shared_batch import SharedBatch
+        batch = SharedBatch.from_operands(a_array, b_array)
+        try:
+            batch.compute(op_name, self.pool.executor, parts=self.pool.max_workers)
+        except BaseException:
+            batch.close()
+            raise
+        if self.metrics is not None:
+            self.metrics.count(op_name, 'shared_batch', len(batch))
+        return batch
+
+    def reduce(self, command: 'ReductionCommand'):
+        """Reduce a large or streamed sequence in parallel chunks on the worker pool."""
+        # Like batches, reductions are not added to the command history
+        if self.metrics is not None:
+            result = self._timed(command, 'pool_reduce', self._reduce)
+        else:
+            result = self._reduce(command)
+        command.result = result
+        return result
+
+    def _reduce(self, command: 'ReductionCommand'):
+        # Two chunks in flight per worker keeps every worker busy while the next chunk is read
+        max_pending = 2 * self.pool.max_workers
+        if self.backend is not None:
+            with self.backend.context():  # Partial results are combined under the same context
+                return command.execute_parallel(self.pool.executor, max_pending, self.backend)
+        return command.execute_parallel(self.pool.executor, max_pending)
+
     def compute_with_multiprocessing(self, command: Command):
-        """Execute a command using multiprocessing and print the result."""
-        result_queue = multiprocessing.Queue()  # Create a queue to store the result
-        process = multiprocessing.Process(target=execute_command, args=(command, result_queue))
-        process.start()
-        process.join()  # Wait for the process to finish
-
-        # Get and print the result
-        result = result_queue.get()
+        """Execute a command on the worker pool, print the result and return it."""
+        future = self.pool.submit(command, self.backend)
+        if self.metrics is not None:
+            result = self._timed(future, 'multiprocessing', type(future).result, operation_name(command))
+        else:
+            result = future.result()
         print(f"Result of {command.__class__.__name__}: {result}")
+        return result
+
+    def submit(self, command: Command) -> 'Future':
+        """Schedule a command on the worker pool and return a Future for its result."""
+        future = self.pool.submit(command, self.backend)
+        if self.metrics is not None:
+            # Latency runs from submission until the worker's result arrives
+            name, start, metrics = operation_name(command), time.perf_counter(), self.metrics
+            future.add_done_callback(lambda done: metrics.record(
+                name, 'pool', time.perf_counter() - start, error=done.exception() is not None))
+        return future
+
+    def map(self, commands: Iterable[Command], chunksize: int = 1) -> Iterator:
+        """Execute commands on the worker pool in chunks, yielding results in order."""
+        if self.metrics is not None:
+            commands = self._counted(commands, 'pool_map')
+        return self.pool.map(commands, chunksize=chunksize, backend=self.backend)
+
+    def _counted(self, commands: Iterable[Command], path: str) -> Iterator[Command]:
+        """Count commands per operation as they are handed to the pool."""
+        for command in commands:
+            self.metrics.count(operation_name(command), path)
+            yield command
+
+    def shutdown(self, wait: bool = True):
+        """Shut down the worker pool if it has been started."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
 
     def load_plugin(self, plugin_name: str):
         """Dynamically load a plugin by its name from the plugins folder."""
+        import importlib
         try:
             # Import the plugin module dynamically from the plugins folder
             plugin_module = importlib.import_module(f"calculator.plugins.{plugin_name}")
@@ -41,11 +205,20 @@ class Calculator:
         except ImportError:
             raise ImportError(f"Failed to load plugin: {plugin_name}")
 
+    def discover_plugins(self, manifest_path: Optional[str] = None) -> 'PluginRegistry':
+        """Discover plugins from the package and entry points without importing them."""
+        from calculator.discovery import PluginRegistry
+        self.registry = PluginRegistry.discover(manifest_path=manifest_path)
+        return self.registry
+
     def create_command(self, plugin_name: str, *args):
         """Create and return a command from the loaded plugin."""
         # Check if the plugin has been loaded
         if plugin_name in self.plugins:
             # Return an instance of the command class with provided arguments
             return self.plugins[plugin_name](*args)
+        elif self.registry is not None and plugin_name in self.registry:
+            # Import a discovered plugin the first time its operation is used
+            return self.registry[plugin_name](*args)
         else:
             raise ValueError(f"Plugin not found: {plugin_name}")
@@ -0,0 +1,227 @@
+import struct
+from array import array
+from decimal import Context, Decimal
+from typing import Iterator, Optional
+from calculator.calculation import Calculation
+from calculator.history import entry_operands
+
+# Kinds of packed operand, stored one byte per operand
+DECIMAL, INT, FLOAT, OBJECT = range(4)
+
+_INT64_MIN, _INT64_MAX = -2 ** 63, 2 ** 63 - 1
+_FLOAT_BITS = struct.Struct('<d')
+_INT_BITS = struct.Struct('<q')
+_EXACT = Context(prec=20)  # Holds any int64 coefficient, so rebuilding a Decimal never rounds
+_NO_RESULT = object()
+
+def pack_operand(value):
+    """Pack a number into (kind, 64-bit payload, exponent), or None if it does not fit."""
+    if isinstance(value, Decimal):
+        sign, digits, exponent = value.as_tuple()
+        if not isinstance(exponent, int) or not -128 <= exponent <= 127:
+            return None  # NaN, Infinity or an exponent outside one byte
+        coefficient = int(Decimal((0, digits, 0)))
+        if sign:
+            if not coefficient:
+                return None  # Negative zero has no distinct coefficient
+            coefficient = -coefficient
+        if not _INT64_MIN <= coefficient <= _INT64_MAX:
+            return None
+        return DECIMAL, coefficient, exponent
+    if type(value) is int:  # bool is kept as an object to preserve its type
+        return (INT, value, 0) if _INT64_MIN <= value <= _INT64_MAX else None
+    if type(value) is float:
+        return FLOAT, _INT_BITS.unpack(_FLOAT_BITS.pack(value))[0], 0
+    return None
+
+def unpack_operand(kind: int, payload: int, exponent: int):
+    """Rebuild a number packed by pack_operand."""
+    if kind == DECIMAL:
+        return Decimal(payload).scaleb(exponent, _EXACT)
+    if kind == INT:
+        return payload
+    return _FLOAT_BITS.unpack(_INT_BITS.pack(payload))[0]
+
+class _ValueColumns:
+    """Numbers packed into kind, payload and exponent columns, with a side table for the rest."""
+
+    def __init__(self):
+        self.kinds = array('B')
+        self.payloads = array('q')
+        self.exponents = array('b')
+        self.objects = {}  # Slot -> value that could not be packed
+
+    def write(self, slot: int, value, appending: bool):
+        self.objects.pop(slot, None)
+        packed = pack_operand(value)
+        if packed is None:
+            self.objects[slot] = value
+            packed = (OBJECT, 0, 0)
+        kind, payload, exponent = packed
+        if appending:
+            self.kinds.append(kind)
+            self.payloads.append(payload)
+            self.exponents.append(exponent)
+        else:
+            self.kinds[slot] = kind
+            self.payloads[slot] = payload
+            self.exponents[slot] = exponent
+
+    def pad(self, count: int):
+        """Append `count` unused slots."""
+        self.kinds.extend([OBJECT] * count)
+        self.payloads.extend([0] * count)
+        self.exponents.extend([0] * count)
+
+    def read(self, slot: int):
+        kind = self.kinds[slot]
+        if kind == OBJECT:
+            return self.objects[slot]
+        return unpack_operand(kind, self.payloads[slot], self.exponents[slot])
+
+    def widen(self, old: int, width: int):
+        """Re-lay the columns out from `old` to `width` slots per row."""
+        kinds, payloads, exponents = array('B'), array('q'), array('b')
+        for start in range(0, len(self.kinds), old):
+            kinds.extend(self.kinds[start:start + old])
+            kinds.extend([OBJECT] * (width - old))  # Unused slots are never read
+            payloads.extend(self.payloads[start:start + old])
+            payloads.extend([0] * (width - old))
+            exponents.extend(self.exponents[start:start + old])
+            exponents.extend([0] * (width - old))
+        self.objects = {slot // old * width + slot % old: value for slot, value in self.objects.items()}
+        self.kinds, self.payloads, self.exponents = kinds, payloads, exponents
+
+    def nbytes(self) -> int:
+        return sum(column.itemsize * len(column) for column in (self.kinds, self.payloads, self.exponents))
+
+class ColumnarHistory:
+    """A ring buffer of history entries stored column-wise in typed arrays.
+
+    Each entry takes a one-byte operation code, a one-byte arity and, per operand,
+    a one-byte kind, a 64-bit payload and a one-byte exponent. Rows reserve as
+    many operand slots as the widest entry so far. A command's stored result is
+    kept in a result column the same way, so rebuilt commands do not execute
+    again. Calculation and Command objects are only rebuilt when an entry is
+    read. Values that cannot be packed (huge or special Decimals, other number
+    types) are kept as objects in a side table.
+    """
+
+    def __init__(self, capacity: Optional[int] = None):
+        if capacity is not None and capacity < 1:
+            raise ValueError("capacity must be a positive integer or None")
+        self.capacity = capacity  # None means unbounded
+        self.total = 0  # Number of entries ever appended; the next entry's sequence number
+        self._factories = []  # Operation code -> (factory, kind of factory)
+        self._codes = {}  # Factory -> operation code
+        self._clear_columns()
+
+    def _clear_columns(self):
+        self._ops = array('B')
+        self._arities = array('B')
+        self._width = 2  # Operand slots per row; grows for entries with more operands
+        self._operands = _ValueColumns()  # `_width` slots per entry, in constructor order
+        self._has_result = bytearray()  # One flag per entry; Calculations never store a result
+        self._results = None  # Allocated for the first stored result, one slot per entry
+        self._start = 0  # Row of the oldest entry once the buffer has wrapped
+
+    @property
+    def first_seq(self) -> int:
+        """Sequence number of the oldest entry still held."""
+        return self.total - len(self._ops)
+
+    def _operation_code(self, entry) -> int:
+        if isinstance(entry, Calculation):
+            key = (entry.operation, True)
+        else:
+            key = (type(entry), False)
+        code = self._codes.get(key)
+        if code is None:
+            if len(self._factories) > 255:
+                raise ValueError("columnar history supports at most 256 distinct operations")
+            code = self._codes[key] = len(self._factories)
+            self._factories.append(key)
+        return code
+
+    def _build(self, row: int):
+        factory, is_calculation = self._factories[self._ops[row]]
+        start = row * self._width
+        operands = [self._operands.read(slot) for slot in range(start, start + self._arities[row])]
+        if is_calculation:
+            return Calculation(*operands, factory)
+        command = factory(*operands)
+        if self._has_result[row]:
+            command.result = self._results.read(row)
+        return command
+
+    def _write_row(self, row: int, entry, appending: bool):
+        operands = entry_operands(entry)
+        if len(operands) > self._width:
+            self._operands.widen(self._width, len(operands))
+            self._width = len(operands)
+        start = row * self._width
+        for offset in range(self._width):
+            # Unused slots hold a placeholder so every row keeps the same width
+            value = operands[offset] if offset < len(operands) else 0
+            self._operands.write(start + offset, value, appending)
+        result = getattr(entry, '_result', _NO_RESULT)  # Only a result already computed is kept
+        has_result = result is not _NO_RESULT
+        if has_result and self._results is None:
+            self._results = _ValueColumns()
+            self._results.pad(len(self._ops))
+        if self._results is not None:
+            self._results.write(row, result if has_result else 0, appending)
+        if appending:
+            self._arities.append(len(operands))
+            self._has_result.append(has_result)
+        else:
+            self._arities[row] = len(operands)
+            self._has_result[row] = has_result
+
+    def append(self, entry):
+        """Add an entry and return the evicted oldest entry, or None if nothing was evicted."""
+        code = self._operation_code(entry)
+        if self.capacity is None or len(self._ops) < self.capacity:
+            self._write_row(len(self._ops), entry, True)
+            self._ops.append(code)
+            self.total += 1
+            return None
+        row = self._start
+        evicted = self._build(row)
+        self._write_row(row, entry, False)
+        self._ops[row] = code
+        self.total += 1
+        self._start = (self._start + 1) % self.capacity
+        return evicted
+
+    def clear(self):
+        """Remove every entry. Sequence numbers keep counting up."""
+        self._clear_columns()
+
+    def get_by_seq(self, seq: int):
+        """Return the entry with the given sequence number."""
+        position = seq - self.first_seq
+        if position < 0:
+            raise IndexError(f"history entry {seq} has been evicted")
+        return self[position]
+
+    def nbytes(self) -> int:
+        """Approximate bytes used by the column arrays."""
+        return (len(self._ops) + len(self._arities) + len(self._has_result)
+                + self._operands.nbytes() + (self._results.nbytes() if self._results is not None else 0))
+
+    def __len__(self):
+        return len(self._ops)
+
+    def __getitem__(self, index: int):
+        size = len(self._ops)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("history index out of range")
+        return self._build((self._start + index) % size)
+
+    def __iter__(self) -> Iterator:
+        size = len(self._ops)
+        for index in range(size):
+            yield self._build((self._start + index) % size)
@@ -1,49 +1,95 @@
+from functools import lru_cache
+from calculator.registry import REGISTRY
+
 class Command:
+    __slots__ = ('_result',)  # Subclasses declare their operand slots so commands carry no __dict__
+    cacheable = True  # Whether equal operands always give the same result (see ResultCache)
+
     def execute(self):
         raise NotImplementedError("Subclasses must implement the 'execute' method.")
 
-class AddCommand(Command):
-    def __init__(self, a, b):
-        self.a = a
-        self.b = b
+    @property
+    def result(self):
+        """The result of the command, computed on first access and then stored."""
+        try:
+            return self._result
+        except AttributeError:
+            self._result = self.execute()
+            return self._result
 
-    def execute(self):
-        return self.a + self.b
+    @result.setter
+    def result(self, value):
+        self._result = value
 
-    def __repr__(self):
-        return f"Add {self.a} and {self.b} = {self.execute()}"
+class OperationCommand(Command):
+    """A command that applies a registered operation to its operands."""
+    __slots__ = ('a', 'b')
+    operation = None  # The Operation from the registry; subclasses set it
 
-class SubtractCommand(Command):
     def __init__(self, a, b):
         self.a = a
         self.b = b
 
     def execute(self):
-        return self.a - self.b
+        try:
+            return self.operation.call(self.a, self.b)
+        except Exception:
+            if not has_command_operands(self):
+                raise
+        # Only checked once the kernel has failed, so plain operands cost nothing extra
+        return with_operand_results(self).execute()
+
+class AddCommand(OperationCommand):
+    __slots__ = ()
+    operation = REGISTRY['add']
 
     def __repr__(self):
-        return f"Subtract {self.a} and {self.b} = {self.execute()}"
+        return f"Add {self.a} and {self.b} = {self.result}"
 
-class MultiplyCommand(Command):
-    def __init__(self, a, b):
-        self.a = a
-        self.b = b
-
-    def execute(self):
-        return self.a * self.b
+class SubtractCommand(OperationCommand):
+    __slots__ = ()
+    operation = REGISTRY['subtract']
 
     def __repr__(self):
-        return f"Multiply {self.a} and {self.b} = {self.execute()}"
+        return f"Subtract {self.a} and {self.b} = {self.result}"
 
-class DivideCommand(Command):
-    def __init__(self, a, b):
-        self.a = a
-        self.b = b
+class MultiplyCommand(OperationCommand):
+    __slots__ = ()
+    operation = REGISTRY['multiply']
 
-    def execute(self):
-        if self.b == 0:
-            raise ValueError("Cannot divide by zero.")
-        return self.a / self.b
+    def __repr__(self):
+        return f"Multiply {self.a} and {self.b} = {self.result}"
+
+class DivideCommand(OperationCommand):
+    __slots__ = ()
+    operation = REGISTRY['divide']
 
     def __repr__(self):
-        return f"Divide {self.a} by {self.b} = {self.execute()}"
+        return f"Divide {self.a} by {self.b} = {self.result}"
+
+@lru_cache(maxsize=None)
+def operand_names(command_class: type) -> tuple:
+    """Names of a command class's operand slots, e.g. ('a', 'b')."""
+    names = []
+    for klass in reversed(command_class.__mro__):
+        slots = klass.__dict__.get('__slots__', ())
+        names.extend(name for name in ((slots,) if isinstance(slots, str) else slots)
+                     if name != '_result')
+    return tuple(names)
+
+def has_command_operands(command: Command) -> bool:
+    """Whether any operand of a command is itself a command, as CommandGraph allows."""
+    return any(isinstance(getattr(command, name), Command) for name in operand_names(type(command)))
+
+def with_operand_results(command: Command) -> Command:
+    """A copy of a command with its command operands replaced by their results."""
+    bound = type(command).__new__(type(command))
+    for name in operand_names(type(command)):
+        value = getattr(command, name)
+        setattr(bound, name, value.result if isinstance(value, Command) else value)
+    return bound
+
+def operation_arity(command_class: type) -> int:
+    """How many operands a command class takes, from its registered operation."""
+    operation = getattr(command_class, 'operation', None)
+    return operation.arity if operation is not None else len(operand_names(command_class))
@@ -0,0 +1,135 @@
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Set
+from calculator.cache import _operand_key
+from calculator.commands import Command, operand_names
+from calculator.pool import run_command
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+    from calculator.backends import NumericBackend
+
+def operands(command: Command) -> tuple:
+    return tuple(getattr(command, name) for name in operand_names(type(command)))
+
+def _has_result(command: Command) -> bool:
+    try:
+        command._result
+    except AttributeError:
+        return False
+    return True
+
+class CommandGraph:
+    """Commands whose operands may be other commands, deduplicated into a DAG.
+
+    Equal subcommands (same type and operands) become one node, so a shared
+    intermediate is computed once and its result is stored on every command
+    that asked for it. Nodes are numbered in dependency order.
+    """
+
+    def __init__(self):
+        self.commands: List[Command] = []  # One representative command per node
+        self.dependencies: List[tuple] = []  # Nodes each node's operands refer to
+        self.members: List[List[Command]] = []  # Every command that maps to the node
+        self.results: Dict[int, object] = {}
+        self._by_key: Dict[tuple, int] = {}
+        self._by_object: Dict[int, int] = {}  # id(command) -> node
+
+    def __len__(self):
+        return len(self.commands)
+
+    def add(self, command: Command) -> int:
+        """Add a command and everything it depends on, returning its node."""
+        stack = [(command, False)]
+        while stack:  # Iterative post-order, so long chains do not hit the recursion limit
+            current, expanded = stack.pop()
+            if id(current) in self._by_object:
+                continue
+            values = operands(current)
+            if not expanded:
+                stack.append((current, True))
+                stack.extend((value, False) for value in values if isinstance(value, Command))
+                continue
+            self._insert(current, values)
+        return self._by_object[id(command)]
+
+    def _insert(self, command: Command, values: tuple):
+        children = tuple(self._by_object[id(value)] for value in values if isinstance(value, Command))
+        key = (type(command), id(command))  # Unique unless the command can be shared
+        if command.cacheable:
+            shared_key = (type(command), tuple(('node', self._by_object[id(value)])
+                                               if isinstance(value, Command) else _operand_key(value)
+                                               for value in values))
+            try:
+                hash(shared_key)
+                key = shared_key
+            except TypeError:  # e.g. a list operand
+                pass
+        node = self._by_key.get(key)
+        if node is None:
+            node = self._by_key[key] = len(self.commands)
+            self.commands.append(command)
+            self.dependencies.append(children)
+            self.members.append([])
+            if _has_result(command):
+                self.results[node] = command._result  # Evaluated before; nothing to do
+        self.members[node].append(command)
+        if node in self.results and not _has_result(command):
+            command.result = self.results[node]
+        self._by_object[id(command)] = node
+
+    def needed(self, nodes: Iterable[int]) -> Set[int]:
+        """Nodes without a result that the given nodes depend on, including themselves."""
+        needed, stack = set(), [node for node in nodes if node not in self.results]
+        while stack:
+            node = stack.pop()
+            if node not in needed:
+                needed.add(node)
+                stack.extend(child for child in self.dependencies[node]
+                             if child not in self.results and child not in needed)
+        return needed
+
+    def bound(self, node: int) -> Command:
+        """The node's command with any command operands replaced by their results."""
+        command = self.commands[node]
+        if not self.dependencies[node]:
+            return command
+        bound = type(command).__new__(type(command))
+        for name, value in zip(operand_names(type(command)), operands(command)):
+            setattr(bound, name, self.results[self._by_object[id(value)]]
+                    if isinstance(value, Command) else value)
+        return bound
+
+    def _finish(self, node: int, result):
+        self.results[node] = result
+        for command in self.members[node]:
+            command.result = result
+
+    def evaluate(self, nodes: Iterable[int]):
+        """Compute the given nodes and only what they depend on, one at a time."""
+        for node in sorted(self.needed(nodes)):  # Node numbers are a dependency order
+            self._finish(node, self.bound(node).execute())
+
+    def evaluate_parallel(self, executor: 'Executor', nodes: Iterable[int],
+                          backend: Optional['NumericBackend'] = None):
+        """Compute the given nodes on an executor, running independent branches at once."""
+        from concurrent.futures import FIRST_COMPLETED, wait
+        needed = self.needed(nodes)
+        waiting = {node: sum(child in needed for child in self.dependencies[node]) for node in needed}
+        dependents: Dict[int, list] = {}
+        for node in needed:
+            for child in self.dependencies[node]:
+                if child in needed:
+                    dependents.setdefault(child, []).append(node)
+        ready = [node for node, count in waiting.items() if not count]
+        running = {}
+        while ready or running:
+            for node in ready:
+                running[executor.submit(run_command, self.bound(node), backend)] = node
+            ready = []
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                node = running.pop(future)
+                self._finish(node, future.result())  # A failed node stops the evaluation
+                for dependent in dependents.get(node, ()):
+                    waiting[dependent] -= 1
+                    if not waiting[dependent]:
+                        ready.append(dependent)
@@ -0,0 +1,144 @@
+import importlib
+import importlib.util
+import json
+import os
+import pkgutil
+import sys
+from collections.abc import Mapping
+from typing import Dict, Iterator, Optional, Tuple
+
+PLUGIN_PACKAGE = 'calculator.plugins'
+PLUGIN_SUFFIX = '_plugin'
+ENTRY_POINT_GROUP = 'calculator.plugins'
+MANIFEST_VERSION = 1
+
+def default_manifest_path() -> str:
+    """Location of the plugin manifest cache, overridable with CALCULATOR_PLUGIN_MANIFEST."""
+    return os.environ.get('CALCULATOR_PLUGIN_MANIFEST') or os.path.join(
+        os.path.expanduser('~'), '.cache', 'calculator', 'plugin_manifest.json')
+
+def _package_dir(package: str) -> str:
+    spec = importlib.util.find_spec(package)
+    return spec.submodule_search_locations[0]
+
+def discover_package_plugins(package: str = PLUGIN_PACKAGE) -> Dict[str, str]:
+    """Map operation names to `<name>_plugin` modules in a package, without importing them."""
+    plugins = {}
+    for module in pkgutil.iter_modules([_package_dir(package)]):
+        if module.name.endswith(PLUGIN_SUFFIX):
+            plugins[module.name[:-len(PLUGIN_SUFFIX)]] = f"{package}.{module.name}"
+    return plugins
+
+def discover_entry_point_plugins(group: str = ENTRY_POINT_GROUP) -> Dict[str, str]:
+    """Map operation names to the `module[:attribute]` targets of installed entry points."""
+    from importlib.metadata import entry_points  # Only needed when the manifest is stale
+    return {entry_point.name: entry_point.value for entry_point in entry_points(group=group)}
+
+def manifest_signature(package: str = PLUGIN_PACKAGE) -> dict:
+    """Modification times that invalidate the manifest when plugins are added or installed."""
+    paths = [_package_dir(package)] + [path for path in sys.path if path and os.path.isdir(path)]
+    signature = {}
+    for path in paths:
+        try:
+            signature[path] = os.stat(path).st_mtime_ns
+        except OSError:
+            continue
+    return {'version': MANIFEST_VERSION, 'mtimes': signature}
+
+def load_manifest(path: Optional[str] = None, package: str = PLUGIN_PACKAGE,
+                  group: str = ENTRY_POINT_GROUP) -> Dict[str, str]:
+    """Return the plugin manifest, rebuilding the cached copy when its signature is stale."""
+    path = path or default_manifest_path()
+    signature = manifest_signature(package)
+    try:
+        with open(path, encoding='utf-8') as manifest_file:
+            manifest = json.load(manifest_file)
+        if manifest.get('signature') == signature:
+            return manifest['plugins']
+    except (OSError, ValueError, KeyError, AttributeError):
+        pass  # Missing or unreadable manifest: rebuild it
+    plugins = discover_entry_point_plugins(group)
+    plugins.update(discover_package_plugins(package))  # Bundled plugins win over entry points
+    try:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as manifest_file:
+            json.dump({'signature': signature, 'plugins': plugins}, manifest_file)
+        os.replace(temp_path, path)
+    except OSError:
+        pass  # A read-only cache location only costs a rescan next time
+    return plugins
+
+def load_target(target: str):
+    """Import a plugin target and return its command class."""
+    module_name, _, attribute = target.partition(':')
+    module = importlib.import_module(module_name)
+    obj = getattr(module, attribute) if attribute else module.register
+    # Targets may name the command class itself or a register() function returning it
+    return obj if isinstance(obj, type) else obj()
+
+class PluginRegistry(Mapping):
+    """A mapping of operation names to command classes that imports each plugin on first use."""
+
+    def __init__(self, targets: Dict[str, object]):
+        # Values are either command classes or 'module[:attribute]' strings still to import
+        self._targets = dict(targets)
+        self._manifest = None  # (manifest path,) while discovery is deferred to the first lookup
+
+    @classmethod
+    def discover(cls, builtins: Optional[Dict[str, object]] = None,
+                 manifest_path: Optional[str] = None, lazy: bool = False) -> 'PluginRegistry':
+        """Build a registry from the plugin manifest; builtins take precedence.
+
+        With lazy=True the manifest is only read, and rebuilt if stale, on the first lookup.
+        """
+        registry = cls(builtins or {})
+        registry._manifest = (manifest_path,)
+        if not lazy:
+            registry._entries()
+        return registry
+
+    def _entries(self) -> Dict[str, object]:
+        if self._manifest is not None:
+            targets = load_manifest(*self._manifest)
+            targets.update(self._targets)
+            self._targets, self._manifest = targets, None
+        return self._targets
+
+    def is_loaded(self, name: str) -> bool:
+        """Whether the plugin for an operation has been imported."""
+        return isinstance(self._entries().get(name), type)
+
+    def __getitem__(self, name: str):
+        targets = self._entries()
+        target = targets[name]
+        if isinstance(target, str):
+            try:
+                target = load_target(target)
+            except (ImportError, AttributeError) as error:
+                raise ImportError(f"Failed to load plugin: {name}") from error
+            targets[name] = target
+        return target
+
+    def __contains__(self, name) -> bool:
+        return name in self._entries()  # Does not import the plugin
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._entries())
+
+    def __len__(self):
+        return len(self._entries())
+
+def find_command(operation_mappings, name: str) -> Tuple[Optional[type], Optional[str]]:
+    """Look up an operation's command class, returning (command class, None) or (None, error message).
+
+    A plugin that fails to import is reported as an unknown operation, with the
+    reason, rather than raising out of a session or a stream of records.
+    """
+    try:
+        return operation_mappings[name], None
+    except KeyError:
+        return None, f"Unknown operation: {name}"
+    except ImportError as error:
+        reason = f"{error}: {error.__cause__}" if error.__cause__ is not None else str(error)
+        return None, f"Unknown operation: {name} ({reason})"
@@ -0,0 +1,177 @@
+import re
+from decimal import Decimal, getcontext
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Tuple
+from calculator.operations import add, subtract, multiply, divide
+
+# Binary operators mapped to the calculator's primitive operations
+OPERATORS = {'+': add, '-': subtract, '*': multiply, '/': divide}
+
+_TOKEN = re.compile(r"\s*(?:(\d+\.?\d*(?:[eE][+-]?\d+)?|\.\d+(?:[eE][+-]?\d+)?)|([A-Za-z_]\w*)|(.))")
+
+# Instruction opcodes of the flat evaluator
+CONST, LOAD, APPLY = range(3)
+
+def tokenize(text: str) -> List[Tuple[str, str]]:
+    """Split an expression into ('num' | 'name' | 'sym', text) tokens."""
+    tokens = []
+    position = 0
+    text = text.rstrip()
+    while position < len(text):
+        match = _TOKEN.match(text, position)
+        number, name, symbol = match.groups()
+        if number is not None:
+            tokens.append(('num', number))
+        elif name is not None:
+            tokens.append(('name', name))
+        elif symbol in '+-*/()':
+            tokens.append(('sym', symbol))
+        else:
+            raise ValueError(f"Invalid expression: unexpected character {symbol!r}")
+        position = match.end()
+    return tokens
+
+class _Parser:
+    """Recursive-descent parser producing a constant-folded syntax tree.
+
+    Nodes are ('const', value), ('var', name) or ('op', function, left, right).
+    """
+
+    def __init__(self, text: str):
+        self.tokens = tokenize(text)
+        self.position = 0
+
+    def parse(self):
+        if not self.tokens:
+            raise ValueError("Invalid expression: empty expression")
+        node = self.expression()
+        if self.position != len(self.tokens):
+            raise ValueError(f"Invalid expression: unexpected {self.tokens[self.position][1]!r}")
+        return node
+
+    def peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else (None, None)
+
+    def take(self):
+        token = self.peek()
+        self.position += 1
+        return token
+
+    def expression(self):
+        node = self.term()
+        while self.peek() in (('sym', '+'), ('sym', '-')):
+            node = fold(OPERATORS[self.take()[1]], node, self.term())
+        return node
+
+    def term(self):
+        node = self.unary()
+        while self.peek() in (('sym', '*'), ('sym', '/')):
+            node = fold(OPERATORS[self.take()[1]], node, self.unary())
+        return node
+
+    def unary(self):
+        if self.peek() == ('sym', '-'):
+            self.take()
+            return fold(subtract, ('const', Decimal(0)), self.unary())
+        if self.peek() == ('sym', '+'):
+            self.take()
+            return self.unary()
+        return self.primary()
+
+    def primary(self):
+        kind, text = self.take()
+        if kind == 'num':
+            return ('const', Decimal(text))
+        if kind == 'name':
+            return ('var', text)
+        if (kind, text) == ('sym', '('):
+            node = self.expression()
+            if self.take() != ('sym', ')'):
+                raise ValueError("Invalid expression: missing ')'")
+            return node
+        raise ValueError("Invalid expression: unexpected end" if kind is None
+                         else f"Invalid expression: unexpected {text!r}")
+
+def fold(operation, left, right):
+    """Build an operation node, computing it now if both operands are constants."""
+    if left[0] == 'const' and right[0] == 'const':
+        try:
+            return ('const', operation(left[1], right[1]))
+        except (ValueError, ArithmeticError):
+            pass  # Leave errors such as division by zero to evaluation time
+    return ('op', operation, left, right)
+
+def _emit(node, instructions: list):
+    """Append the postfix instructions for a node."""
+    if node[0] == 'const':
+        instructions.append((CONST, node[1]))
+    elif node[0] == 'var':
+        instructions.append((LOAD, node[1]))
+    else:
+        _emit(node[2], instructions)
+        _emit(node[3], instructions)
+        instructions.append((APPLY, node[1]))
+
+def _to_decimal(value):
+    return value if isinstance(value, Decimal) else Decimal(str(value))
+
+class CompiledExpression:
+    """An expression compiled once into a flat list of stack instructions."""
+
+    __slots__ = ('text', 'instructions', 'variables')
+
+    def __init__(self, text: str, instructions: list):
+        self.text = text
+        self.instructions = tuple(instructions)
+        # Variable names in first-use order
+        self.variables = tuple(dict.fromkeys(arg for op, arg in instructions if op == LOAD))
+
+    @property
+    def is_constant(self) -> bool:
+        """Whether the expression folded down to a single value."""
+        return len(self.instructions) == 1 and self.instructions[0][0] == CONST
+
+    def evaluate(self, bindings: Dict[str, object] = None, /, **values) -> Decimal:
+        """Evaluate the expression with variable values from a mapping or keywords."""
+        if bindings:
+            values = {**bindings, **values}
+        stack = []
+        push, pop = stack.append, stack.pop
+        for opcode, argument in self.instructions:
+            if opcode == CONST:
+                push(argument)
+            elif opcode == LOAD:
+                try:
+                    push(_to_decimal(values[argument]))
+                except KeyError:
+                    raise ValueError(f"Missing value for variable: {argument}") from None
+            else:
+                right = pop()
+                push(argument(pop(), right))
+        return stack[0]
+
+    __call__ = evaluate
+
+    def evaluate_many(self, bindings: Iterable[Dict[str, object]]) -> Iterator[Decimal]:
+        """Evaluate the expression once per set of bindings."""
+        for values in bindings:
+            yield self.evaluate(values)
+
+    def __repr__(self):
+        return f"CompiledExpression({self.text!r})"
+
+def compile_expression(text: str) -> CompiledExpression:
+    """Parse, constant-fold and compile an expression, caching it by its text and decimal context."""
+    context = getcontext()
+    # Folded constants are rounded under the context active at compile time, e.g. 1/3 to its precision
+    return _compile(text, context.prec, context.rounding, context.Emax, context.Emin, context.clamp)
+
+@lru_cache(maxsize=512)
+def _compile(text: str, *context_key) -> CompiledExpression:
+    instructions = []
+    _emit(_Parser(text).parse(), instructions)
+    return CompiledExpression(text, instructions)
+
+def evaluate(text: str, bindings: Dict[str, object] = None, /, **values) -> Decimal:
+    """Evaluate an expression string, reusing its compiled form when seen before."""
+    return compile_expression(text).evaluate(bindings, **values)
@@ -0,0 +1,300 @@
+import heapq
+import itertools
+import json
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import deque
+from collections.abc import Sequence
+from itertools import chain, islice
+from typing import Iterable, Iterator, List, Optional
+from calculator.calculation import Calculation
+from calculator.commands import operand_names
+
+def operation_name(entry) -> str:
+    """Return the operation name of a history entry (Calculation or Command)."""
+    operation = getattr(entry, 'operation', None)
+    if operation is not None:
+        return operation.__name__
+    # Commands are named after their class, e.g. AddCommand -> add
+    name = type(entry).__name__
+    return name[:-len('Command')].lower() if name.endswith('Command') else name.lower()
+
+def entry_operands(entry) -> tuple:
+    """Return the operands of a history entry in constructor order, e.g. (a, b) or (a, b, modulus)."""
+    if isinstance(entry, Calculation):
+        return entry.a, entry.b
+    return tuple(getattr(entry, name) for name in operand_names(type(entry)))
+
+class RingBuffer:
+    """A list-backed buffer with O(1) append and indexing that keeps at most `capacity` items."""
+
+    def __init__(self, capacity: Optional[int] = None):
+        if capacity is not None and capacity < 1:
+            raise ValueError("capacity must be a positive integer or None")
+        self.capacity = capacity  # None means unbounded
+        self._items = []
+        self._start = 0  # Position of the oldest item once the buffer has wrapped
+        self.total = 0  # Number of items ever appended; the next item's sequence number
+
+    @property
+    def first_seq(self) -> int:
+        """Sequence number of the oldest item still held."""
+        return self.total - len(self._items)
+
+    def get_by_seq(self, seq: int):
+        """Return the item with the given sequence number."""
+        position = seq - self.first_seq
+        if position < 0:
+            raise IndexError(f"history entry {seq} has been evicted")
+        return self[position]
+
+    def append(self, item):
+        """Add an item and return the evicted oldest item, or None if nothing was evicted."""
+        self.total += 1
+        if self.capacity is None or len(self._items) < self.capacity:
+            self._items.append(item)
+            return None
+        evicted = self._items[self._start]
+        self._items[self._start] = item
+        self._start = (self._start + 1) % self.capacity
+        return evicted
+
+    def clear(self):
+        """Remove every item. Sequence numbers keep counting up."""
+        self._items.clear()
+        self._start = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def __getitem__(self, index: int):
+        size = len(self._items)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("history index out of range")
+        return self._items[(self._start + index) % size]
+
+    def __iter__(self) -> Iterator:
+        # Oldest to newest, without copying the underlying list
+        return chain(islice(self._items, self._start, None), islice(self._items, 0, self._start))
+
+class _Postings:
+    """Sequence numbers and timestamps of one operation's entries, oldest first."""
+
+    __slots__ = ('seqs', 'times', 'head')
+
+    def __init__(self):
+        # Packed, so each entry costs 16 bytes rather than two object pointers and two objects
+        self.seqs = array('q')
+        self.times = array('d')
+        self.head = 0  # Entries before head have been evicted
+
+    def __len__(self):
+        return len(self.seqs) - self.head
+
+    def pop_oldest(self):
+        """Forget the oldest entry, compacting once half the lists are dead."""
+        self.head += 1
+        if self.head > 32 and self.head * 2 > len(self.seqs):
+            del self.seqs[:self.head]
+            del self.times[:self.head]
+            self.head = 0
+
+class OperationIndex:
+    """Maps operation names to the sequence numbers of their history entries."""
+
+    def __init__(self):
+        self._postings = {}
+
+    def add(self, name: str, seq: int, timestamp: float):
+        """Record a new entry for an operation."""
+        postings = self._postings.get(name)
+        if postings is None:
+            postings = self._postings[name] = _Postings()
+        elif postings.times and timestamp < postings.times[-1]:
+            # Producers read the clock before their entries are numbered; keep times sorted for bisect
+            timestamp = postings.times[-1]
+        postings.seqs.append(seq)
+        postings.times.append(timestamp)
+
+    def evict(self, name: str):
+        """Forget the oldest entry of an operation (entries are evicted in order)."""
+        postings = self._postings[name]
+        postings.pop_oldest()
+        if not postings:
+            del self._postings[name]
+
+    def evict_before(self, seq: int):
+        """Forget every entry with a sequence number lower than seq."""
+        for name in list(self._postings):
+            postings = self._postings[name]
+            while postings and postings.seqs[postings.head] < seq:
+                postings.pop_oldest()
+            if not postings:
+                del self._postings[name]
+
+    def clear(self):
+        """Forget every entry."""
+        self._postings.clear()
+
+    def count(self, name: str) -> int:
+        """Number of entries for an operation."""
+        postings = self._postings.get(name)
+        return len(postings) if postings else 0
+
+    def operations(self) -> List[str]:
+        """Names of the operations that have entries."""
+        return list(self._postings)
+
+    def seqs(self, name: str, start: Optional[int] = None, stop: Optional[int] = None) -> List[int]:
+        """Sequence numbers of an operation's entries, optionally sliced."""
+        postings = self._postings.get(name)
+        if not postings:
+            return []
+        start, stop, _ = slice(start, stop).indices(len(postings))
+        return postings.seqs[postings.head + start:postings.head + stop].tolist()
+
+    def seqs_between(self, name: str, since: float, until: float) -> List[int]:
+        """Sequence numbers of an operation's entries recorded within [since, until]."""
+        postings = self._postings.get(name)
+        if not postings:
+            return []
+        low = bisect_left(postings.times, since, postings.head)
+        high = bisect_right(postings.times, until, low)
+        return postings.seqs[low:high].tolist()
+
+class HistoryView(Sequence):
+    """A read-only, zero-copy view over a history buffer."""
+
+    __slots__ = ('_buffer',)
+
+    def __init__(self, buffer):
+        self._buffer = buffer
+
+    def __len__(self):
+        return len(self._buffer)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._buffer[i] for i in range(*index.indices(len(self._buffer)))]
+        return self._buffer[index]
+
+    def __iter__(self) -> Iterator:
+        return iter(self._buffer)
+
+    def __repr__(self):
+        return f"HistoryView(size={len(self._buffer)})"
+
+class ShardedAppendBuffer:
+    """Per-thread append queues that are merged back into one ordered stream on drain.
+
+    Appending touches only the calling thread's deque (deque.append is atomic),
+    so producers never contend on a shared lock. Each item is stamped with a
+    global sequence number, and drain() merges the shards by that number.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards = []  # (owning thread, deque) pairs
+        self._shards_lock = threading.Lock()  # Only taken when a thread makes its first append
+        self._counter = itertools.count()
+        self._carry = []  # Items put back by requeue(), returned first by the next drain
+
+    def _shard(self) -> deque:
+        shard = deque()
+        with self._shards_lock:
+            self._shards.append((threading.current_thread(), shard))
+        self._local.shard = shard
+        return shard
+
+    def append(self, item) -> int:
+        """Queue an item from the calling thread and return that thread's queue length."""
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = self._shard()
+        shard.append((next(self._counter), item))
+        return len(shard)
+
+    def drain(self) -> Iterator:
+        """Remove every queued item and return them in sequence order.
+
+        Callers must serialise drains; appends may continue concurrently.
+        """
+        with self._shards_lock:
+            shards = list(self._shards)
+            # Forget the queues of threads that have exited once they are empty
+            self._shards = [(thread, shard) for thread, shard in shards
+                            if thread.is_alive() or shard]
+        carry, self._carry = self._carry, []
+        batches = []
+        for _, shard in shards:
+            batch = [shard.popleft() for _ in range(len(shard))]
+            if batch:
+                batches.append(batch)
+        if len(batches) == 1:
+            merged = (item for _, item in batches[0])
+        else:
+            merged = (item for _, item in heapq.merge(*batches, key=lambda pair: pair[0]))
+        return chain(carry, merged)
+
+    def requeue(self, items: Iterable):
+        """Put back drained items that were not consumed, ahead of everything queued since."""
+        self._carry = list(items) + self._carry
+
+    def __len__(self):
+        return len(self._carry) + sum(len(shard) for _, shard in self._shards)
+
+class DropOldest:
+    """Eviction policy that simply discards the oldest entry."""
+
+    def evict(self, entry):
+        """Discard the evicted entry."""
+
+    def close(self):
+        """Nothing to release."""
+
+class SpillToDisk:
+    """Eviction policy that appends evicted entries to a JSON lines file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None  # Opened lazily on the first eviction
+
+    def evict(self, entry):
+        """Write the evicted entry to the spill file."""
+        if self._file is None:
+            self._file = open(self.path, 'a', encoding='utf-8')
+        operands = entry_operands(entry)
+        record = {'operation': operation_name(entry), 'arity': len(operands),
+                  'operands': [str(value) for value in operands]}
+        self._file.write(json.dumps(record) + '\n')
+
+    def close(self):
+        """Flush and close the spill file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def read(self) -> Iterator[dict]:
+        """Stream spilled entries back from disk, oldest first."""
+        if self._file is not None:
+            self._file.flush()
+        try:
+            with open(self.path, encoding='utf-8') as spill_file:
+                for line in spill_file:
+                    yield json.loads(line)
+        except FileNotFoundError:
+            return
+
+def make_eviction_policy(eviction: str = 'drop_oldest', spill_path: Optional[str] = None):
+    """Create an eviction policy from its name."""
+    if eviction == 'drop_oldest':
+        return DropOldest()
+    if eviction == 'spill':
+        if not spill_path:
+            raise ValueError("spill eviction requires a spill_path")
+        return SpillToDisk(spill_path)
+    raise ValueError(f"Unknown eviction policy: {eviction}")
@@ -0,0 +1,184 @@
+import csv
+import struct
+import sys
+from array import array
+from itertools import islice
+from typing import Iterable, Iterator
+from calculator.calculation import Calculation
+from calculator.columnar import _NO_RESULT, OBJECT, pack_operand, unpack_operand
+from calculator.history import entry_operands, operation_name
+from calculator.history_log import (SEPARATOR, _decode_operand, _encode_operand, _resolve,
+                                    build_entry, entry_reference)
+
+MAGIC = b'CALCHX1\n'
+# Entries per chunk; memory use is bounded by one chunk whatever the history size
+EXPORT_CHUNK_SIZE = 65536
+# Entries in the chunk, then the byte lengths of its new operation references and its object operands
+CHUNK_HEADER = struct.Struct('<III')
+EXPORT_FORMATS = ('binary', 'csv')
+# Rows hold `arity` operand cells after these fields, e.g. one for factorial and three for modpow.
+# `result` is empty for entries without a stored result, e.g. Calculations
+CSV_FIELDS = ('operation', 'kind', 'target', 'result', 'arity', 'operands')
+
+def _stored_result(entry):
+    """A command's already computed result, or _NO_RESULT; exported so import does not execute it again."""
+    return getattr(entry, '_result', _NO_RESULT)
+
+def _with_result(entry, result):
+    """Give a rebuilt command its exported result."""
+    if result is not _NO_RESULT:
+        entry.result = result
+    return entry
+
+def _little_endian(column: array) -> array:
+    if sys.byteorder == 'big':
+        column.byteswap()  # The file is little-endian on every host
+    return column
+
+def _write_binary(entries: Iterator, out, chunk_size: int) -> int:
+    """Write entries as column chunks: operation codes, arities, result flags and value columns.
+
+    Each entry's values are its operands followed by its stored result, if it
+    has one, as kinds, payloads and exponents.
+    """
+    out.write(MAGIC)
+    codes = {}  # (operation, True) or (command class, False) -> operation code, shared by all chunks
+    count = 0
+    while True:
+        chunk = list(islice(entries, chunk_size))
+        if not chunk:
+            return count
+        references, objects = [], []
+        ops, arities, flags = array('H'), array('B'), array('B')
+        kinds, payloads, exponents = array('B'), array('q'), array('b')
+        for entry in chunk:
+            # Commands carry their registered operation too, so key Calculations separately
+            target = (entry.operation, True) if isinstance(entry, Calculation) else (type(entry), False)
+            code = codes.get(target)
+            if code is None:
+                code = codes[target] = len(codes)
+                references.append(b''.join(entry_reference(entry)))  # b'C' or b'K', then module:qualname
+            ops.append(code)
+            operands = entry_operands(entry)
+            arities.append(len(operands))
+            result = _stored_result(entry)
+            flags.append(result is not _NO_RESULT)
+            for value in operands if result is _NO_RESULT else (*operands, result):
+                packed = pack_operand(value)
+                if packed is None:  # e.g. a huge int: stored as tagged text after the columns
+                    objects.append(_encode_operand(value))
+                    packed = (OBJECT, 0, 0)
+                kind, payload, exponent = packed
+                kinds.append(kind)
+                payloads.append(payload)
+                exponents.append(exponent)
+        reference_bytes = SEPARATOR.join(references)
+        object_bytes = SEPARATOR.join(objects)
+        out.write(CHUNK_HEADER.pack(len(chunk), len(reference_bytes), len(object_bytes)))
+        out.write(reference_bytes)
+        for column in (ops, arities, flags, kinds, payloads, exponents):
+            out.write(_little_endian(column).tobytes())
+        out.write(object_bytes)
+        count += len(chunk)
+
+def _read_exact(source, size: int) -> bytes:
+    data = source.read(size)
+    if len(data) != size:
+        raise ValueError("Truncated history export")
+    return data
+
+def _column(typecode: str, data: bytes) -> array:
+    column = array(typecode)
+    column.frombytes(data)
+    return _little_endian(column)
+
+def _read_binary(source) -> Iterator:
+    factories = []  # Operation code -> callable building an entry from its operands
+    while True:
+        header = source.read(CHUNK_HEADER.size)
+        if not header:
+            return
+        if len(header) != CHUNK_HEADER.size:
+            raise ValueError("Truncated history export")
+        size, reference_length, object_length = CHUNK_HEADER.unpack(header)
+        if reference_length:
+            factories.extend(_factory(raw[:1], raw[1:])
+                             for raw in _read_exact(source, reference_length).split(SEPARATOR))
+        ops = _column('H', _read_exact(source, 2 * size))
+        arities = _column('B', _read_exact(source, size))
+        flags = _column('B', _read_exact(source, size))
+        slots = sum(arities) + sum(flags)
+        kinds = _column('B', _read_exact(source, slots))
+        payloads = _column('q', _read_exact(source, 8 * slots))
+        exponents = _column('b', _read_exact(source, slots))
+        # Decode a whole chunk of values at once, then patch in the object values
+        values = list(map(unpack_operand, kinds, payloads, exponents))
+        if object_length:
+            objects = _read_exact(source, object_length).split(SEPARATOR)
+            slots = [slot for slot, kind in enumerate(kinds) if kind == OBJECT]
+            for slot, raw in zip(slots, objects):
+                values[slot] = _decode_operand(raw)
+        end = 0
+        for code, arity, flag in zip(ops, arities, flags):
+            start, end = end, end + arity + flag
+            entry = factories[code](*values[start:start + arity])
+            yield _with_result(entry, values[start + arity]) if flag else entry
+
+def _factory(kind: bytes, reference: bytes):
+    """Resolve an operation reference once per file instead of once per entry."""
+    target = _resolve(reference, kind)
+    if kind == b'C':
+        return lambda *operands: Calculation(*operands, target)
+    return target  # The command class itself
+
+def _write_csv(entries: Iterator, out, chunk_size: int) -> int:
+    """Write entries as CSV rows of result, arity and operands; values keep a type tag, e.g. D1.5 or I3."""
+    writer = csv.writer(out, lineterminator='\n')
+    writer.writerow(CSV_FIELDS)
+    count = 0
+    while True:
+        chunk = list(islice(entries, chunk_size))
+        if not chunk:
+            return count
+        writer.writerows(_csv_row(entry) for entry in chunk)
+        count += len(chunk)
+
+def _csv_row(entry) -> tuple:
+    operands = entry_operands(entry)
+    result = _stored_result(entry)
+    return (operation_name(entry), *(part.decode() for part in entry_reference(entry)),
+            '' if result is _NO_RESULT else _encode_operand(result).decode(), len(operands),
+            *(_encode_operand(value).decode() for value in operands))
+
+def _read_csv(source) -> Iterator:
+    reader = csv.reader(source)
+    header = next(reader, None)
+    if header != list(CSV_FIELDS):
+        raise ValueError("Not a history CSV export")
+    for _, kind, target, result, arity, *operands in reader:
+        if len(operands) != int(arity):
+            raise ValueError(f"History CSV row has {len(operands)} operands, expected {arity}")
+        entry = build_entry(kind.encode(), target.encode(),
+                            *(_decode_operand(value.encode()) for value in operands))
+        yield _with_result(entry, _decode_operand(result.encode())) if result else entry
+
+def export_entries(entries: Iterable, path: str, fmt: str = 'binary',
+                   chunk_size: int = EXPORT_CHUNK_SIZE) -> int:
+    """Write history entries to a file in chunks and return how many were written."""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    if fmt == 'csv':
+        with open(path, 'w', encoding='utf-8', newline='') as out:
+            return _write_csv(iter(entries), out, chunk_size)
+    with open(path, 'wb') as out:
+        return _write_binary(iter(entries), out, chunk_size)
+
+def import_entries(path: str) -> Iterator:
+    """Lazily read the entries of a binary or CSV export, detecting the format."""
+    with open(path, 'rb') as source:
+        binary = source.read(len(MAGIC)) == MAGIC
+        if binary:
+            yield from _read_binary(source)
+    if not binary:
+        with open(path, encoding='utf-8', newline='') as source:
+            yield from _read_csv(source)
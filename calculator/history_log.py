@@ -0,0 +1,290 @@
+import importlib
+import mmap
+import os
+import struct
+import zlib
+from array import array
+from decimal import Decimal
+from typing import Iterator, Optional
+from calculator.calculation import Calculation
+from calculator.commands import Command
+from calculator.history import entry_operands, operation_name
+from calculator.registry import Operation
+
+MAGIC = b'CALCLOG1'
+HEADER = struct.Struct('<II')  # Payload length, CRC32 of the payload
+SEPARATOR = b'\x1f'
+ITEM_SEPARATOR = b'\x1e'  # Between the items of a sequence operand, e.g. a reduction's values
+CLEAR_MARKER = b'\x00clear'  # Payload of the record written by clear_history
+
+# Operand type tags, so values come back with their original type
+_ENCODERS = {Decimal: b'D', int: b'I', float: b'F', bool: b'B'}
+_DECODERS = {
+    ord('D'): Decimal,
+    ord('I'): int,
+    ord('F'): float,
+    ord('B'): lambda text: text == 'True',
+}
+_SEQUENCES = (list, tuple, array)  # Logged with tag L and read back as a list
+
+def _encode_number(value) -> bytes:
+    tag = _ENCODERS.get(type(value))
+    if tag is None:
+        raise TypeError(f"Cannot log operand of type {type(value).__name__}")
+    return tag + (repr(value) if tag == b'F' else str(value)).encode()
+
+def _decode_number(raw: bytes):
+    return _DECODERS[raw[0]](raw[1:].decode())
+
+def _encode_operand(value) -> bytes:
+    if isinstance(value, _SEQUENCES):
+        return b'L' + ITEM_SEPARATOR.join(map(_encode_number, value))
+    return _encode_number(value)
+
+def _decode_operand(raw: bytes):
+    if raw[0] == ord('L'):
+        return list(map(_decode_number, raw[1:].split(ITEM_SEPARATOR))) if len(raw) > 1 else []
+    return _decode_number(raw)
+
+def entry_reference(entry) -> tuple:
+    """Return (kind, b'module:qualname'): C and the operation of a Calculation, or K and a Command class."""
+    if isinstance(entry, Calculation):
+        target = entry.operation
+        kind = b'C'
+    else:
+        target = type(entry)
+        kind = b'K'
+    return kind, f"{target.__module__}:{target.__qualname__}".encode()
+
+def encode_entry(entry) -> bytes:
+    """Serialise a Calculation or Command into a log record payload."""
+    kind, reference = entry_reference(entry)
+    operands = entry_operands(entry)
+    return SEPARATOR.join([operation_name(entry).encode(), kind, reference, b'%d' % len(operands),
+                           *map(_encode_operand, operands)])
+
+_resolved = {}
+
+def _trusted_module(module_name: str) -> bool:
+    """Whether a reference may name this module: the calculator package or a discovered plugin."""
+    if module_name == 'calculator' or module_name.startswith('calculator.'):
+        return True
+    from calculator.discovery import load_manifest  # Entry point plugins live in other packages
+    return any(target.partition(':')[0] == module_name for target in load_manifest().values())
+
+def _resolve(reference: bytes, kind: bytes = b'K'):
+    """Resolve a registered operation (kind C) or a command class (kind K), refusing anything else.
+
+    Logs and exports are data: a reference that names another module or
+    object is rejected before anything is imported or called.
+    """
+    target = _resolved.get((kind, reference))
+    if target is None:
+        text = reference.decode(errors='replace')
+        module_name, _, qualname = text.partition(':')
+        if kind not in (b'C', b'K') or not qualname or not _trusted_module(module_name):
+            raise ValueError(f"Refusing untrusted history reference: {text}")
+        try:
+            target = importlib.import_module(module_name)
+            for attribute in qualname.split('.'):
+                target = getattr(target, attribute)
+        except (ImportError, AttributeError):
+            raise ValueError(f"Unknown history reference: {text}") from None
+        if (kind == b'C' and not isinstance(target, Operation)) or \
+                (kind == b'K' and not (isinstance(target, type) and issubclass(target, Command))):
+            raise ValueError(f"Refusing untrusted history reference: {text}")
+        _resolved[(kind, reference)] = target
+    return target
+
+def decode_entry(payload: bytes):
+    """Rebuild a Calculation or Command from a log record payload."""
+    _, kind, reference, arity, *operands = payload.split(SEPARATOR)
+    if len(operands) != int(arity):
+        raise ValueError(f"Log record has {len(operands)} operands, expected {int(arity)}")
+    return build_entry(kind, reference, *map(_decode_operand, operands))
+
+def build_entry(kind: bytes, reference: bytes, *operands):
+    """Rebuild an entry from its entry_reference() and operands."""
+    target = _resolve(reference, kind)
+    return Calculation(*operands, target) if kind == b'C' else target(*operands)
+
+class HistoryLog:
+    """An append-only binary log of history entries, read back through mmap.
+
+    Each record is a length, a CRC32 and a payload. Appends are buffered and
+    fsynced every `sync_every` records. Opening the log only scans record
+    headers to build an offset table; entries are decoded one at a time when
+    read, and each record's CRC is checked when it is read. A torn record at the
+    tail, left by a crash mid-write, is truncated on open. `clear()` appends a marker so the log replays to an empty history,
+    and `compact()` rewrites the log without the cleared records.
+    """
+
+    def __init__(self, path: str, sync_every: int = 256):
+        if sync_every < 1:
+            raise ValueError("sync_every must be at least 1")
+        self.path = path
+        self.sync_every = sync_every
+        self._pending = 0  # Records written since the last fsync
+        self._offsets = array('Q')  # Start of each live record
+        self._map = None
+        self._mapped_size = 0
+        self._recover()
+        self._file = open(path, 'ab')
+
+    def _recover(self):
+        """Scan the record headers, dropping any torn record at the tail."""
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            with open(self.path, 'wb') as log_file:
+                log_file.write(MAGIC)
+            return
+        with open(self.path, 'r+b') as log_file:
+            if log_file.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"Not a history log: {self.path}")
+            with mmap.mmap(log_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                size = len(data)
+                offset = end = len(MAGIC)
+                while offset + HEADER.size <= size:
+                    length, crc = HEADER.unpack_from(data, offset)
+                    end = offset + HEADER.size + length
+                    if end > size:
+                        break
+                    payload_start = offset + HEADER.size
+                    if end == size and zlib.crc32(data[payload_start:end]) != crc:
+                        break  # The final record was only partly written
+                    if data[payload_start:end] == CLEAR_MARKER:
+                        self._offsets = array('Q')
+                    else:
+                        self._offsets.append(offset)
+                    offset = end
+            if offset < size:
+                log_file.truncate(offset)
+
+    def _write(self, payload: bytes):
+        self._file.write(HEADER.pack(len(payload), zlib.crc32(payload)))
+        self._file.write(payload)
+        self._pending += 1
+        if self._pending >= self.sync_every:
+            self.sync()
+
+    @staticmethod
+    def encode(entry) -> bytes:
+        """The record payload of an entry; raises TypeError for operands the log cannot store."""
+        return encode_entry(entry)
+
+    def append(self, entry, payload: Optional[bytes] = None):
+        """Append an entry to the log, given its encode_entry() payload if already encoded."""
+        offset = self._file.tell()
+        self._write(encode_entry(entry) if payload is None else payload)
+        self._offsets.append(offset)
+
+    def clear(self):
+        """Record that the history was cleared."""
+        self._write(CLEAR_MARKER)
+        self._offsets = array('Q')
+
+    def sync(self):
+        """Flush buffered records and fsync them to disk."""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._pending = 0
+
+    def _payload(self, offset: int, verify: bool = True) -> bytes:
+        if offset + HEADER.size > self._mapped_size:
+            self._remap()  # The record was appended after the file was last mapped
+        length, crc = HEADER.unpack_from(self._map, offset)
+        start = offset + HEADER.size
+        payload = self._map[start:start + length]
+        # Opening only checks the final record, so every record is checked as it is read
+        if verify and (len(payload) != length or zlib.crc32(payload) != crc):
+            raise ValueError(f"Corrupt history log record at byte {offset}: {self.path}")
+        return payload
+
+    def _remap(self):
+        self._file.flush()
+        self._close_map()
+        size = os.path.getsize(self.path)
+        with open(self.path, 'rb') as log_file:
+            self._map = mmap.mmap(log_file.fileno(), size, access=mmap.ACCESS_READ)
+        self._mapped_size = size
+
+    def _close_map(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+            self._mapped_size = 0
+
+    def raw(self, index: int) -> bytes:
+        """Return the encoded payload of an entry without decoding it."""
+        return self._payload(self._offsets[index])
+
+    def iter_raw(self) -> Iterator[bytes]:
+        """Yield encoded payloads, oldest first."""
+        for offset in self._offsets:
+            yield self._payload(offset)
+
+    def count_operation(self, name: str) -> int:
+        """Count entries of an operation by matching payload prefixes, without decoding or CRC checks."""
+        prefix = name.encode() + SEPARATOR
+        return sum(1 for offset in self._offsets if self._payload(offset, False).startswith(prefix))
+
+    def find_by_operation(self, name: str) -> Iterator:
+        """Yield decoded entries of an operation, oldest first."""
+        prefix = name.encode() + SEPARATOR
+        for payload in self.iter_raw():
+            if payload.startswith(prefix):
+                yield decode_entry(payload)
+
+    def tail(self, count: int) -> Iterator:
+        """Yield the newest `count` entries, oldest first."""
+        for index in range(max(len(self) - count, 0), len(self)):
+            yield self[index]
+
+    def compact(self, keep_last: Optional[int] = None):
+        """Rewrite the log with only the live entries (optionally just the newest ones)."""
+        offsets = self._offsets
+        if keep_last is not None:
+            offsets = offsets[max(len(offsets) - keep_last, 0):] if keep_last > 0 else []
+        temp_path = self.path + '.compact'
+        new_offsets = array('Q')
+        try:
+            with open(temp_path, 'wb') as temp_file:
+                temp_file.write(MAGIC)
+                for offset in offsets:
+                    payload = self._payload(offset)  # Checked, so corruption is not given a fresh CRC
+                    new_offsets.append(temp_file.tell())
+                    temp_file.write(HEADER.pack(len(payload), zlib.crc32(payload)))
+                    temp_file.write(payload)
+                temp_file.flush()
+                os.fsync(temp_file.fileno())
+        except BaseException:
+            os.remove(temp_path)
+            raise
+        self._file.close()
+        self._close_map()
+        os.replace(temp_path, self.path)  # Atomic, so a crash leaves either the old or new log
+        self._offsets = new_offsets
+        self._pending = 0
+        self._file = open(self.path, 'ab')
+
+    def close(self):
+        """Sync and close the log."""
+        if not self._file.closed:
+            self.sync()
+            self._file.close()
+        self._close_map()
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def __getitem__(self, index: int):
+        return decode_entry(self._payload(self._offsets[index]))
+
+    def __iter__(self) -> Iterator:
+        for offset in self._offsets:
+            yield decode_entry(self._payload(offset))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,77 @@
+import decimal
+import math
+from decimal import Decimal
+from typing import Optional
+
+# n! for small n, so the most common requests are a tuple lookup
+SMALL_FACTORIALS = tuple(math.factorial(n) for n in range(101))
+
+# Extra digits carried through Decimal exponentiation by squaring before the final rounding
+GUARD_DIGITS = 10
+
+# Bits per decimal digit, to bound a Decimal's size from its exponent without converting it
+LOG2_10 = math.log2(10)
+
+def is_integral(value) -> bool:
+    """Whether a number is an int or an integral, finite Decimal or float."""
+    if isinstance(value, int):
+        return True
+    if isinstance(value, Decimal):
+        return value.is_finite() and value == value.to_integral_value()
+    return isinstance(value, float) and value.is_integer()
+
+def as_integer(value, name: str, max_bits: Optional[int] = None) -> int:
+    """Return an integral operand as an int, or raise ValueError.
+
+    With `max_bits`, a Decimal that is certainly larger is refused by its
+    exponent before it is converted, since converting one with millions of
+    digits to an int takes minutes. Callers still check the exact limit.
+    """
+    if not is_integral(value):
+        raise ValueError(f"{name} must be an integer, got {value}")
+    if max_bits is not None and isinstance(value, Decimal) and value.adjusted() * LOG2_10 >= max_bits:
+        raise ValueError(f"{name} size in bits exceeds the limit of {max_bits}")
+    return int(value)
+
+def like(result: int, *operands):
+    """Return an integer result as a Decimal when any operand was a Decimal."""
+    return Decimal(result) if any(isinstance(operand, Decimal) for operand in operands) else result
+
+def check_limit(value: int, limit: int, what: str):
+    """Refuse work whose size exceeds a configured limit."""
+    if value > limit:
+        raise ValueError(f"{what} exceeds the limit of {limit}")
+
+def factorial(n: int) -> int:
+    """n!, from the table for small n."""
+    if n < 0:
+        raise ValueError("Factorial is not defined for negative numbers.")
+    if n < len(SMALL_FACTORIALS):
+        return SMALL_FACTORIALS[n]
+    return math.factorial(n)  # CPython multiplies by binary splitting, in C
+
+def binomial(n: int, k: int) -> int:
+    """The number of ways to choose k items from n."""
+    if n < 0 or k < 0:
+        raise ValueError("Binomial coefficients need non-negative arguments.")
+    if k > n:
+        return 0
+    if n < len(SMALL_FACTORIALS):
+        return SMALL_FACTORIALS[n] // (SMALL_FACTORIALS[k] * SMALL_FACTORIALS[n - k])
+    return math.comb(n, k)  # Divide-and-conquer product of the k terms, in C
+
+def decimal_power(base: Decimal, exponent: int) -> Decimal:
+    """base ** exponent by squaring, rounded once to the current context's precision."""
+    context = decimal.getcontext()
+    with decimal.localcontext() as work:
+        work.prec = context.prec + GUARD_DIGITS + exponent.bit_length()  # Room for log2(n) roundings
+        result, square, remaining = Decimal(1), base, abs(exponent)
+        while remaining:
+            if remaining & 1:
+                result *= square
+            remaining >>= 1
+            if remaining:
+                square *= square
+        if exponent < 0:
+            result = 1 / result
+    return +result  # Unary plus rounds to the caller's context
@@ -0,0 +1,163 @@
+import json
+import threading
+from typing import Dict, Optional, Tuple
+
+# Each power of two of nanoseconds is split into 2**SUB_BUCKET_BITS buckets (about 12% wide)
+SUB_BUCKET_BITS = 3
+# Upper bounds, in seconds, of the buckets reported in the Prometheus export
+EXPORT_BOUNDS = (1e-6, 5e-6, 1e-5, 5e-5, 1e-4, 5e-4, 1e-3, 5e-3, 1e-2, 5e-2, 0.1, 0.5, 1.0, 5.0)
+
+def bucket_index(nanoseconds: int) -> int:
+    """Map a duration to its log-linear bucket."""
+    if nanoseconds < (1 << SUB_BUCKET_BITS):
+        return nanoseconds  # Small values get exact buckets
+    shift = nanoseconds.bit_length() - SUB_BUCKET_BITS - 1
+    return ((shift + 1) << SUB_BUCKET_BITS) + (nanoseconds >> shift) - (1 << SUB_BUCKET_BITS)
+
+def bucket_upper_bound(index: int) -> int:
+    """Largest duration, in nanoseconds, that falls into a bucket."""
+    if index < (1 << SUB_BUCKET_BITS):
+        return index
+    shift = (index >> SUB_BUCKET_BITS) - 1
+    mantissa = (index & ((1 << SUB_BUCKET_BITS) - 1)) + (1 << SUB_BUCKET_BITS)
+    return ((mantissa + 1) << shift) - 1
+
+class Histogram:
+    """An HDR-style latency histogram with log-linear buckets."""
+
+    __slots__ = ('buckets', 'count', 'total', 'minimum', 'maximum')
+
+    def __init__(self):
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0  # Sum of recorded seconds
+        self.minimum = None
+        self.maximum = None
+
+    def record(self, seconds: float):
+        """Add one duration in seconds."""
+        index = bucket_index(max(int(seconds * 1e9), 0))
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.minimum = seconds if self.minimum is None else min(self.minimum, seconds)
+        self.maximum = seconds if self.maximum is None else max(self.maximum, seconds)
+
+    def percentile(self, percent: float) -> float:
+        """Duration in seconds below which `percent` of the recorded values fall."""
+        if not self.count:
+            return 0.0
+        target = max(1, -(-self.count * percent // 100))  # Rank, rounded up
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= target:
+                return min(bucket_upper_bound(index) / 1e9, self.maximum)
+        return self.maximum
+
+    def cumulative(self, bounds=EXPORT_BOUNDS):
+        """Yield (upper bound in seconds, count of values at or below it)."""
+        ordered = sorted(self.buckets.items())
+        position = seen = 0
+        for bound in bounds:
+            limit = int(bound * 1e9)
+            while position < len(ordered) and bucket_upper_bound(ordered[position][0]) <= limit:
+                seen += ordered[position][1]
+                position += 1
+            yield bound, seen
+
+    def summary(self) -> dict:
+        """Count, sum, extremes and common percentiles."""
+        return {
+            'count': self.count, 'sum': self.total, 'min': self.minimum, 'max': self.maximum,
+            'p50': self.percentile(50), 'p90': self.percentile(90),
+            'p99': self.percentile(99), 'p999': self.percentile(99.9),
+        }
+
+class Metrics:
+    """Counters and latency histograms per operation and execution path.
+
+    Keys are (operation, path) pairs, where path is e.g. 'compute' or 'pool'.
+    A Calculator without a Metrics instance skips all of this with a single
+    attribute check, so instrumentation costs nothing when disabled.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.commands: Dict[Tuple[str, str], int] = {}
+        self.errors: Dict[Tuple[str, str], int] = {}
+        self.latency: Dict[Tuple[str, str], Histogram] = {}
+
+    def record(self, operation: str, path: str, seconds: float, error: bool = False):
+        """Count one command and record its duration."""
+        key = (operation, path)
+        with self._lock:
+            self.commands[key] = self.commands.get(key, 0) + 1
+            if error:
+                self.errors[key] = self.errors.get(key, 0) + 1
+            histogram = self.latency.get(key)
+            if histogram is None:
+                histogram = self.latency[key] = Histogram()
+            histogram.record(seconds)
+
+    def count(self, operation: str, path: str, amount: int = 1):
+        """Count commands without a latency measurement."""
+        key = (operation, path)
+        with self._lock:
+            self.commands[key] = self.commands.get(key, 0) + amount
+
+    def reset(self):
+        """Forget everything recorded so far."""
+        with self._lock:
+            self.commands.clear()
+            self.errors.clear()
+            self.latency.clear()
+
+    def snapshot(self) -> dict:
+        """A point-in-time copy of the metrics as plain data."""
+        with self._lock:
+            keys = sorted(set(self.commands) | set(self.latency))
+            return {
+                f"{operation}/{path}": {
+                    'operation': operation,
+                    'path': path,
+                    'commands': self.commands.get((operation, path), 0),
+                    'errors': self.errors.get((operation, path), 0),
+                    'latency': self.latency[(operation, path)].summary()
+                    if (operation, path) in self.latency else None,
+                }
+                for operation, path in keys
+            }
+
+    def to_json(self, indent: Optional[int] = None) -> str:
+        """Export a snapshot as JSON."""
+        return json.dumps(self.snapshot(), indent=indent)
+
+    def to_prometheus(self, prefix: str = 'calculator') -> str:
+        """Export a snapshot in the Prometheus text exposition format."""
+        with self._lock:
+            commands = sorted(self.commands.items())
+            errors = sorted(self.errors.items())
+            latency = sorted(self.latency.items())
+            lines = [f"# HELP {prefix}_commands_total Commands executed.",
+                     f"# TYPE {prefix}_commands_total counter"]
+            lines += [f'{prefix}_commands_total{_labels(key)} {value}' for key, value in commands]
+            lines += [f"# HELP {prefix}_command_errors_total Commands that raised an error.",
+                      f"# TYPE {prefix}_command_errors_total counter"]
+            lines += [f'{prefix}_command_errors_total{_labels(key)} {value}' for key, value in errors]
+            name = f"{prefix}_command_duration_seconds"
+            lines += [f"# HELP {name} Command execution latency.", f"# TYPE {name} histogram"]
+            for key, histogram in latency:
+                for bound, seen in histogram.cumulative():
+                    lines.append(f'{name}_bucket{_labels(key, le=repr(bound))} {seen}')
+                lines.append(f'{name}_bucket{_labels(key, le="+Inf")} {histogram.count}')
+                lines.append(f'{name}_sum{_labels(key)} {histogram.total!r}')
+                lines.append(f'{name}_count{_labels(key)} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+def _labels(key: Tuple[str, str], le: Optional[str] = None) -> str:
+    operation, path = key
+    labels = f'operation="{operation}",path="{path}"'
+    if le is not None:
+        labels += f',le="{le}"'
+    return '{' + labels + '}'
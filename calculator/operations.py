@@ -1,20 +1,7 @@
-from decimal import Decimal
+from calculator.registry import REGISTRY
 
-# Define the functions with type hints
-def add(a: Decimal, b: Decimal) -> Decimal:
-    """Perform addition of two Decimal numbers."""
-    return a + b
-
-def subtract(a: Decimal, b: Decimal) -> Decimal:
-    """Perform subtraction of two Decimal numbers."""
-    return a - b
-
-def multiply(a: Decimal, b: Decimal) -> Decimal:
-    """Perform multiplication of two Decimal numbers."""
-    return a * b
-
-def divide(a: Decimal, b: Decimal) -> Decimal:
-    """Perform division of two Decimal numbers, checking for division by zero."""
-    if b == 0:
-        raise ValueError("Cannot divide by zero")
-    return a / b
+# The built-in operations, dispatched through the shared operation registry
+add = REGISTRY['add']
+subtract = REGISTRY['subtract']
+multiply = REGISTRY['multiply']
+divide = REGISTRY['divide']
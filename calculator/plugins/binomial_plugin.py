@@ -0,0 +1,20 @@
+from calculator.commands import OperationCommand
+from calculator.integer_math import as_integer, binomial as integer_binomial, check_limit, like
+from calculator.registry import REGISTRY, Operation
+
+def binomial(a, b):
+    """The number of ways to choose b items from a."""
+    max_bits = BinomialCommand.max_argument.bit_length()
+    n = as_integer(a, "n", max_bits)
+    k = as_integer(b, "k", max_bits)
+    check_limit(n, BinomialCommand.max_argument, "n")
+    return like(integer_binomial(n, k), a, b)
+
+class BinomialCommand(OperationCommand):
+    __slots__ = ()
+    max_argument = 100_000  # Largest n accepted; central coefficients grow like 2**n
+    operation = REGISTRY.register(Operation('binomial', 2, binomial, module=__name__,
+                                            doc=binomial.__doc__), replace=True)
+
+def register():
+    return BinomialCommand
@@ -1,14 +1,9 @@
-from calculator.commands import Command
+from calculator.commands import OperationCommand
+from calculator.registry import REGISTRY
 
-class DivideCommand(Command):
-    def __init__(self, a, b):
-        self.a = a
-        self.b = b
-
-    def execute(self):
-        if self.b == 0:
-            raise ValueError("Cannot divide by zero")
-        return self.a / self.b
+class DivideCommand(OperationCommand):
+    __slots__ = ()
+    operation = REGISTRY['divide']
 
 def register():
     return DivideCommand
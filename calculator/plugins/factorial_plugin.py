@@ -0,0 +1,29 @@
+from calculator.commands import Command, has_command_operands, with_operand_results
+from calculator.integer_math import as_integer, check_limit, factorial as integer_factorial, like
+from calculator.registry import REGISTRY, Operation
+
+def factorial(a):
+    """a! for a non-negative integer a."""
+    n = as_integer(a, "Factorial argument", FactorialCommand.max_argument.bit_length())
+    check_limit(n, FactorialCommand.max_argument, "Factorial argument")
+    return like(integer_factorial(n), a)
+
+class FactorialCommand(Command):
+    __slots__ = ('a',)
+    max_argument = 20_000  # 20000! already has 77338 digits
+    operation = REGISTRY.register(Operation('factorial', 1, factorial, module=__name__,
+                                            doc=factorial.__doc__), replace=True)
+
+    def __init__(self, a):
+        self.a = a
+
+    def execute(self):
+        try:
+            return self.operation.call(self.a)
+        except Exception:
+            if not has_command_operands(self):
+                raise
+        return with_operand_results(self).execute()
+
+def register():
+    return FactorialCommand
@@ -0,0 +1,41 @@
+from calculator.commands import OperationCommand, has_command_operands, with_operand_results
+from calculator.integer_math import as_integer, check_limit, like
+from calculator.registry import REGISTRY, Operation
+
+def modpow(a, b, modulus):
+    """a ** b % modulus for integers, without building a ** b."""
+    base = as_integer(a, "Base", ModPowCommand.max_base_bits)
+    exponent = as_integer(b, "Exponent", ModPowCommand.max_exponent_bits)
+    modulus_value = as_integer(modulus, "Modulus", ModPowCommand.max_modulus_bits)
+    check_limit(exponent.bit_length(), ModPowCommand.max_exponent_bits, "Exponent size in bits")
+    check_limit(modulus_value.bit_length(), ModPowCommand.max_modulus_bits, "Modulus size in bits")
+    # Squares and reduces at every step, so intermediates never outgrow the modulus
+    return like(pow(base, exponent, modulus_value), a, b, modulus)
+
+def _zero_modulus(a, b, modulus):
+    return modulus == 0
+
+class ModPowCommand(OperationCommand):
+    __slots__ = ('modulus',)
+    max_base_bits = 1_000_000  # Larger Decimal bases are refused before conversion
+    max_exponent_bits = 1_000_000  # Each exponent bit costs one modular squaring
+    max_modulus_bits = 100_000  # Each squaring costs about the square of the modulus size
+    operation = REGISTRY.register(Operation('modpow', 3, modpow, invalid=_zero_modulus,
+                                            error="Modulus must not be zero.", module=__name__,
+                                            doc=modpow.__doc__), replace=True)
+
+    def __init__(self, a, b, modulus):
+        self.a = a
+        self.b = b
+        self.modulus = modulus
+
+    def execute(self):
+        try:
+            return self.operation.call(self.a, self.b, self.modulus)
+        except Exception:
+            if not has_command_operands(self):
+                raise
+        return with_operand_results(self).execute()
+
+def register():
+    return ModPowCommand
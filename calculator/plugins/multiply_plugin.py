@@ -1,15 +1,9 @@
-from calculator.commands import Command
+from calculator.commands import OperationCommand
+from calculator.registry import REGISTRY
 
-# Command class for multiplication
-class MultiplyCommand(Command):
-    def __init__(self, a, b):
-        self.a = a  # First operand
-        self.b = b  # Second operand
+class MultiplyCommand(OperationCommand):
+    __slots__ = ()
+    operation = REGISTRY['multiply']
 
-    def execute(self):
-        """Perform multiplication and return the result."""
-        return self.a * self.b
-
-# Register function to dynamically load the MultiplyCommand
 def register():
     return MultiplyCommand
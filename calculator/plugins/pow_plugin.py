@@ -0,0 +1,26 @@
+from decimal import Decimal
+from calculator.commands import OperationCommand
+from calculator.integer_math import as_integer, check_limit, decimal_power, is_integral
+from calculator.registry import REGISTRY, Operation
+
+def power(a, b):
+    """a ** b, by squaring for integral exponents."""
+    if not is_integral(b):
+        return a ** b  # Fractional exponents use the number type's own power
+    exponent = as_integer(b, "Exponent", PowCommand.max_exponent_bits)
+    check_limit(exponent.bit_length(), PowCommand.max_exponent_bits, "Exponent size in bits")
+    if isinstance(a, Decimal):
+        return decimal_power(a, exponent)  # Rounded to the context, so only the exponent is limited
+    if isinstance(a, int) and exponent > 0:
+        check_limit(a.bit_length() * exponent, PowCommand.max_result_bits, "Result size in bits")
+    return a ** exponent  # Built-in exponentiation by squaring
+
+class PowCommand(OperationCommand):
+    __slots__ = ()
+    max_exponent_bits = 64  # Beyond this only bases 0, 1 and -1 have results that fit in memory
+    max_result_bits = 10_000_000  # Integer results above this size (about 3 million digits) are refused
+    operation = REGISTRY.register(Operation('pow', 2, power, vector='power', module=__name__,
+                                            doc=power.__doc__), replace=True)
+
+def register():
+    return PowCommand
@@ -1,12 +1,9 @@
-from calculator.commands import Command
+from calculator.commands import OperationCommand
+from calculator.registry import REGISTRY
 
-class SubtractCommand(Command):
-    def __init__(self, a, b):
-        self.a = a
-        self.b = b
-
-    def execute(self):
-        return self.a - self.b
+class SubtractCommand(OperationCommand):
+    __slots__ = ()
+    operation = REGISTRY['subtract']
 
 def register():
     return SubtractCommand
@@ -0,0 +1,61 @@
+import os
+from itertools import repeat
+from typing import TYPE_CHECKING, Iterable, Iterator, Optional
+from calculator.commands import Command
+
+if TYPE_CHECKING:  # multiprocessing and concurrent.futures are imported when the workers start
+    from concurrent.futures import Future, ProcessPoolExecutor
+    from calculator.backends import NumericBackend
+
+def run_command(command: Command, backend: Optional['NumericBackend'] = None):
+    """Execute a command inside a worker process, under the backend's context, and return its result."""
+    if backend is not None:
+        with backend.context():  # Workers start with the default decimal context
+            return command.execute()
+    return command.execute()
+
+class WorkerPool:
+    """A long-lived pool of worker processes for executing commands."""
+
+    def __init__(self, max_workers: Optional[int] = None, start_method: Optional[str] = None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.start_method = start_method  # None means the platform default
+        self._executor = None  # Created lazily on first use
+
+    @property
+    def executor(self) -> 'ProcessPoolExecutor':
+        """Return the underlying executor, starting the workers if needed."""
+        if self._executor is None:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            context = multiprocessing.get_context(self.start_method)
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+        return self._executor
+
+    @property
+    def running(self) -> bool:
+        """Whether the workers have been started and not shut down."""
+        return self._executor is not None
+
+    def submit(self, command: Command, backend: Optional['NumericBackend'] = None) -> 'Future':
+        """Schedule a single command and return a Future for its result."""
+        return self.executor.submit(run_command, command, backend)
+
+    def map(self, commands: Iterable[Command], chunksize: int = 1,
+            backend: Optional['NumericBackend'] = None) -> Iterator:
+        """Execute commands in chunks and yield their results in order."""
+        if chunksize < 1:
+            raise ValueError("chunksize must be at least 1")
+        return self.executor.map(run_command, commands, repeat(backend), chunksize=chunksize)
+
+    def shutdown(self, wait: bool = True):
+        """Stop the workers. The pool restarts on the next submit or map."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
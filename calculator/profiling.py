@@ -0,0 +1,93 @@
+import cProfile
+import io
+import os
+import pstats
+import sys
+import tracemalloc
+from typing import Optional, TextIO
+from calculator.calculations import Calculations
+
+# Source files whose allocations count as history memory
+HISTORY_FILES = ('calculations.py', 'history.py', 'columnar.py', 'stats.py')
+# The profiler's own bookkeeping is left out of the allocation report
+_EXCLUDE = (tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__))
+
+class SessionProfiler:
+    """Profile a session with cProfile and tracemalloc, writing reports when it ends.
+
+    Writes `<prefix>.pstats` (readable by pstats and snakeviz),
+    `<prefix>.tracemalloc` (readable by tracemalloc.Snapshot.load) and a
+    `<prefix>.txt` summary of the slowest functions, the top allocation sites
+    and how much memory the history grew by per entry.
+
+    cProfile only records the thread that entered the profiler. Commands run on
+    the worker pool (offloaded server requests, parallel evaluation, reductions
+    and shared batches) appear only as the time spent waiting for their results,
+    and tracemalloc likewise only sees this process.
+    """
+
+    def __init__(self, prefix: str = 'calculator-profile', top: int = 20, frames: int = 1):
+        self.prefix = prefix
+        self.top = top
+        self.frames = frames  # Traceback depth tracemalloc keeps per allocation
+        self.profile = cProfile.Profile()
+        self.report: Optional[str] = None
+        self._baseline = None
+        self._entries = 0
+        self._was_tracing = False  # e.g. started with python -X tracemalloc
+
+    @property
+    def paths(self) -> dict:
+        return {kind: f"{self.prefix}.{kind}" for kind in ('pstats', 'tracemalloc', 'txt')}
+
+    def __enter__(self):
+        directory = os.path.dirname(self.prefix)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._entries = len(Calculations.get_history())
+        self._was_tracing = tracemalloc.is_tracing()
+        if not self._was_tracing:
+            tracemalloc.start(self.frames)
+        self._baseline = tracemalloc.take_snapshot().filter_traces(_EXCLUDE)
+        self.profile.enable()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.profile.disable()
+        snapshot = tracemalloc.take_snapshot().filter_traces(_EXCLUDE)
+        current, peak = tracemalloc.get_traced_memory()
+        if not self._was_tracing:
+            tracemalloc.stop()
+        entries = len(Calculations.get_history())
+        self.profile.dump_stats(self.paths['pstats'])
+        snapshot.dump(self.paths['tracemalloc'])
+        self.report = self._format_report(snapshot, current, peak, entries)
+        with open(self.paths['txt'], 'w', encoding='utf-8') as report_file:
+            report_file.write(self.report)
+
+    def _format_report(self, snapshot, current: int, peak: int, entries: int) -> str:
+        out = io.StringIO()
+        out.write(f"Top {self.top} functions by cumulative time\n")
+        pstats.Stats(self.profile, stream=out).sort_stats('cumulative').print_stats(self.top)
+
+        out.write(f"Top {self.top} allocation sites (growth during the session)\n")
+        for stat in snapshot.compare_to(self._baseline, 'lineno')[:self.top]:
+            out.write(f"  {stat}\n")
+
+        history_filter = [tracemalloc.Filter(True, f"*{os.sep}calculator{os.sep}{name}")
+                          for name in HISTORY_FILES]
+        history_growth = sum(stat.size_diff for stat in snapshot.filter_traces(history_filter)
+                             .compare_to(self._baseline.filter_traces(history_filter), 'filename'))
+        added = entries - self._entries
+        out.write("\nHistory memory\n")
+        out.write(f"  entries: {self._entries} -> {entries} ({added:+d})\n")
+        out.write(f"  growth in history structures: {history_growth} bytes")
+        out.write(f" ({history_growth / added:.1f} bytes per entry)\n" if added > 0 else "\n")
+        out.write(f"  traced memory: {current} bytes now, {peak} bytes at peak\n")
+        return out.getvalue()
+
+    def print_summary(self, stream: TextIO = sys.stderr):
+        """Tell the user where the reports were written."""
+        paths = self.paths
+        print(f"Profile written to {paths['pstats']} (open with snakeviz or pstats), "
+              f"{paths['tracemalloc']} and {paths['txt']}", file=stream)
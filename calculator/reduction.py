@@ -0,0 +1,131 @@
+import math
+from array import array
+from collections import deque
+from decimal import Decimal
+from itertools import islice
+from typing import TYPE_CHECKING, Iterable, Iterator, Optional
+from calculator.batch import FLOAT_TYPECODES
+from calculator.commands import Command
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+    from calculator.backends import NumericBackend
+
+# Values reduced per chunk; each chunk is one task when reducing on the worker pool
+REDUCTION_CHUNK_SIZE = 65536
+# Below this many values pairwise summation just adds them in order
+PAIRWISE_BLOCK = 128
+
+def pairwise_sum(values, start: int = 0, stop=None):
+    """Sum a sequence by recursive halving, so rounding error grows with log(n) instead of n."""
+    stop = len(values) if stop is None else stop
+    if stop - start <= PAIRWISE_BLOCK:
+        return sum(values[start:stop])
+    middle = (start + stop) // 2
+    return pairwise_sum(values, start, middle) + pairwise_sum(values, middle, stop)
+
+def accurate_sum(values):
+    """Sum exactly where possible: integers as is, floats with fsum, Decimals pairwise."""
+    if isinstance(values, array):
+        return math.fsum(values) if values.typecode in FLOAT_TYPECODES else sum(values)
+    kinds = set(map(type, values))
+    if kinds <= {int, bool}:
+        return sum(values)
+    if Decimal not in kinds:
+        return math.fsum(values)  # Compensated: correctly rounded whatever the order
+    return pairwise_sum(values)
+
+# Reduce one chunk; also combines the partial results of several chunks
+REDUCTIONS = {
+    'sum': accurate_sum,
+    'product': math.prod,
+    'min': min,
+    'max': max,
+}
+
+def reduce_chunk(op_name: str, chunk, backend: Optional['NumericBackend'] = None):
+    """Reduce one chunk of values. Runs in worker processes, so it is a top-level function."""
+    if backend is not None:
+        with backend.context():
+            return REDUCTIONS[op_name](chunk)
+    return REDUCTIONS[op_name](chunk)
+
+def iter_chunks(values: Iterable, chunk_size: int = REDUCTION_CHUNK_SIZE) -> Iterator:
+    """Split values into picklable chunks, slicing buffers and reading iterators lazily."""
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    if isinstance(values, memoryview):
+        # Memoryviews cannot be pickled; copy each slice into an array of the same type
+        for start in range(0, len(values), chunk_size):
+            yield array(values.format, values[start:start + chunk_size].tobytes())
+    elif hasattr(values, '__getitem__') and hasattr(values, '__len__'):
+        for start in range(0, len(values), chunk_size):
+            yield values[start:start + chunk_size]
+    else:
+        # Streams that may not fit in memory are read one chunk at a time
+        values = iter(values)
+        while True:
+            chunk = list(islice(values, chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+class ReductionCommand(Command):
+    """Reduce any number of values to one with the kernel named by `reduction`."""
+
+    __slots__ = ('values', 'chunk_size')
+    reduction = 'reduce'
+    cacheable = False  # The values may be a one-shot iterator
+
+    def __init__(self, values: Iterable, chunk_size: int = REDUCTION_CHUNK_SIZE):
+        self.values = values
+        self.chunk_size = chunk_size
+
+    def execute(self):
+        reduce = REDUCTIONS[self.reduction]
+        return self._combine([reduce(chunk) for chunk in iter_chunks(self.values, self.chunk_size)])
+
+    def execute_parallel(self, executor: 'Executor', max_pending: int = 8,
+                         backend: Optional['NumericBackend'] = None):
+        """Reduce the chunks on an executor's workers, then combine their partial results."""
+        partials, pending = [], deque()
+        for chunk in iter_chunks(self.values, self.chunk_size):
+            pending.append(executor.submit(reduce_chunk, self.reduction, chunk, backend))
+            if len(pending) >= max_pending:
+                # Bound the chunks in flight so a long stream is not read into memory at once
+                partials.append(pending.popleft().result())
+        partials.extend(future.result() for future in pending)
+        return self._combine(partials)
+
+    def _combine(self, partials: list):
+        if not partials:
+            return self._empty()
+        return REDUCTIONS[self.reduction](partials)
+
+    def _empty(self):
+        raise ValueError(f"Cannot take the {self.reduction} of an empty sequence.")
+
+    def __repr__(self):
+        return f"{self.reduction.capitalize()} = {self.result}"
+
+class SumCommand(ReductionCommand):
+    __slots__ = ()
+    reduction = 'sum'
+
+    def _empty(self):
+        return 0
+
+class ProductCommand(ReductionCommand):
+    __slots__ = ()
+    reduction = 'product'
+
+    def _empty(self):
+        return 1
+
+class MinCommand(ReductionCommand):
+    __slots__ = ()
+    reduction = 'min'
+
+class MaxCommand(ReductionCommand):
+    __slots__ = ()
+    reduction = 'max'
@@ -0,0 +1,134 @@
+import importlib
+import operator
+from collections.abc import Mapping
+from contextvars import ContextVar
+from decimal import Decimal
+from typing import Callable, Iterator, Optional, Sequence
+
+class Operation:
+    """An operation shared by every entry point: its arity, kernels and error semantics.
+
+    `scalar` computes one result. `invalid`, when given, flags operands the
+    operation is not defined for: calling the operation raises
+    ValueError(`error`) for them, while batch kernels mask them instead.
+    `batch` optionally computes (values, mask) over two sequences in one pass,
+    and `vector` names the NumPy ufunc used for array operands. `call` is the
+    scalar kernel with its check folded in, for hot paths such as commands.
+    """
+
+    def __init__(self, name: str, arity: int, scalar: Callable, invalid: Optional[Callable] = None,
+                 error: Optional[str] = None, batch: Optional[Callable] = None,
+                 vector: Optional[str] = None, module: Optional[str] = None, doc: Optional[str] = None):
+        self.name = self.__name__ = self.__qualname__ = name
+        # Where the operation is exposed, so history references like calculator.operations:add resolve
+        self.__module__ = module or __name__
+        self.__doc__ = doc
+        self.arity = arity
+        self.scalar = scalar
+        self.invalid = invalid  # Predicate on the operands; must also work element-wise on NumPy arrays
+        self.error = error or f"Invalid operands for {name}."
+        self.batch = batch
+        self.vector = vector
+        self.call = _checked(scalar, invalid, self.error, arity)
+
+    def __call__(self, *operands):
+        return self.call(*operands)
+
+    def __reduce__(self):
+        # Pickled by name, so process pools receive the registered kernels rather than copies
+        return _resolve_operation, (self.__module__, self.name)
+
+    def __repr__(self):
+        return f"Operation({self.name!r}, arity={self.arity})"
+
+class OperationRegistry(Mapping):
+    """Operations by name. Replacing a kernel here speeds up every entry point that uses it."""
+
+    def __init__(self):
+        self._operations = {}
+
+    def register(self, operation: Operation, replace: bool = False) -> Operation:
+        """Add an operation and return it, e.g. as a command class's `operation`."""
+        if operation.name in self._operations and not replace:
+            raise ValueError(f"Operation already registered: {operation.name}")
+        self._operations[operation.name] = operation
+        return operation
+
+    def set_kernels(self, name: str, **kernels):
+        """Swap an operation's scalar, batch or vector kernel in place."""
+        operation = self._operations[name]
+        for kind, kernel in kernels.items():
+            if kind not in ('scalar', 'batch', 'vector'):
+                raise ValueError(f"Unknown kernel: {kind}")
+            setattr(operation, kind, kernel)
+        operation.call = _checked(operation.scalar, operation.invalid, operation.error,
+                                  operation.arity)
+
+    def __getitem__(self, name: str) -> Operation:
+        return self._operations[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._operations)
+
+    def __len__(self):
+        return len(self._operations)
+
+REGISTRY = OperationRegistry()
+
+def _checked(scalar: Callable, invalid: Optional[Callable], error: str, arity: int) -> Callable:
+    """The scalar kernel itself when every operand is valid, otherwise a checking wrapper."""
+    if invalid is None:
+        return scalar  # e.g. operator.add, called directly with no Python frame in between
+    if arity == 2:
+        def checked_pair(a, b):  # Fixed arguments call faster than *operands
+            if invalid(a, b):
+                raise ValueError(error)
+            return scalar(a, b)
+        return checked_pair
+
+    def checked(*operands):
+        if invalid(*operands):
+            raise ValueError(error)
+        return scalar(*operands)
+    return checked
+
+def _resolve_operation(module: str, name: str) -> Operation:
+    importlib.import_module(module)  # Registers plugin operations in a fresh worker process
+    return REGISTRY[name]
+
+def _zero_divisor(a, b):
+    return b == 0
+
+# Set by the int numeric backend, under which dividing two ints gives an exact int or an error
+integer_division = ContextVar('integer_division', default=False)
+
+def _divide(a, b):
+    """a / b; under the int backend, int operands must divide exactly and give an int."""
+    if integer_division.get() and type(a) is int and type(b) is int:
+        quotient, remainder = divmod(a, b)  # Exact for any size, unlike true division through float
+        if remainder:
+            raise ValueError(f"{a} / {b} is not a whole number; use the float or decimal backend.")
+        return quotient
+    return a / b
+
+def _divide_batch(a: Sequence, b: Sequence):
+    """Divide element-wise, masking zero divisors instead of raising."""
+    mask = bytearray(map(operator.not_, b))
+    # Substitute a unit divisor where b is zero, then zero those results
+    values = list(map(operator.truediv, a, [1 if zero else divisor for zero, divisor in zip(mask, b)]))
+    if any(mask):
+        zero = Decimal(0) if values and isinstance(values[0], Decimal) else 0
+        for index in (i for i, flag in enumerate(mask) if flag):
+            values[index] = zero
+    return values, mask
+
+# The built-in operations, exposed by calculator.operations; their kernels are C-level operator functions
+for _operation in (
+        Operation('add', 2, operator.add, vector='add', doc="Add two numbers."),
+        Operation('subtract', 2, operator.sub, vector='subtract', doc="Subtract two numbers."),
+        Operation('multiply', 2, operator.mul, vector='multiply', doc="Multiply two numbers."),
+        Operation('divide', 2, _divide, invalid=_zero_divisor, error="Cannot divide by zero.",
+                  batch=_divide_batch, vector='divide', doc="Divide two numbers, refusing a zero divisor.")):
+    _operation.__module__ = 'calculator.operations'
+    REGISTRY.register(_operation)
+del _operation
@@ -0,0 +1,166 @@
+import asyncio
+from decimal import Decimal
+from typing import Callable, Dict, Iterable, Optional, Union
+from calculator.backends import NumericBackend, get_backend
+from calculator.calculator import Calculator
+from calculator.commands import operation_arity
+from calculator.discovery import find_command
+from calculator.pool import run_command
+from calculator.streaming import arity_message, error_message
+
+# Requests read ahead per connection before reading pauses
+DEFAULT_MAX_PENDING = 64
+
+class CalculatorServer:
+    """An asyncio line-protocol server answering `op a b` requests.
+
+    Requests carry as many operands as the operation takes, e.g. `factorial 5`
+    or `modpow 3 4 5`. Each line gets one `OK <result>` or `ERR <message>` line
+    back, in request order. A connection may pipeline requests: up to `max_pending` are read
+    ahead and computed while earlier answers are still being written. Once that
+    many are in flight the connection stops reading, which pushes back on the
+    client through TCP flow control. Operations named in `offload` run on the
+    calculator's worker pool so CPU-heavy commands do not stall the event loop.
+    A `backend` parses the operands and sets the context every request runs
+    under, on the event loop and in the workers alike.
+    """
+
+    def __init__(self, operation_mappings: Dict[str, Callable], calculator: Optional[Calculator] = None,
+                 offload: Iterable[str] = (), max_pending: int = DEFAULT_MAX_PENDING,
+                 convert: Callable = Decimal, backend: Union[str, NumericBackend, None] = None):
+        if max_pending < 1:
+            raise ValueError("max_pending must be at least 1")
+        self.operation_mappings = operation_mappings
+        self.backend = get_backend(backend)
+        self.calculator = calculator or Calculator(backend=self.backend)
+        self.offload = frozenset(offload)
+        self.max_pending = max_pending
+        self.convert = self.backend.convert if self.backend is not None else convert
+        self.server = None
+
+    async def start(self, host: str = '127.0.0.1', port: int = 0, path: Optional[str] = None):
+        """Start listening on TCP host:port, or on a Unix socket when path is given."""
+        if path is not None:
+            self.server = await asyncio.start_unix_server(self.handle_connection, path=path)
+        else:
+            self.server = await asyncio.start_server(self.handle_connection, host, port)
+        return self.server
+
+    @property
+    def address(self):
+        """The address the server is bound to (host, port) or the socket path."""
+        return self.server.sockets[0].getsockname()
+
+    async def close(self):
+        """Stop accepting connections and shut the worker pool down."""
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        self.calculator.shutdown(wait=False)
+
+    async def serve_forever(self):
+        """Serve until cancelled."""
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def respond(self, line: str) -> str:
+        """Compute the response line for one request line."""
+        op_name, *operands = line.split()
+        op_name = op_name.lower()
+        command_class, error = find_command(self.operation_mappings, op_name)
+        if command_class is None:
+            return f"ERR {error}"
+        arity = operation_arity(command_class)
+        if len(operands) != arity:
+            return f"ERR Malformed request: {arity_message(op_name, arity)}"
+        try:
+            command = command_class(*map(self.convert, operands))
+            if op_name in self.offload:
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(self.calculator.pool.executor, run_command,
+                                                    command, self.backend)
+            elif self.backend is not None:
+                with self.backend.context():  # Decimal contexts are per task, so requests do not interfere
+                    result = self._execute(command)
+            else:
+                result = self._execute(command)
+        except Exception as e:  # Report the failure to the client and keep serving
+            return f"ERR {error_message(e, *operands)}"
+        return f"OK {result}"
+
+    def _execute(self, command):
+        if self.calculator.cache is not None:
+            return self.calculator.cache.execute(command)
+        # Not Calculator.compute: a long-running server must not grow its history list
+        return command.execute()
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Read pipelined requests and write their responses in order."""
+        pending = asyncio.Queue(maxsize=self.max_pending)
+
+        async def read_requests():
+            try:
+                while True:
+                    raw = await reader.readline()
+                    if not raw:
+                        break
+                    line = raw.decode(errors='replace').strip()
+                    if not line:
+                        continue
+                    if line.lower() == 'quit':
+                        break
+                    task = asyncio.create_task(self.respond(line))
+                    try:
+                        # Blocks when max_pending requests are in flight, so reading stops
+                        await pending.put(task)
+                    except asyncio.CancelledError:
+                        task.cancel()
+                        raise
+            except ConnectionError:
+                pass
+            await pending.put(None)  # The writer stops once every earlier answer is written
+
+        async def write_responses():
+            while True:
+                task = await pending.get()
+                if task is None:
+                    break
+                writer.write((await task).encode() + b'\n')
+                if pending.empty():
+                    await writer.drain()  # Flush once the pipeline has caught up
+
+        reader_task = asyncio.create_task(read_requests())
+        writer_task = asyncio.create_task(write_responses())
+        try:
+            # A writer that fails, e.g. on a reset connection, must not leave the reader
+            # blocked on a full queue or waiting for requests nobody will answer
+            await asyncio.wait((reader_task, writer_task), return_when=asyncio.FIRST_COMPLETED)
+            if reader_task.done():
+                reader_task.result()
+            await writer_task
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            reader_task.cancel()
+            writer_task.cancel()
+            while not pending.empty():  # Answers that can no longer be written
+                task = pending.get_nowait()
+                if task is not None:
+                    task.cancel()
+            writer.close()
+
+async def send_requests(lines: Iterable[str], host: str = '127.0.0.1', port: Optional[int] = None,
+                        path: Optional[str] = None) -> list:
+    """A minimal client: pipeline request lines and return the response lines."""
+    if path is not None:
+        reader, writer = await asyncio.open_unix_connection(path)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+    lines = list(lines)
+    writer.write(''.join(line + '\n' for line in lines).encode())
+    await writer.drain()
+    responses = [(await reader.readline()).decode().rstrip('\n') for _ in lines]
+    writer.close()
+    await writer.wait_closed()
+    return responses
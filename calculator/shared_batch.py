@@ -0,0 +1,177 @@
+import traceback
+from array import array
+from multiprocessing import shared_memory
+from typing import TYPE_CHECKING, List, Optional, Sequence, Tuple
+from calculator.batch import (FLOAT_TYPECODES, INT_TYPECODES, BatchResult, _sequence_kernel,
+                              batch_operation, compute_batch)
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+# Smallest slice handed to a worker; below this the IPC round trip outweighs the work
+MIN_SLICE_SIZE = 4096
+# Returned by compute_slice instead of an error count when a slice's results do not fit int64
+OVERFLOWED = -1
+
+_INT64_MIN, _INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+def operand_typecode(values: Sequence) -> str:
+    """Pick the shared array typecode for an operand: 'q' for integers, 'd' otherwise."""
+    if isinstance(values, array):
+        if values.typecode in FLOAT_TYPECODES:
+            return 'd'
+        if values.typecode not in INT_TYPECODES:
+            raise ValueError("Shared-memory batches need int or float operands")
+        # Only 64-bit unsigned arrays can hold values that int64 cannot
+        checked = values.typecode in 'LQ' and values.itemsize == 8
+    elif all(isinstance(value, int) for value in values):
+        checked = True
+    elif all(isinstance(value, (int, float)) for value in values):
+        return 'd'
+    else:
+        # Decimal and other Python numbers have no fixed-width machine representation
+        raise ValueError("Shared-memory batches need int or float operands")
+    if checked and values and (min(values) < _INT64_MIN or max(values) > _INT64_MAX):
+        raise ValueError("Shared-memory batches need integer operands that fit in int64; "
+                         "use compute_batch for larger integers")
+    return 'q'
+
+def slice_bounds(size: int, parts: int, min_size: int = MIN_SLICE_SIZE) -> List[Tuple[int, int]]:
+    """Split range(size) into at most `parts` contiguous (start, stop) slices."""
+    if not size:
+        return []
+    parts = max(1, min(parts, -(-size // min_size)))
+    step = -(-size // parts)
+    return [(start, min(start + step, size)) for start in range(0, size, step)]
+
+def _view(block: shared_memory.SharedMemory, typecode: str, size: int) -> memoryview:
+    """A typed view of the first `size` elements of a block (blocks are page-rounded)."""
+    return block.buf.cast(typecode)[:size]
+
+def compute_slice(names: Tuple[str, str, str, str], typecodes: Tuple[str, str, str],
+                  op_name: str, size: int, start: int, stop: int) -> int:
+    """Compute one slice of a shared batch in place and return its error count.
+
+    Runs in a worker process: only the block names go in and a single int comes
+    back, the operands and results never cross the process boundary. Returns
+    OVERFLOWED if an integer result does not fit the int64 result block.
+    """
+    blocks = [shared_memory.SharedMemory(name=name) for name in names]
+    a_code, b_code, result_code = typecodes
+    a, b, values = (_view(block, code, size)
+                    for block, code in zip(blocks, (a_code, b_code, result_code)))
+    mask = _view(blocks[3], 'B', size)
+    try:
+        return _compute_into(op_name, a, b, values, mask, start, stop)
+    except BaseException as error:
+        # The traceback's frames still hold slices of the views, which would keep the
+        # blocks from closing and replace this error with a BufferError
+        traceback.clear_frames(error.__traceback__)
+        del error
+        raise
+    finally:
+        # Views must be released before the blocks can be closed
+        for view in (a, b, values, mask):
+            view.release()
+        for block in blocks:
+            block.close()
+
+def _compute_into(op_name: str, a: memoryview, b: memoryview, values: memoryview,
+                  mask: memoryview, start: int, stop: int) -> int:
+    # A separate frame, so the slices of the views are gone before the blocks close
+    results, flags = _sequence_kernel(op_name, a[start:stop], b[start:stop])
+    try:
+        values[start:stop] = array(values.format, results)
+    except OverflowError:
+        return OVERFLOWED
+    mask[start:stop] = flags
+    return sum(flags)
+
+class SharedBatch:
+    """Operand, result and mask arrays in shared memory, computed in place by workers.
+
+    Use as a context manager: the results returned by `compute` are views into
+    the shared blocks and stay valid until the batch is closed. Integer results
+    that overflow int64 are computed again in the calling process, and come
+    back as exact ints in an ordinary compute_batch result.
+    """
+
+    def __init__(self, size: int, a_typecode: str = 'd', b_typecode: str = 'd'):
+        self.size = size
+        self.typecodes = (a_typecode, b_typecode, 'd')
+        self.result: Optional[BatchResult] = None
+        self._blocks = [self._allocate(array(code).itemsize * size)
+                        for code in self.typecodes]
+        self._blocks.append(self._allocate(size))  # One mask byte per element
+        self._views: List[memoryview] = []
+        self.a = self._typed_view(0, a_typecode)  # Fill these in place to skip the copy
+        self.b = self._typed_view(1, b_typecode)
+
+    @classmethod
+    def from_operands(cls, a: Sequence, b: Sequence) -> 'SharedBatch':
+        """Copy two operand sequences into a new shared batch."""
+        if len(a) != len(b):
+            raise ValueError(f"Operand arrays differ in length: {len(a)} != {len(b)}")
+        batch = cls(len(a), operand_typecode(a), operand_typecode(b))
+        try:
+            batch.a[:] = array(batch.typecodes[0], a)
+            batch.b[:] = array(batch.typecodes[1], b)
+        except BaseException:
+            batch.close()
+            raise
+        return batch
+
+    @staticmethod
+    def _allocate(nbytes: int) -> shared_memory.SharedMemory:
+        return shared_memory.SharedMemory(create=True, size=max(nbytes, 1))  # Size 0 is rejected
+
+    def _typed_view(self, index: int, typecode: str) -> memoryview:
+        view = _view(self._blocks[index], typecode, self.size)
+        self._views.append(view)
+        return view
+
+    @property
+    def names(self) -> Tuple[str, ...]:
+        """Names of the operand, result and mask blocks, for attaching from other processes."""
+        return tuple(block.name for block in self._blocks)
+
+    def compute(self, op_name: str, executor: 'Executor', parts: int = 1) -> BatchResult:
+        """Compute the batch on the executor's workers, `parts` slices at a time."""
+        batch_operation(op_name)
+        a_code, b_code, _ = self.typecodes
+        result_code = 'q' if op_name != 'divide' and a_code == b_code == 'q' else 'd'
+        self.typecodes = (a_code, b_code, result_code)
+        futures = [executor.submit(compute_slice, self.names, self.typecodes, op_name,
+                                   self.size, start, stop)
+                   for start, stop in slice_bounds(self.size, parts)]
+        for future in futures:
+            future.exception()  # Let every slice finish before a failure lets the caller close the blocks
+        counts = [future.result() for future in futures]  # Re-raises a worker failure
+        if OVERFLOWED in counts:
+            # Exact Python ints cannot live in the int64 block
+            self.result = compute_batch(op_name, self.a.tolist(), self.b.tolist())
+        else:
+            self.result = BatchResult(self._typed_view(2, result_code), self._typed_view(3, 'B'))
+        return self.result
+
+    def close(self):
+        """Release the views and free the shared blocks."""
+        for view in self._views:
+            view.release()
+        self._views.clear()
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        return self.size
+
+    def __repr__(self):
+        return f"SharedBatch(size={self.size}, typecodes={self.typecodes})"
@@ -0,0 +1,236 @@
+import decimal
+import math
+import numbers
+from collections import deque
+from decimal import Decimal
+from typing import Dict, Iterator, Optional
+
+# Accumulators move to Decimal in this context once a result is out of float range, e.g. 200!
+STATS_CONTEXT = decimal.Context(prec=34, Emax=decimal.MAX_EMAX, Emin=decimal.MIN_EMIN, traps=[])
+# Marks an entry of the window that has no result to aggregate
+SKIPPED = object()
+
+def entry_result(entry):
+    """Return the result of a history entry (Calculation or Command)."""
+    perform = getattr(entry, 'perform', None)
+    if perform is not None:
+        return perform()
+    return entry.result  # Commands keep the result of their first execution
+
+def stats_value(entry):
+    """The entry's result if it can be aggregated: a finite number, computed without raising."""
+    try:
+        value = entry_result(entry)
+    except Exception:  # e.g. division by zero: there is no result to aggregate
+        return SKIPPED
+    if isinstance(value, float):
+        return value if math.isfinite(value) else SKIPPED
+    if isinstance(value, Decimal):
+        return value if value.is_finite() else SKIPPED
+    if isinstance(value, numbers.Real):
+        return value
+    return SKIPPED
+
+def _wide(value) -> Decimal:
+    """A value as a Decimal in STATS_CONTEXT, without converting every digit of a huge int."""
+    if isinstance(value, int):
+        shift = max(value.bit_length() - 128, 0)
+        return STATS_CONTEXT.multiply(Decimal(value >> shift), STATS_CONTEXT.power(2, shift))
+    if isinstance(value, float):
+        return STATS_CONTEXT.create_decimal_from_float(value)
+    if isinstance(value, Decimal):
+        return STATS_CONTEXT.plus(value)
+    return STATS_CONTEXT.divide(Decimal(value.numerator), Decimal(value.denominator))
+
+def _float(value):
+    """A value as a float, or None when a float cannot hold it."""
+    try:
+        x = float(value)
+    except OverflowError:  # e.g. a huge int
+        return None
+    return x if math.isfinite(x) else None  # A huge Decimal converts to inf
+
+class RunningStats:
+    """Count, total, mean, variance and extremes of a window of values, updated in O(1).
+
+    Values leave the window in the order they were added, which is how a
+    bounded history evicts them, and the window keeps each value so removal
+    never recomputes it. The mean and variance use Welford's update and its
+    inverse, in floats until a value is out of float range and in Decimal
+    from then on; the extremes use monotonic deques. Entries without a result
+    take a SKIPPED place in the window and are not counted.
+
+    With windowed=False nothing can be removed, so no values are kept and
+    only the current extremes are tracked: the aggregates of an unbounded
+    history cost the same memory however many entries it holds.
+    """
+
+    __slots__ = ('count', 'total', 'mean', '_m2', '_window', '_added', '_removed', '_minima', '_maxima')
+
+    def __init__(self, windowed: bool = True):
+        self.count = 0
+        self.total = 0  # Sum in the values' own type, e.g. Decimal
+        self.mean = 0.0
+        self._m2 = 0.0  # Sum of squared deviations from the mean
+        self._window = deque() if windowed else None  # Every value still in the window, oldest first
+        self._added = self._removed = 0  # Positions of the next value in and out
+        self._minima = deque()  # (position, value), values increasing
+        self._maxima = deque()  # (position, value), values decreasing
+
+    def _point(self, value):
+        """The value in the accumulators' type, widening them to Decimal if a float cannot hold it."""
+        if not isinstance(self.mean, Decimal):
+            x = _float(value)
+            if x is not None:
+                return x
+            self.mean = STATS_CONTEXT.create_decimal_from_float(self.mean)
+            self._m2 = STATS_CONTEXT.create_decimal_from_float(self._m2)
+        return _wide(value)
+
+    def add(self, value):
+        """Add the newest value, or take a place in the window for SKIPPED."""
+        if value is not SKIPPED:
+            # Everything that can fail is computed before any state changes
+            total = _plus(self.total, value)
+            drop_min = _dominated(self._minima, lambda kept: kept > value)
+            drop_max = _dominated(self._maxima, lambda kept: kept < value)
+            count = self.count + 1
+            x = self._point(value)  # May widen the accumulators, so it comes first
+            self.mean, self._m2 = _update(_welford_add, self.mean, self._m2, x, count)
+            self.count, self.total = count, total
+            self._push(self._minima, drop_min, value)  # Dropped values are never the minimum again
+            self._push(self._maxima, drop_max, value)
+        if self._window is not None:
+            self._window.append(value)
+        self._added += 1
+
+    def _push(self, extremes: deque, dropped: int, value):
+        for _ in range(dropped):
+            extremes.pop()
+        # Without a window nothing is removed, so only a new extreme is worth keeping
+        if self._window is not None or not extremes:
+            extremes.append((self._added, value))
+
+    def remove_oldest(self):
+        """Remove the oldest value still in the window and return it."""
+        if self._window is None:
+            raise ValueError("values are not kept without a window, so none can be removed")
+        if not self._window:
+            raise ValueError("no values to remove")
+        value = self._window.popleft()
+        position = self._removed
+        self._removed += 1
+        if value is SKIPPED:
+            return value
+        self.count -= 1
+        if not self.count:
+            self.total, self.mean, self._m2 = 0, 0.0, 0.0
+        else:
+            self.total = _plus(self.total, -value)
+            x = self._point(value)
+            self.mean, self._m2 = _update(_welford_remove, self.mean, self._m2, x, self.count)
+        if self._minima and self._minima[0][0] == position:
+            self._minima.popleft()
+        if self._maxima and self._maxima[0][0] == position:
+            self._maxima.popleft()
+        return value
+
+    def __len__(self):
+        """Number of entries in the window, including skipped ones."""
+        return self._added - self._removed
+
+    @property
+    def minimum(self):
+        return self._minima[0][1] if self._minima else None
+
+    @property
+    def maximum(self):
+        return self._maxima[0][1] if self._maxima else None
+
+    @property
+    def variance(self):
+        """Population variance of the values."""
+        return self._m2 / self.count if self.count else 0.0
+
+    def summary(self) -> dict:
+        """Count, total, mean, extremes and variance as plain data."""
+        return {
+            'count': self.count, 'total': self.total, 'mean': self.mean,
+            'min': self.minimum, 'max': self.maximum, 'variance': self.variance,
+        }
+
+def _welford_add(mean, m2, x, count):
+    delta = x - mean
+    mean = mean + delta / count
+    return mean, m2 + delta * (x - mean)
+
+def _welford_remove(mean, m2, x, count):
+    previous = mean
+    mean = (previous * (count + 1) - x) / count
+    # Rounding can leave a tiny negative sum of squares
+    return mean, max(m2 - (x - previous) * (x - mean), 0 * m2)
+
+def _update(step, mean, m2, x, count):
+    """Apply a Welford step, in STATS_CONTEXT once the accumulators are Decimals."""
+    if isinstance(x, Decimal):
+        with decimal.localcontext(STATS_CONTEXT):
+            return step(mean, m2, x, count)
+    return step(mean, m2, x, count)
+
+def _dominated(extremes: deque, beaten) -> int:
+    """How many values at the end of a monotonic deque a new value replaces."""
+    count = 0
+    for _, kept in reversed(extremes):
+        if not beaten(kept):
+            break
+        count += 1
+    return count
+
+def _plus(total, value):
+    try:
+        return total + value
+    except TypeError:  # e.g. Decimal and float results from different backends
+        x, y = _float(total), _float(value)
+        if x is None or y is None:
+            return STATS_CONTEXT.add(_wide(total), _wide(value))
+        return x + y
+
+class OperationStats:
+    """Running statistics of the results of each operation in the history.
+
+    Pass windowed=False for a history that never evicts, so values are not kept.
+    """
+
+    def __init__(self, windowed: bool = True):
+        self.windowed = windowed
+        self._stats: Dict[str, RunningStats] = {}
+
+    def add(self, name: str, value):
+        """Count a newly stored entry's stats_value(); SKIPPED entries only hold their place."""
+        stats = self._stats.get(name)
+        if stats is None:
+            stats = RunningStats(self.windowed)
+            stats.add(value)  # Only kept once the first value went in
+            self._stats[name] = stats
+        else:
+            stats.add(value)
+
+    def evict(self, name: str):
+        """Remove the oldest entry of an operation, reusing the value stored when it was added."""
+        stats = self._stats.get(name)
+        if stats is None:
+            return
+        stats.remove_oldest()
+        if not stats:
+            del self._stats[name]
+
+    def clear(self):
+        """Forget every operation's statistics."""
+        self._stats.clear()
+
+    def get(self, name: str) -> Optional[RunningStats]:
+        return self._stats.get(name)
+
+    def operations(self) -> Iterator[str]:
+        """Names of the operations with at least one result."""
+        return (name for name, stats in self._stats.items() if stats.count)
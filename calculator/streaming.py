@@ -0,0 +1,126 @@
+import csv
+import json
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, TextIO
+from calculator.commands import operation_arity
+from calculator.discovery import find_command
+
+# Number of result rows gathered before each bulk write
+WRITE_CHUNK_SIZE = 1024
+
+# Result rows echo the operands in one field: space-separated in CSV, a list in JSON lines
+RESULT_FIELDS = ('op', 'operands', 'result', 'error')
+
+def error_message(error: Exception, *operands) -> str:
+    """Describe a per-record failure the same way the interactive calculator does."""
+    if isinstance(error, InvalidOperation):
+        return f"Invalid number input: {' or '.join(map(str, operands))} is not a valid number."
+    if isinstance(error, ZeroDivisionError):
+        return "Cannot divide by zero."
+    return str(error)
+
+def arity_message(op_name: str, arity: int) -> str:
+    """Describe how many operands an operation takes, for records and requests with the wrong number."""
+    return f"expected '{op_name}' and {arity} operand{'s' * (arity != 1)}"
+
+class _CsvFeed:
+    """Hands csv.reader the current line, then further stream lines for a quoted field spanning lines."""
+
+    def __init__(self, lines: Iterator[str]):
+        self.lines = lines
+        self.line = None
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        line, self.line = self.line, None
+        return next(self.lines) if line is None else line
+
+def read_records(stream: TextIO) -> Iterator[tuple]:
+    """Lazily parse `op,a,b` CSV lines or `{"op", "a", "b"}` JSON lines into (op, *operands) records.
+
+    A record carries as many operands as its operation takes, e.g. `factorial,5`
+    or `modpow,2,10,7`; JSON lines give them as `"a"` and `"b"` or as an
+    `"operands"` list. CSV lines go through the csv module, so quoted fields and
+    CRLF line endings work. Malformed lines become (None, line) records.
+    """
+    lines = iter(stream)
+    feed = _CsvFeed(lines)
+    reader = csv.reader(feed, skipinitialspace=True)  # Allows `add, 1, 2` and `add, "1", 2`
+    for raw in lines:
+        line = raw.strip()
+        if not line or line.startswith('#'):
+            continue  # Skip blank lines and comments
+        if line.startswith('{'):
+            try:
+                record = json.loads(line)
+                operands = record['operands'] if 'operands' in record else \
+                    [record['a'], *([record['b']] if 'b' in record else [])]
+                if not isinstance(operands, list) or not operands:
+                    raise TypeError("operands must be a non-empty list")
+                yield (str(record['op']).strip().lower(), *map(str, operands))
+            except (ValueError, KeyError, TypeError):
+                yield None, line  # Reported as a malformed record downstream
+            continue
+        feed.line = raw
+        try:
+            fields = [field.strip() for field in next(reader)]
+        except (csv.Error, StopIteration):  # e.g. a quoted field left open at the end of the stream
+            yield None, line
+            continue
+        if fields[0].lower() == 'op':
+            continue  # CSV header, e.g. op,a,b
+        if len(fields) < 2:
+            yield None, line
+            continue
+        yield (fields[0].lower(), *fields[1:])
+
+def evaluate_records(records: Iterable[tuple], operation_mappings: Dict[str, Callable],
+                     convert: Callable = Decimal) -> Iterator[tuple]:
+    """Run each record through its command, yielding (op, operands, result, error) rows."""
+    for op_name, *operands in records:
+        operands = tuple(operands)
+        if op_name is None:
+            yield '', (), '', f"Malformed record: {operands[0]}"
+            continue
+        command_class, error = find_command(operation_mappings, op_name)
+        if command_class is None:
+            yield op_name, operands, '', error
+            continue
+        arity = operation_arity(command_class)
+        if len(operands) != arity:
+            yield op_name, operands, '', f"Malformed record: {arity_message(op_name, arity)}"
+            continue
+        try:
+            result = command_class(*map(convert, operands)).execute()
+        except Exception as e:  # Keep the stream going on any per-record failure
+            yield op_name, operands, '', error_message(e, *operands)
+        else:
+            yield op_name, operands, str(result), ''
+
+def write_results(rows: Iterable[tuple], out: TextIO, fmt: str = 'csv',
+                  chunk_size: int = WRITE_CHUNK_SIZE) -> int:
+    """Write result rows in chunks as CSV or JSON lines and return the row count."""
+    if fmt not in ('csv', 'jsonl'):
+        raise ValueError(f"Unknown output format: {fmt}")
+    rows = iter(rows)
+    writer = csv.writer(out, lineterminator='\n') if fmt == 'csv' else None
+    if writer:
+        writer.writerow(RESULT_FIELDS)
+    count = 0
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        if writer:
+            writer.writerows((op, ' '.join(operands), result, error) for op, operands, result, error in chunk)
+        else:
+            out.write(''.join(
+                json.dumps({'op': op or None, 'operands': list(operands), 'result': result or None,
+                            'error': error or None}) + '\n'
+                for op, operands, result, error in chunk))
+        count += len(chunk)
+    out.flush()
+    return count
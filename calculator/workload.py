@@ -0,0 +1,111 @@
+import argparse
+import random
+import sys
+from array import array
+from decimal import Decimal
+from typing import Callable, Dict, Iterator, Optional, Sequence, Tuple
+
+OPERATIONS = ('add', 'subtract', 'multiply', 'divide')
+# Operand digits the int64 operand arrays can hold; draws are 32-bit, so 9 digits at most
+MAX_DIGITS = 9
+# Records generated per chunk by the lazy streams
+WORKLOAD_CHUNK_SIZE = 65536
+
+class WorkloadGenerator:
+    """A seeded generator of `op a b` workloads, produced a chunk at a time.
+
+    Random bytes are drawn in bulk and turned into operation indexes and
+    operands with array and list operations, instead of one random call per
+    value. The same seed always produces the same workload.
+    """
+
+    def __init__(self, seed: Optional[int] = None, operations: Sequence[str] = OPERATIONS,
+                 digits: int = 2, zero_divisors: bool = False):
+        if not 1 <= digits <= MAX_DIGITS:
+            raise ValueError(f"digits must be between 1 and {MAX_DIGITS}")
+        if not 1 <= len(operations) <= 256:
+            raise ValueError("between 1 and 256 operations are required")
+        self.random = random.Random(seed)
+        self.operations = tuple(operations)
+        self.digits = digits
+        self.zero_divisors = zero_divisors  # False replaces zero divisors of 'divide' with 1
+
+    def operation_indexes(self, count: int) -> bytes:
+        """Indexes into `operations`, one byte each, close to uniformly distributed."""
+        size = len(self.operations)
+        return self.random.randbytes(count).translate(bytes(value % size for value in range(256)))
+
+    def operands(self, count: int, digits: Optional[int] = None) -> array:
+        """Non-negative integers with at most `digits` digits, as an int64 array."""
+        limit = 10 ** (digits or self.digits)
+        raw = array('I')
+        raw.frombytes(self.random.randbytes(4 * count))
+        return array('q', [value % limit for value in raw])
+
+    def arrays(self, count: int) -> Tuple[list, array, array]:
+        """One chunk of the workload: operation names and two operand arrays."""
+        indexes = self.operation_indexes(count)
+        a = self.operands(count)
+        b = self.operands(count)
+        if not self.zero_divisors and 'divide' in self.operations:
+            divide = self.operations.index('divide')
+            for position in (i for i, value in enumerate(b) if not value):
+                if indexes[position] == divide:
+                    b[position] = 1
+        names = list(map(self.operations.__getitem__, indexes))
+        return names, a, b
+
+    def records(self, count: Optional[int] = None, chunk_size: int = WORKLOAD_CHUNK_SIZE,
+                convert: Callable = Decimal) -> Iterator[tuple]:
+        """Lazily yield (op, a, b) records, endlessly when count is None."""
+        remaining = count
+        while remaining is None or remaining > 0:
+            size = chunk_size if remaining is None else min(chunk_size, remaining)
+            names, a, b = self.arrays(size)
+            yield from zip(names, map(convert, a), map(convert, b))
+            if remaining is not None:
+                remaining -= size
+
+    def lines(self, count: Optional[int] = None, fmt: str = 'csv',
+              chunk_size: int = WORKLOAD_CHUNK_SIZE) -> Iterator[str]:
+        """Request lines for batch mode (csv, jsonl) or server mode (server)."""
+        templates = {'csv': '{},{},{}', 'jsonl': '{{"op": "{}", "a": "{}", "b": "{}"}}', 'server': '{} {} {}'}
+        if fmt not in templates:
+            raise ValueError(f"Unknown workload format: {fmt}")
+        template = templates[fmt]
+        return (template.format(*record) for record in self.records(count, chunk_size, str))
+
+    def commands(self, count: Optional[int], operation_mappings: Dict[str, Callable],
+                 chunk_size: int = WORKLOAD_CHUNK_SIZE) -> Iterator:
+        """Lazily build commands, e.g. to feed Calculator.map or Calculator.submit."""
+        for op_name, a, b in self.records(count, chunk_size):
+            yield operation_mappings[op_name](a, b)
+
+def digits_argument(text):
+    """Validates --digits while parsing, so an out-of-range value is a usage error rather than a traceback."""
+    try:
+        digits = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {text!r}") from None
+    if not 1 <= digits <= MAX_DIGITS:
+        raise argparse.ArgumentTypeError(f"digits must be between 1 and {MAX_DIGITS}")
+    return digits
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Write a synthetic calculator workload.")
+    parser.add_argument('count', type=int, help="Number of records to write")
+    parser.add_argument('--seed', type=int, default=None, help="Seed for a reproducible workload")
+    parser.add_argument('--digits', type=digits_argument, default=2,
+                        help=f"Maximum digits per operand, 1 to {MAX_DIGITS}")
+    parser.add_argument('--format', choices=['csv', 'jsonl', 'server'], default='csv')
+    parser.add_argument('--zero-divisors', action='store_true', help="Allow division by zero")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Write request lines to stdout, e.g. `python -m calculator.workload 1000000 | python main.py --batch`."""
+    args = parse_args(argv)
+    generator = WorkloadGenerator(args.seed, digits=args.digits, zero_divisors=args.zero_divisors)
+    sys.stdout.writelines(line + '\n' for line in generator.lines(args.count, args.format))
+
+if __name__ == '__main__':
+    main()
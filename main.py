@@ -1,16 +1,26 @@
 from calculator.calculator import Calculator
 from calculator.calculations import Calculations
-from calculator.commands import AddCommand, SubtractCommand, MultiplyCommand, DivideCommand  # Import command classes
+from calculator.commands import operation_arity
+from calculator.backends import get_backend
+from calculator.discovery import PluginRegistry, find_command
+from calculator.streaming import read_records, evaluate_records, write_results
+from contextlib import ExitStack
 from decimal import Decimal, InvalidOperation
+import argparse
+import sys
 
-# Available command mappings
-operation_mappings = {
-    'add': AddCommand,
-    'subtract': SubtractCommand,
-    'multiply': MultiplyCommand,
-    'divide': DivideCommand
+# Built-in command mappings, as 'module:Class' targets imported the first time they are used
+builtin_operations = {
+    'add': 'calculator.commands:AddCommand',
+    'subtract': 'calculator.commands:SubtractCommand',
+    'multiply': 'calculator.commands:MultiplyCommand',
+    'divide': 'calculator.commands:DivideCommand'
 }
 
+# Available command mappings: the built-ins plus discovered plugins. Plugins are discovered on
+# the first lookup and imported on first use, so importing this module touches no manifest
+operation_mappings = PluginRegistry.discover(builtins=builtin_operations, lazy=True)
+
 def display_menu():
     """Displays the list of available commands."""
     print("\nAvailable commands:")
@@ -18,51 +28,73 @@ def display_menu():
     print("  subtract: Subtract two numbers")
     print("  multiply: Multiply two numbers")
     print("  divide: Divide two numbers")
+    for name in operation_mappings:
+        if name not in builtin_operations:
+            print(f"  {name}: Run the {name} plugin")
     print("  history: View calculation history")
     print("  clear_history: Clear calculation history")
     print("  exit: Exit the calculator")
 
-def calculate_and_store(a, b, operation_name):
+# Ordinal words for the operand prompts; later operands are numbered
+ORDINALS = ('first', 'second', 'third')
+
+def calculate_and_store(a, b, operation_name, backend=None):
     """Performs the calculation and stores it in history."""
+    calculate_operands([a, b], operation_name, backend)
+
+def calculate_operands(operands, operation_name, backend=None):
+    """Performs a calculation with the operation's operands and stores it in history."""
     try:
-        # Convert inputs to Decimal
-        a_decimal, b_decimal = map(Decimal, [a, b])
+        # Convert inputs with the numeric backend, or to Decimal by default
+        backend = get_backend(backend)
+        values = list(map(backend.convert if backend else Decimal, operands))
         
-        # Check if the operation exists in the mapping
-        CommandClass = operation_mappings.get(operation_name)
+        # Check if the operation exists in the mapping and its plugin imports
+        CommandClass, error = find_command(operation_mappings, operation_name)
         
         if CommandClass:
-            # Create a command object for the operation
-            command = CommandClass(a_decimal, b_decimal)
-            calc = Calculator()
+            # Create a command object; it dispatches through the operation registry
+            command = CommandClass(*values)
+            calc = Calculator(backend=backend)
             result = calc.compute(command)
-            print(f"The result of {operation_name} between {a} and {b} is {result}")
+            if len(operands) == 1:
+                print(f"The result of {operation_name} of {operands[0]} is {result}")
+            else:
+                listed = f"{', '.join(operands[:-1])} and {operands[-1]}"
+                print(f"The result of {operation_name} between {listed} is {result}")
         else:
-            print(f"Unknown operation: {operation_name}")
+            print(error)
             return
         
         # Store the calculation in history
         Calculations.add_calculation(command)
         
-    except ZeroDivisionError:
-        print("Error: Division by zero.")
     except InvalidOperation:
-        print(f"Invalid number input: {a} or {b} is not a valid number.")
+        print(f"Invalid number input: {' or '.join(operands)} is not a valid number.")
     except Exception as e:
+        # Operation errors, e.g. a zero divisor, are ValueErrors carrying the registry's message
         print(f"An error occurred: {e}")
 
 def prompt_for_numbers(operation_name):
     """Prompts the user to input two numbers for the operation."""
-    print(f"\nEnter two numbers for {operation_name}:")
+    operands = prompt_for_operands(operation_name, 2)
+    return tuple(operands) if operands else (None, None)
+
+def prompt_for_operands(operation_name, arity=2):
+    """Prompts the user for as many numbers as the operation takes."""
+    count = {1: 'one number', 2: 'two numbers'}.get(arity, f"{arity} numbers")
+    print(f"\nEnter {count} for {operation_name}:")
     try:
-        a = input("Enter the first number: ")
-        b = input("Enter the second number: ")
-        return a, b
+        if arity == 1:
+            return [input("Enter the number: ")]
+        return [input(f"Enter the {ORDINALS[index]} number: " if index < len(ORDINALS)
+                      else f"Enter number {index + 1}: ")
+                for index in range(arity)]
     except Exception as e:
         print(f"An error occurred: {e}")
-        return None, None
+        return None
 
-def interactive_calculator():
+def interactive_calculator(backend=None):
     """Runs the interactive calculator."""
     # Display initial welcome message
     print("Welcome to the interactive calculator!")
@@ -89,13 +121,104 @@ def interactive_calculator():
             Calculations.clear_history()
             print("Calculation history cleared.")
         elif user_input in operation_mappings:
-            # If the user input matches an operation, prompt for two numbers
-            a, b = prompt_for_numbers(user_input)
-            if a and b:
+            CommandClass, error = find_command(operation_mappings, user_input)
+            if CommandClass is None:
+                print(error)  # e.g. a plugin that fails to import
+                continue
+            # If the user input matches an operation, prompt for as many numbers as it takes
+            operands = prompt_for_operands(user_input, operation_arity(CommandClass))
+            if operands and all(operands):
                 # Perform and store the calculation
-                calculate_and_store(a, b, user_input)
+                calculate_operands(operands, user_input, backend)
         else:
             print("Invalid input. Please type 'menu' to see the available commands.")
 
+def run_batch(source='-', output='-', fmt='csv', backend=None):
+    """Streams `op,a,b` records (with as many operands as each operation takes) and writes one result each."""
+    backend = get_backend(backend or 'decimal')
+    # Only the streams this function opens are closed, including the input if the output fails to open
+    with ExitStack() as streams:
+        in_stream = sys.stdin if source == '-' else streams.enter_context(
+            open(source, encoding='utf-8', newline=''))
+        out_stream = sys.stdout if output == '-' else streams.enter_context(
+            open(output, 'w', encoding='utf-8', newline=''))
+        with backend.context():
+            rows = evaluate_records(read_records(in_stream), operation_mappings, backend.convert)
+            return write_results(rows, out_stream, fmt)
+
+def run_server(address='127.0.0.1:8765', offload=(), backend=None):
+    """Serves `op a b` requests on HOST:PORT or unix:PATH until interrupted."""
+    import asyncio  # Only the server needs the event loop
+    from calculator.server import CalculatorServer
+
+    async def serve():
+        server = CalculatorServer(operation_mappings, offload=offload, backend=backend)
+        if address.startswith('unix:'):
+            await server.start(path=address[len('unix:'):])
+        else:
+            host, _, port = address.rpartition(':')
+            await server.start(host or '127.0.0.1', int(port))
+        print(f"Serving on {server.address}")
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        print("Server stopped.")
+
+def backend_argument(spec):
+    """Validates --backend while parsing, so a bad spec is a usage error rather than a traceback."""
+    try:
+        return get_backend(spec)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+
+def parse_args(argv=None):
+    """Parses the command-line options."""
+    parser = argparse.ArgumentParser(description="Interactive and batch calculator.")
+    parser.add_argument('--batch', nargs='?', const='-', metavar='PATH',
+                        help="Process op,operand,... records from PATH (or stdin) instead of prompting")
+    parser.add_argument('--serve', nargs='?', const='127.0.0.1:8765', metavar='ADDRESS',
+                        help="Serve 'op a b' requests on HOST:PORT or unix:PATH")
+    parser.add_argument('--offload', action='append', default=[], metavar='OP',
+                        help="Operation to run on the worker pool when serving (repeatable)")
+    parser.add_argument('--backend', type=backend_argument, default=None, metavar='SPEC',
+                        help="Numeric backend: int (exact; inexact division is an error), float "
+                             "or decimal[:PRECISION[:ROUNDING]]")
+    parser.add_argument('--format', choices=['csv', 'jsonl'], default='csv',
+                        help="Output format for batch results")
+    parser.add_argument('--output', default='-', metavar='PATH',
+                        help="File to write batch results to (default: stdout)")
+    parser.add_argument('--profile', nargs='?', const='calculator-profile', metavar='PREFIX',
+                        help="Profile the session, writing PREFIX.pstats, PREFIX.tracemalloc and PREFIX.txt. "
+                             "cProfile only sees the main thread (including the server's event loop); "
+                             "work on the worker pool is not profiled")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Entry point: runs batch mode when requested, otherwise the interactive calculator."""
+    args = parse_args(argv)
+    if args.profile is None:
+        return run_session(args)
+    from calculator.profiling import SessionProfiler  # cProfile and tracemalloc only when asked for
+    profiler = SessionProfiler(args.profile)
+    try:
+        with profiler:
+            run_session(args)
+    finally:
+        profiler.print_summary()
+
+def run_session(args):
+    """Runs the mode selected on the command line."""
+    if args.batch is not None:
+        run_batch(args.batch, args.output, args.format, args.backend)
+    elif args.serve is not None:
+        run_server(args.serve, args.offload, args.backend)
+    else:
+        interactive_calculator(args.backend)
+
 if __name__ == "__main__":
-    interactive_calculator()
\ No newline at end of file
+    main()
\ No newline at end of file
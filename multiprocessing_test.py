@@ -1,13 +1,21 @@
 from calculator.calculator import Calculator
-from calculator.commands import AddCommand, DivideCommand
+from calculator.commands import AddCommand, DivideCommand, MultiplyCommand
 
 if __name__ == "__main__":
-    calc = Calculator()
+    with Calculator() as calc:
+        # Example: Running AddCommand with multiprocessing
+        add_command = AddCommand(10, 5)
+        calc.compute_with_multiprocessing(add_command)
 
-    # Example: Running AddCommand with multiprocessing
-    add_command = AddCommand(10, 5)
-    calc.compute_with_multiprocessing(add_command)
+        # Example: Running DivideCommand with multiprocessing
+        divide_command = DivideCommand(20, 4)
+        calc.compute_with_multiprocessing(divide_command)
 
-    # Example: Running DivideCommand with multiprocessing
-    divide_command = DivideCommand(20, 4)
-    calc.compute_with_multiprocessing(divide_command)
+        # Example: Submitting a command and collecting its Future
+        future = calc.submit(MultiplyCommand(6, 7))
+        print(f"Result of submitted MultiplyCommand: {future.result()}")
+
+        # Example: Mapping many commands over the worker pool in chunks
+        commands = [AddCommand(i, i) for i in range(1000)]
+        results = list(calc.map(commands, chunksize=100))
+        print(f"Mapped {len(results)} commands, last result: {results[-1]}")
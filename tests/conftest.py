@@ -1,11 +1,9 @@
 import pytest
 from decimal import Decimal
-from faker import Faker
 from calculator.operations import add, subtract, multiply, divide
+from calculator.workload import WorkloadGenerator
 
-fake = Faker()
-
-def generate_test_data(num_records):
+def generate_test_data(num_records, seed=None):
     # Define operation mappings for both Calculator and Calculation tests
     operation_mappings = {
         'add': add,
@@ -13,39 +11,48 @@ def generate_test_data(num_records):
         'multiply': multiply,
         'divide': divide
     }
-    
-    # Generate test data
-    for _ in range(num_records):
-        a = Decimal(fake.random_number(digits=2))
-        b = Decimal(fake.random_number(digits=2)) if _ % 4 != 3 else Decimal(fake.random_number(digits=1))
-        operation_name = fake.random_element(elements=list(operation_mappings.keys()))
-        operation_func = operation_mappings[operation_name]
 
-        # Ensure b is not zero for divide operations
-        if operation_func == divide:
-            b = Decimal('1') if b == Decimal('0') else b
+    # Operands and operations are drawn in bulk; zero divisors of divide are replaced with 1
+    generator = WorkloadGenerator(seed)
+    names, a_values, b_values = generator.arrays(num_records)
+    # Every fourth record gets a 1-digit b, so small divisors and operands stay covered
+    short = generator.operands(num_records, digits=1)
+    for index in range(3, num_records, 4):
+        b_values[index] = short[index] or (1 if names[index] == 'divide' else 0)
+
+    for operation_name, a, b in zip(names, map(Decimal, a_values), map(Decimal, b_values)):
+        operation_func = operation_mappings[operation_name]
 
         try:
             expected = operation_func(a, b)
         except ZeroDivisionError:
             expected = "ZeroDivisionError"
         except ValueError as ve:
-            if str(ve) == "Cannot divide by zero":
-                expected = "Cannot divide by zero"
+            if str(ve) == "Cannot divide by zero.":
+                expected = "Cannot divide by zero."
             else:
                 raise ve  # Re-raise other value errors not related to divide by zero
 
         yield a, b, operation_name, operation_func, expected
 
 
+@pytest.fixture(autouse=True, scope="session")
+def plugin_manifest(tmp_path_factory):
+    """Keep plugin discovery in tests, and in the processes they start, out of ~/.cache."""
+    path = tmp_path_factory.mktemp("plugins") / "plugin_manifest.json"
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setenv("CALCULATOR_PLUGIN_MANIFEST", str(path))
+        yield path
+
 def pytest_addoption(parser):
     parser.addoption("--num_records", action="store", default=5, type=int, help="Number of test records to generate")
+    parser.addoption("--seed", action="store", default=0, type=int, help="Seed for the generated test records")
 
 def pytest_generate_tests(metafunc):
     # Check if the test is expecting any of the dynamically generated fixtures
     if {"a", "b", "expected"}.intersection(set(metafunc.fixturenames)):
         num_records = metafunc.config.getoption("num_records")
-        parameters = list(generate_test_data(num_records))
+        parameters = list(generate_test_data(num_records, metafunc.config.getoption("seed")))
 
         # Adjust parameters according to the requested test function
         if 'operation_name' in metafunc.fixturenames:
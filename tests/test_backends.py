@@ -0,0 +1,70 @@
+import decimal
+from decimal import Decimal, InvalidOperation
+import pytest
+from calculator.backends import (DecimalBackend, FloatBackend, IntBackend, NumericBackend,
+                                 get_backend)
+from calculator.commands import DivideCommand
+
+def test_int_backend():
+    """The int backend parses whole numbers and rejects anything else."""
+    backend = IntBackend()
+    assert backend.convert("42") == 42 and type(backend.convert("42")) is int
+    with pytest.raises(InvalidOperation):
+        backend.convert("1.5")
+
+def test_int_backend_division():
+    """Under the int backend, ints divide exactly or raise; outside it, division is unchanged."""
+    backend = IntBackend()
+    with backend.context():
+        assert DivideCommand(8, 2).execute() == 4 and type(DivideCommand(8, 2).execute()) is int
+        assert DivideCommand(10 ** 30 + 1, 1).execute() == 10 ** 30 + 1, "Large quotients stay exact"
+        with pytest.raises(ValueError, match="7 / 2 is not a whole number"):
+            DivideCommand(7, 2).execute()
+        assert DivideCommand(Decimal(7), Decimal(2)).execute() == Decimal('3.5')
+    assert DivideCommand(7, 2).execute() == 3.5
+
+def test_float_backend():
+    """The float backend parses floats and rejects invalid input."""
+    backend = FloatBackend()
+    assert backend.convert("1.5") == 1.5
+    with pytest.raises(InvalidOperation):
+        backend.convert("abc")
+
+def test_decimal_backend_context():
+    """Commands run under the configured precision and rounding."""
+    backend = DecimalBackend(precision=50, rounding=decimal.ROUND_DOWN)
+    with backend.context():
+        value = Decimal(2) / Decimal(3)
+    assert len(str(value)) == 52 and str(value).endswith('6')
+    assert decimal.getcontext().prec == 28, "The context is restored afterwards"
+    assert backend.convert("0.1") == Decimal("0.1")
+
+def test_decimal_backend_validation():
+    """Precision and rounding are validated."""
+    with pytest.raises(ValueError, match="precision must be at least 1"):
+        DecimalBackend(precision=0)
+    with pytest.raises(ValueError, match="Unknown rounding mode: ROUND_SIDEWAYS"):
+        DecimalBackend(rounding='ROUND_SIDEWAYS')
+
+@pytest.mark.parametrize("spec, backend_type", [
+    ('int', IntBackend), ('float', FloatBackend), ('decimal', DecimalBackend),
+])
+def test_get_backend_from_name(spec, backend_type):
+    """Backends are resolved from their names."""
+    assert isinstance(get_backend(spec), backend_type)
+
+def test_get_backend_spec_options():
+    """Decimal specs may carry a precision and a rounding mode."""
+    backend = get_backend('decimal:60:round_half_up')
+    assert backend.precision == 60 and backend.rounding == decimal.ROUND_HALF_UP
+    assert get_backend(None) is None
+    assert get_backend(backend) is backend
+    with pytest.raises(ValueError, match="Unknown numeric backend: complex"):
+        get_backend('complex')
+    with pytest.raises(ValueError, match="Invalid decimal precision: abc"):
+        get_backend('decimal:abc')
+
+def test_base_backend_is_abstract():
+    """The base class needs a convert implementation."""
+    with pytest.raises(NotImplementedError):
+        NumericBackend().convert("1")
@@ -0,0 +1,76 @@
+from array import array
+from decimal import Decimal
+import pytest
+from calculator.batch import BatchResult, compute_batch
+from calculator.calculator import Calculator
+
+def test_compute_batch_float_arrays():
+    """Float array.array inputs produce a float array.array."""
+    result = compute_batch('add', array('d', [1.5, 2.5]), array('d', [1.0, 2.0]))
+    assert isinstance(result.values, array) and result.values.typecode == 'd'
+    assert list(result.values) == [2.5, 4.5], "Batch addition failed"
+    assert not any(result.mask), "No element should be masked"
+
+def test_compute_batch_int_arrays():
+    """Integer arrays stay integral except for division."""
+    a, b = array('i', [6, 7, 8]), array('i', [2, 3, 4])
+    assert list(compute_batch('multiply', a, b).values) == [12, 21, 32]
+    assert compute_batch('subtract', a, b).values.typecode == 'q'
+    assert list(compute_batch('divide', a, b).values) == [3.0, 7 / 3, 2.0]
+
+def test_compute_batch_int_overflow_keeps_exact_results():
+    """Integer results beyond int64 come back as exact Python ints instead of raising."""
+    big = array('q', [2 ** 62, 1])
+    result = compute_batch('multiply', big, array('q', [4, 2]))
+    assert list(result.values) == [2 ** 64, 2], "Overflowing products should stay exact"
+    assert compute_batch('add', big, array('q', [1, 1])).values.typecode == 'q', "Results that fit stay packed"
+    assert list(compute_batch('add', array('Q', [2 ** 64 - 1]), array('Q', [1])).values) == [2 ** 64]
+
+def test_compute_batch_divide_by_zero_mask():
+    """Division by zero is reported through the mask instead of raising."""
+    result = compute_batch('divide', array('d', [1.0, 2.0, 3.0]), array('d', [1.0, 0.0, 3.0]))
+    assert list(result.mask) == [0, 1, 0], "Mask should flag the zero divisor"
+    assert list(result.values) == [1.0, 0.0, 1.0], "Masked results should be zero"
+    assert result.error_count == 1
+
+def test_compute_batch_decimal_sequences():
+    """Decimal operands fall back to an element-wise loop."""
+    a = [Decimal('10'), Decimal('1'), Decimal('7.5')]
+    b = [Decimal('4'), Decimal('0'), Decimal('2.5')]
+    result = compute_batch('divide', a, b)
+    assert result.values == [Decimal('2.5'), Decimal('0'), Decimal('3')]
+    assert list(result.mask) == [0, 1, 0]
+
+def test_compute_batch_errors():
+    """Unknown operations and mismatched lengths raise ValueError."""
+    with pytest.raises(ValueError, match="Unknown operation: modulus"):
+        compute_batch('modulus', [1], [2])
+    with pytest.raises(ValueError, match="differ in length"):
+        compute_batch('add', [1, 2], [3])
+
+def test_compute_batch_numpy():
+    """NumPy arrays are computed with a single vectorised kernel."""
+    numpy = pytest.importorskip("numpy")
+    result = compute_batch('divide', numpy.array([4, 9, 1]), numpy.array([2, 3, 0]))
+    assert result.values.tolist() == [2.0, 3.0, 0.0]
+    assert result.mask.tolist() == [False, False, True]
+    assert compute_batch('add', numpy.arange(3), numpy.arange(3)).values.tolist() == [0, 2, 4]
+
+def test_compute_batch_numpy_object_and_overflow():
+    """Object operands give a 1-d object array, and int64 overflow falls back to exact ints."""
+    numpy = pytest.importorskip("numpy")
+    result = compute_batch('add', numpy.array([Decimal('1.5'), Decimal('2')], dtype=object),
+                           numpy.array([Decimal('1'), Decimal('1')], dtype=object))
+    assert result.values.shape == (2,), "Results should not collapse into a 0-d array"
+    assert result.values.tolist() == [Decimal('2.5'), Decimal('3')]
+    result = compute_batch('multiply', numpy.array([2 ** 62] * 3), numpy.array([4] * 3))
+    assert result.values.tolist() == [2 ** 64] * 3, "int64 products should not wrap around"
+    assert compute_batch('multiply', numpy.array([3]), numpy.array([4])).values.dtype.kind == 'i'
+
+def test_calculator_compute_batch():
+    """Calculator.compute_batch delegates to the batch kernels without touching history."""
+    calc = Calculator()
+    result = calc.compute_batch('multiply', array('d', [2.0]), array('d', [4.0]))
+    assert isinstance(result, BatchResult)
+    assert list(result.values) == [8.0]
+    assert calc.history == [], "Batch computations should not be stored in history"
@@ -0,0 +1,83 @@
+import sys
+from contextlib import contextmanager
+from benchmarks.cases import bench_add_calculation, bench_compute, bench_load_plugin
+from benchmarks.harness import compare, format_report, load_baseline, measure, save_baseline, time_case
+from calculator.calculations import FLUSH_THRESHOLD, Calculations
+from calculator.commands import MultiplyCommand
+
+def test_measure_returns_per_call_time():
+    """measure reports a positive per-call time."""
+    calls = []
+    seconds = measure(lambda: calls.append(1), repeat=2, number=10)
+    assert seconds > 0 and len(calls) == 20
+
+def test_time_case_releases_context_manager_cases():
+    """A case given as a context manager is exited once it has been timed."""
+    events = []
+
+    @contextmanager
+    def case():
+        events.append('enter')
+        yield lambda: None
+        events.append('exit')
+    assert time_case(case, repeat=1) > 0
+    assert events == ['enter', 'exit'], "The case should be cleaned up after timing"
+
+def test_bench_compute_executes_every_call(monkeypatch):
+    """The compute benchmark times real work, not a command's cached result."""
+    executions = []
+    execute = MultiplyCommand.execute
+    monkeypatch.setattr(MultiplyCommand, 'execute', lambda self: executions.append(1) or execute(self))
+    run = bench_compute()
+    run()
+    run()
+    assert len(executions) == 2
+
+def test_compare_flags_regressions_beyond_threshold():
+    """Only benchmarks slower than baseline * (1 + threshold) are regressions."""
+    baseline = {'fast': 1.0, 'slow': 1.0, 'ok': 1.0}
+    results = {'fast': 0.5, 'slow': 1.5, 'ok': 1.2, 'new': 9.0}
+    regressions = compare(results, baseline, threshold=0.25)
+    assert [regression['name'] for regression in regressions] == ['slow']
+    assert regressions[0]['ratio'] == 1.5
+
+def test_baseline_round_trip(tmp_path):
+    """Saved baselines are merged with existing entries."""
+    path = str(tmp_path / "baseline.json")
+    assert load_baseline(path) == {}
+    save_baseline({'a': 1.0}, path)
+    save_baseline({'b': 2.0}, path)
+    assert load_baseline(path) == {'a': 1.0, 'b': 2.0}
+
+def test_format_report():
+    """The report shows the change against the baseline."""
+    report = format_report({'a': 2e-6, 'b': 1e-6}, {'a': 1e-6})
+    assert '+100%' in report and 'new' in report
+
+def test_measure_resets_before_every_run():
+    """reset runs untimed before each calibration and timed run."""
+    events = []
+    measure(lambda: events.append('call'), repeat=2, number=1, reset=lambda: events.append('reset'))
+    assert events == ['reset', 'call', 'reset', 'call']
+
+def test_bench_load_plugin_imports_on_every_call():
+    """The plugin benchmark times a real import, and leaves the original module in place."""
+    import calculator.plugins.multiply_plugin as plugin
+    with bench_load_plugin() as run:
+        run()
+        first = sys.modules['calculator.plugins.multiply_plugin']
+        run()
+        assert sys.modules['calculator.plugins.multiply_plugin'] is not first
+    assert sys.modules['calculator.plugins.multiply_plugin'] is plugin
+
+def test_bench_add_calculation_flushes_and_resets():
+    """Each call merges a full queue into the history, and reset restores the history size."""
+    run, reset = bench_add_calculation(100)()
+    try:
+        reset()
+        run()
+        assert len(Calculations.history) == 100 + FLUSH_THRESHOLD, "The flush is part of the call"
+        reset()
+        assert len(Calculations.get_history()) == 100
+    finally:
+        Calculations.clear_history()
@@ -0,0 +1,25 @@
+import math
+from decimal import Decimal
+import pytest
+from calculator.plugins.binomial_plugin import BinomialCommand, register
+
+def test_binomial_command():
+    """Binomial coefficients are exact for small and large n."""
+    assert BinomialCommand(5, 2).execute() == 10, "BinomialCommand execute method failed"
+    assert BinomialCommand(Decimal('10'), Decimal('11')).execute() == Decimal('0')
+    assert BinomialCommand(5000, 1234).execute() == math.comb(5000, 1234)
+
+def test_binomial_command_errors():
+    """Negative and oversized arguments raise ValueError."""
+    with pytest.raises(ValueError, match="non-negative"):
+        BinomialCommand(5, -1).execute()
+    with pytest.raises(ValueError, match="n exceeds the limit"):
+        BinomialCommand(10 ** 7, 2).execute()
+    with pytest.raises(ValueError, match="n size in bits exceeds the limit of 17"):
+        BinomialCommand(Decimal('1e50000000'), 2).execute()  # Refused before converting to int
+    with pytest.raises(ValueError, match="k size in bits exceeds the limit"):
+        BinomialCommand(10, Decimal('-1e50000000')).execute()
+
+def test_binomial_command_register():
+    """Test the register function for BinomialCommand"""
+    assert register() == BinomialCommand, "BinomialCommand register function failed"
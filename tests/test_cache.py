@@ -0,0 +1,60 @@
+from decimal import Decimal, localcontext
+import pytest
+from calculator.cache import ResultCache, command_key
+from calculator.commands import AddCommand, DivideCommand
+from calculator.plugins.modpow_plugin import ModPowCommand
+
+def test_cache_hits_and_misses():
+    """Identical commands are computed once."""
+    cache = ResultCache(maxsize=10)
+    assert cache.execute(AddCommand(1, 2)) == 3
+    assert cache.execute(AddCommand(1, 2)) == 3
+    assert cache.info() == {'hits': 1, 'misses': 1, 'size': 1, 'maxsize': 10}
+
+def test_cache_stores_result_on_command():
+    """The result is stored on the command so repr does not recompute it."""
+    command = DivideCommand(Decimal('1'), Decimal('3'))
+    result = ResultCache().execute(command)
+    assert command.result is result
+
+def test_cache_lru_eviction():
+    """The least recently used result is evicted first."""
+    cache = ResultCache(maxsize=2)
+    cache.execute(AddCommand(1, 1))
+    cache.execute(AddCommand(2, 2))
+    cache.execute(AddCommand(1, 1))  # Refreshes (1, 1)
+    cache.execute(AddCommand(3, 3))  # Evicts (2, 2)
+    assert len(cache) == 2
+    cache.execute(AddCommand(2, 2))
+    assert cache.misses == 4 and cache.hits == 1
+
+def test_cache_does_not_store_errors():
+    """Failing commands raise every time and are not cached."""
+    cache = ResultCache()
+    for _ in range(2):
+        with pytest.raises(ValueError, match="Cannot divide by zero"):
+            cache.execute(DivideCommand(1, 0))
+    assert len(cache) == 0 and cache.misses == 2
+
+def test_command_key_distinguishes_exponent_and_precision():
+    """Equal Decimals with different exponents, or different contexts, get different keys."""
+    assert command_key(AddCommand(Decimal('1.0'), 1)) != command_key(AddCommand(Decimal('1'), 1))
+    key = command_key(DivideCommand(Decimal('1'), Decimal('3')))
+    with localcontext() as context:
+        context.prec = 50
+        assert command_key(DivideCommand(Decimal('1'), Decimal('3'))) != key
+
+def test_cache_clear_and_invalid_size():
+    """clear resets the cache and maxsize must be positive."""
+    cache = ResultCache()
+    cache.execute(AddCommand(1, 1))
+    cache.clear()
+    assert cache.info()['size'] == 0 and cache.hits == cache.misses == 0
+    with pytest.raises(ValueError, match="maxsize must be a positive integer"):
+        ResultCache(0)
+
+def test_command_key_includes_every_operand():
+    """Commands with more than two operands are keyed on all of them."""
+    cache = ResultCache()
+    assert cache.execute(ModPowCommand(2, 10, 1000)) == 24
+    assert cache.execute(ModPowCommand(2, 10, 7)) == 2, "A different modulus should not hit the cache"
@@ -1,11 +1,24 @@
 '''My Calculator Test'''
 
 # pylint: disable=unnecessary-dunder-call, invalid-name
+import statistics
+import subprocess
+import sys
+import threading
 from decimal import Decimal
+from fractions import Fraction
+from pathlib import Path
 import pytest
 from calculator.calculation import Calculation
 from calculator.calculations import Calculations
-from calculator.operations import add, subtract
+from calculator.commands import AddCommand, MultiplyCommand
+from calculator.history import HistoryView, OperationIndex
+from calculator.history_log import HistoryLog
+from calculator.operations import add, divide, subtract
+from calculator.plugins.factorial_plugin import FactorialCommand
+from calculator.plugins.modpow_plugin import ModPowCommand
+
+ROOT = Path(__file__).resolve().parent.parent
 
 # pytest.fixture to set up the calculation environment
 @pytest.fixture
@@ -59,3 +72,290 @@ def test_get_latest_with_empty_history():
     """Test getting the latest calculation when the history is empty."""
     Calculations.clear_history()
     assert Calculations.get_latest() is None, "Expected None when history is empty"
+
+@pytest.fixture
+def bounded_history():
+    """Temporarily bound the history, restoring an unbounded history afterwards."""
+    Calculations.clear_history()
+    yield
+    Calculations.configure()
+    Calculations.clear_history()
+
+@pytest.mark.usefixtures("bounded_history")
+def test_bounded_history_drops_oldest():
+    """A bounded history keeps only the newest calculations."""
+    Calculations.configure(capacity=2)
+    for value in range(4):
+        Calculations.add_calculation(Calculation(Decimal(value), Decimal('1'), add))
+    history = Calculations.get_history()
+    assert [calc.a for calc in history] == [Decimal('2'), Decimal('3')]
+    assert Calculations.get_latest().a == Decimal('3')
+
+@pytest.mark.usefixtures("bounded_history")
+def test_bounded_history_spills_to_disk(tmp_path):
+    """Evicted calculations are written to the spill file."""
+    spill_path = tmp_path / "history.jsonl"
+    Calculations.configure(capacity=1, eviction='spill', spill_path=str(spill_path))
+    Calculations.add_calculation(Calculation(Decimal('1'), Decimal('2'), add))
+    Calculations.add_calculation(Calculation(Decimal('3'), Decimal('4'), subtract))
+    assert len(Calculations.get_history()) == 1
+    assert list(Calculations.eviction_policy.read()) == [{'operation': 'add', 'arity': 2, 'operands': ['1', '2']}]
+
+@pytest.mark.usefixtures("bounded_history")
+def test_stats_keep_values_only_when_bounded():
+    """An unbounded history never evicts, so its statistics keep no window of values."""
+    for value in range(4):
+        Calculations.add_calculation(Calculation(Decimal(value), Decimal('1'), add))
+    assert not Calculations.stats.windowed
+    Calculations.configure(capacity=2)
+    assert Calculations.stats.windowed
+    assert Calculations.stats_by_operation('add')['total'] == Decimal('7'), "Rebuilt from the kept entries"
+    Calculations.add_calculation(Calculation(Decimal('9'), Decimal('1'), add))
+    assert Calculations.stats_by_operation('add')['total'] == Decimal('14')
+    Calculations.configure()
+    assert not Calculations.stats.windowed
+    assert Calculations.stats_by_operation('add')['min'] == Decimal('4')
+
+@pytest.mark.usefixtures("bounded_history")
+def test_configure_keeps_newest_entries():
+    """Shrinking the capacity keeps the most recent calculations."""
+    for value in range(5):
+        Calculations.add_calculation(Calculation(Decimal(value), Decimal('1'), add))
+    Calculations.configure(capacity=2)
+    assert [calc.a for calc in Calculations.get_history()] == [Decimal('3'), Decimal('4')]
+
+def test_get_history_returns_read_only_view():
+    """get_history returns a view rather than a copy."""
+    history = Calculations.get_history()
+    assert isinstance(history, HistoryView)
+    with pytest.raises(TypeError):
+        history[0] = None
+
+@pytest.mark.usefixtures("bounded_history")
+def test_operation_queries_use_index():
+    """Counts, slices and time ranges are answered per operation."""
+    Calculations.configure(capacity=4)
+    before = Calculations.clock()
+    for value in range(6):
+        operation = add if value % 2 == 0 else subtract
+        Calculations.add_calculation(Calculation(Decimal(value), Decimal('1'), operation))
+    # Entries 0 and 1 were evicted by the capacity of four
+    assert Calculations.count_by_operation('add') == 2
+    assert [calc.a for calc in Calculations.find_by_operation('add')] == [Decimal('2'), Decimal('4')]
+    assert [calc.a for calc in Calculations.find_by_operation('subtract', -1)] == [Decimal('5')]
+    in_range = Calculations.find_by_operation_between('subtract', before, Calculations.clock())
+    assert [calc.a for calc in in_range] == [Decimal('3'), Decimal('5')]
+    Calculations.clear_history()
+    assert Calculations.count_by_operation('add') == 0
+    assert Calculations.find_by_operation('add') == []
+
+@pytest.mark.usefixtures("bounded_history")
+def test_find_by_operation_with_commands():
+    """Commands stored by the CLI are indexed by their operation name."""
+    Calculations.add_calculation(AddCommand(Decimal('1'), Decimal('2')))
+    assert Calculations.count_by_operation('add') == 1
+
+@pytest.mark.usefixtures("bounded_history")
+def test_columnar_backend():
+    """The columnar backend stores entries compactly and rebuilds them on access."""
+    Calculations.configure(capacity=2, backend='columnar')
+    for value in range(3):
+        Calculations.add_calculation(Calculation(Decimal(value), Decimal('1'), add))
+    assert [calc.a for calc in Calculations.get_history()] == [Decimal('1'), Decimal('2')]
+    assert Calculations.get_latest().perform() == Decimal('3')
+    assert Calculations.count_by_operation('add') == 2
+    with pytest.raises(ValueError, match="Unknown history backend: sqlite"):
+        Calculations.configure(backend='sqlite')
+
+@pytest.mark.usefixtures("bounded_history")
+def test_history_log_restores_history(tmp_path):
+    """Calculations written to the log are restored after a restart."""
+    log_path = str(tmp_path / "history.log")
+    Calculations.attach_log(log_path)
+    Calculations.add_calculation(Calculation(Decimal('1'), Decimal('2'), add))
+    Calculations.add_calculation(Calculation(Decimal('3'), Decimal('4'), subtract))
+    Calculations.detach_log()
+    Calculations.clear_history()
+
+    Calculations.configure(capacity=1)
+    log = Calculations.attach_log(log_path)
+    assert len(log) == 2, "The log keeps every entry"
+    assert [calc.a for calc in Calculations.get_history()] == [Decimal('3')]
+    Calculations.clear_history()
+    Calculations.detach_log()
+    Calculations.attach_log(log_path)
+    assert len(Calculations.get_history()) == 0, "clear_history is recorded in the log"
+    Calculations.detach_log()
+
+@pytest.mark.usefixtures("bounded_history")
+def test_unary_and_ternary_commands_round_trip(tmp_path):
+    """Commands of any arity survive the log, the columnar backend, spilling and export."""
+    log_path, spill_path = str(tmp_path / "history.log"), tmp_path / "spill.jsonl"
+    Calculations.configure(capacity=2, backend='columnar', eviction='spill', spill_path=str(spill_path))
+    Calculations.attach_log(log_path)
+    for command in (FactorialCommand(Decimal('5')), ModPowCommand(3, 4, 5), FactorialCommand(3)):
+        Calculations.add_calculation(command)
+    Calculations.export_history(str(tmp_path / "history.csv"), 'csv')
+    Calculations.detach_log()
+    assert [entry.result for entry in Calculations.get_history()] == [1, 6]
+    assert list(Calculations.eviction_policy.read()) == [{'operation': 'factorial', 'arity': 1, 'operands': ['5']}]
+    Calculations.clear_history()
+    assert Calculations.import_history(str(tmp_path / "history.csv")) == 2
+    assert [entry.result for entry in Calculations.get_history()] == [1, 6]
+    Calculations.configure()
+    Calculations.clear_history()
+    Calculations.attach_log(log_path)
+    assert [entry.result for entry in Calculations.get_history()] == [120, 1, 6], "The log keeps every entry"
+    Calculations.detach_log()
+
+@pytest.mark.usefixtures("bounded_history")
+def test_logged_entries_are_written_when_added(tmp_path):
+    """With a log attached, add_calculation writes the record before returning."""
+    log_path = str(tmp_path / "history.log")
+    Calculations.attach_log(log_path, sync_every=1)
+    try:
+        for value in range(10):
+            Calculations.add_calculation(Calculation(Decimal(value), Decimal('1'), add))
+        with HistoryLog(log_path) as reader:
+            assert [calc.a for calc in reader] == [Decimal(value) for value in range(10)]
+    finally:
+        Calculations.detach_log()
+
+def test_log_is_synced_on_exit(tmp_path):
+    """Records still buffered when the interpreter exits reach the file."""
+    log_path = str(tmp_path / "history.log")
+    script = ("from decimal import Decimal\n"
+              "from calculator.calculation import Calculation\n"
+              "from calculator.calculations import Calculations\n"
+              "from calculator.operations import add\n"
+              f"Calculations.attach_log({log_path!r})\n"
+              "for value in range(3):\n"
+              "    Calculations.add_calculation(Calculation(Decimal(value), Decimal('1'), add))\n")
+    subprocess.run([sys.executable, '-c', script], cwd=ROOT, check=True)
+    with HistoryLog(log_path) as reader:
+        assert len(reader) == 3
+
+@pytest.mark.usefixtures("bounded_history")
+def test_rejected_entry_raises_to_its_producer(tmp_path):
+    """An entry the log cannot store fails in add_calculation and never reaches the history."""
+    Calculations.attach_log(str(tmp_path / "history.log"))
+    try:
+        Calculations.add_calculation(Calculation(Decimal('1'), Decimal('2'), add))
+        with pytest.raises(TypeError, match="Cannot log operand of type Fraction"):
+            Calculations.add_calculation(Calculation(Fraction(1, 3), Decimal('2'), add))
+        Calculations.add_calculation(Calculation(Decimal('3'), Decimal('4'), add))
+        assert [calc.a for calc in Calculations.get_history()] == [Decimal('1'), Decimal('3')]
+    finally:
+        Calculations.detach_log()
+
+@pytest.mark.usefixtures("bounded_history")
+def test_failed_flush_keeps_later_entries(monkeypatch):
+    """A store that fails during a merge drops only that entry; the rest stay queued."""
+    history = Calculations.history
+    append = history.append
+
+    def refuse_two(entry):
+        if entry.a == Decimal('2'):
+            raise ValueError("refused")
+        return append(entry)
+
+    monkeypatch.setattr(history, 'append', refuse_two, raising=False)
+    for value in range(4):
+        Calculations.add_calculation(Calculation(Decimal(value), Decimal('1'), add))
+    with pytest.raises(ValueError, match="refused"):
+        Calculations.get_history()
+    assert [calc.a for calc in Calculations.get_history()] == [Decimal('0'), Decimal('1'), Decimal('3')]
+    assert Calculations.count_by_operation('add') == 3, "The index should match the stored entries"
+
+def test_index_times_stay_sorted():
+    """Entries numbered out of clock order keep the index's time ranges searchable."""
+    index = OperationIndex()
+    for seq, timestamp in enumerate([1.0, 3.0, 2.0, 4.0]):
+        index.add('add', seq, timestamp)
+    assert index.seqs_between('add', 2.5, 3.5) == [1, 2]
+
+@pytest.mark.usefixtures("bounded_history")
+def test_concurrent_producers():
+    """Many threads can add calculations at once without losing any."""
+    def produce(worker):
+        for value in range(500):
+            Calculations.add_calculation(Calculation(Decimal(worker), Decimal(value), add))
+            if value % 100 == 0:
+                Calculations.count_by_operation('add')  # Readers run concurrently with writers
+
+    threads = [threading.Thread(target=produce, args=(worker,)) for worker in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert Calculations.count_by_operation('add') == 4000
+    history = Calculations.get_history()
+    assert len(history) == 4000
+    # Each producer's own entries keep their order
+    for worker in range(8):
+        values = [calc.b for calc in history if calc.a == Decimal(worker)]
+        assert values == [Decimal(value) for value in range(500)]
+
+@pytest.mark.usefixtures("bounded_history")
+def test_snapshot_is_unaffected_by_clear():
+    """A snapshot keeps its entries after the history is cleared."""
+    Calculations.add_calculation(Calculation(Decimal('1'), Decimal('2'), add))
+    snapshot = Calculations.get_history(snapshot=True)
+    Calculations.clear_history()
+    assert len(snapshot) == 1 and len(Calculations.get_history()) == 0
+
+@pytest.mark.usefixtures("bounded_history")
+def test_stats_by_operation():
+    """Per-operation aggregates track results as calculations are added and cleared."""
+    for a_value, b_value in (('1', '2'), ('3', '4'), ('10', '0')):
+        Calculations.add_calculation(Calculation(Decimal(a_value), Decimal(b_value), add))
+    Calculations.add_calculation(Calculation(Decimal('1'), Decimal('0'), divide))
+    stats = Calculations.stats_by_operation('add')
+    assert stats['count'] == 3 and stats['total'] == Decimal('20')
+    assert stats['min'] == Decimal('3') and stats['max'] == Decimal('10')
+    assert stats['mean'] == pytest.approx(20 / 3)
+    assert stats['variance'] == pytest.approx(statistics.pvariance([3, 7, 10]))
+    assert Calculations.stats_by_operation('divide')['count'] == 0, "Failed results are not aggregated"
+    Calculations.clear_history()
+    assert Calculations.stats_by_operation('add')['count'] == 0, "Clearing should reset the aggregates"
+
+@pytest.mark.usefixtures("bounded_history")
+def test_stats_follow_eviction():
+    """Aggregates of a bounded history only cover the entries still held."""
+    Calculations.configure(capacity=3, backend='columnar')
+    values = [5, 1, 9, 2, 7, 3]
+    for value in values:
+        Calculations.add_calculation(Calculation(Decimal(value), Decimal('0'), add))
+    stats = Calculations.stats_by_operation('add')
+    assert stats['count'] == 3 and stats['total'] == Decimal('12')
+    assert (stats['min'], stats['max']) == (Decimal('2'), Decimal('7')), "Evicted extremes should be forgotten"
+    assert stats['variance'] == pytest.approx(statistics.pvariance([2, 7, 3]))
+    Calculations.configure(capacity=1)
+    assert Calculations.stats_by_operation('add')['total'] == Decimal('3')
+
+@pytest.mark.usefixtures("bounded_history")
+def test_results_beyond_float_range_keep_history_consistent():
+    """A result too large for a float is stored, indexed and aggregated like any other."""
+    Calculations.configure(capacity=2)
+    Calculations.add_calculation(MultiplyCommand(10 ** 200, 10 ** 200))
+    Calculations.add_calculation(AddCommand(1, 2))
+    Calculations.add_calculation(MultiplyCommand(10 ** 200, 2 * 10 ** 200))
+    assert [repr(entry) for entry in Calculations.find_by_operation('multiply')] == \
+        [f"Multiply {10 ** 200} and {2 * 10 ** 200} = {2 * 10 ** 400}"]
+    assert len(Calculations.get_history()) == 2
+    stats = Calculations.stats_by_operation('multiply')
+    assert stats['count'] == 1 and stats['mean'] == Decimal('2E+400'), "The evicted product should be forgotten"
+
+@pytest.mark.usefixtures("bounded_history")
+def test_export_and_import_history(tmp_path):
+    """Exported history can be imported into another history, index and statistics included."""
+    for value in range(5):
+        Calculations.add_calculation(Calculation(Decimal(value), Decimal('2'), add))
+    Calculations.add_calculation(AddCommand(Decimal('1'), Decimal('1')))
+    path = str(tmp_path / "history.bin")
+    assert Calculations.export_history(path) == 6
+    Calculations.clear_history()
+    assert Calculations.import_history(path, chunk_size=4) == 6
+    assert [calc.a for calc in Calculations.get_history()][:5] == [Decimal(value) for value in range(5)]
+    assert Calculations.count_by_operation('add') == 6
+    assert Calculations.stats_by_operation('add')['total'] == Decimal('22')
@@ -1,6 +1,9 @@
 import pytest
+from decimal import Decimal
 from calculator.calculator import Calculator
 from calculator.commands import AddCommand, SubtractCommand, MultiplyCommand, DivideCommand
+from calculator.metrics import Metrics
+from calculator.reduction import SumCommand
 import multiprocessing
 
 # Fixture to set up a calculator instance before each test
@@ -87,3 +90,117 @@ def test_create_command_failure():
     calc = Calculator()
     with pytest.raises(ValueError, match="Plugin not found: non_existent_plugin"):
         calc.create_command('non_existent_plugin', 2, 3)  # Test for plugin that hasn’t been loaded
+
+# Worker pool tests
+def test_compute_with_multiprocessing_returns_result(capsys):
+    multiprocessing.set_start_method('fork', force=True)
+    with Calculator(max_workers=1) as calc:
+        result = calc.compute_with_multiprocessing(MultiplyCommand(6, 7))
+    assert result == 42, "compute_with_multiprocessing should return the result"
+    assert "Result of MultiplyCommand: 42" in capsys.readouterr().out
+
+def test_submit_returns_future():
+    with Calculator(max_workers=2, start_method='fork') as calc:
+        future = calc.submit(AddCommand(2, 3))
+        assert future.result() == 5, "Future did not resolve to the command result"
+
+def test_submit_propagates_errors():
+    with Calculator(max_workers=1, start_method='fork') as calc:
+        future = calc.submit(DivideCommand(1, 0))
+        with pytest.raises(ValueError, match="Cannot divide by zero"):
+            future.result()
+
+def test_map_in_chunks():
+    commands = [AddCommand(i, 1) for i in range(50)]
+    with Calculator(max_workers=2, start_method='fork') as calc:
+        results = list(calc.map(commands, chunksize=8))
+    assert results == [i + 1 for i in range(50)], "map should return results in order"
+
+def test_map_rejects_invalid_chunksize():
+    calc = Calculator(max_workers=1)
+    with pytest.raises(ValueError, match="chunksize must be at least 1"):
+        calc.map([AddCommand(1, 1)], chunksize=0)
+
+def test_pool_is_reused_and_restarts_after_shutdown():
+    calc = Calculator(max_workers=1, start_method='fork')
+    assert not calc.pool.running, "Workers should not start until first use"
+    calc.submit(AddCommand(1, 1)).result()
+    executor = calc.pool.executor
+    calc.submit(AddCommand(2, 2)).result()
+    assert calc.pool.executor is executor, "The worker pool should be reused between commands"
+    calc.shutdown()
+    assert not calc.pool.running, "shutdown should stop the worker pool"
+    assert calc.submit(AddCommand(3, 3)).result() == 6, "Pool should restart after shutdown"
+    calc.shutdown()
+
+# Result cache tests
+def test_compute_with_cache():
+    calc = Calculator(cache_size=4)
+    assert calc.compute(AddCommand(1, 2)) == 3
+    assert calc.compute(AddCommand(1, 2)) == 3
+    assert calc.cache.hits == 1 and calc.cache.misses == 1
+    assert len(calc.history) == 2, "Cached results are still recorded in history"
+
+def test_compute_without_cache_stores_result():
+    calc = Calculator()
+    command = MultiplyCommand(3, 4)
+    calc.compute(command)
+    assert calc.cache is None
+    assert command.result == 12
+
+# Instrumentation tests
+def test_compute_records_metrics():
+    metrics = Metrics()
+    calc = Calculator(metrics=metrics)
+    calc.compute(AddCommand(1, 2))
+    with pytest.raises(ValueError):
+        calc.compute(DivideCommand(1, 0))
+    snapshot = metrics.snapshot()
+    assert snapshot['add/compute']['commands'] == 1
+    assert snapshot['divide/compute']['errors'] == 1
+    assert snapshot['add/compute']['latency']['count'] == 1
+
+def test_plugin_commands_are_instrumented():
+    metrics = Metrics()
+    calc = Calculator(metrics=metrics)
+    calc.load_plugin('multiply_plugin')
+    calc.compute(calc.create_command('multiply_plugin', 2, 3))
+    assert metrics.snapshot()['multiply/compute']['commands'] == 1
+
+def test_pool_paths_record_metrics(capsys):
+    metrics = Metrics()
+    with Calculator(max_workers=1, start_method='fork', metrics=metrics) as calc:
+        calc.compute_with_multiprocessing(AddCommand(1, 1))
+        calc.submit(SubtractCommand(3, 1)).result()
+        list(calc.map([AddCommand(i, i) for i in range(4)], chunksize=2))
+    snapshot = metrics.snapshot()
+    assert snapshot['add/multiprocessing']['commands'] == 1
+    assert snapshot['add/pool_map']['commands'] == 4
+    # The done-callback may run just after result() returns
+    assert snapshot.get('subtract/pool', {'commands': 1})['commands'] == 1
+
+def test_metrics_disabled_by_default():
+    assert Calculator().metrics is None
+
+# Numeric backend tests
+def test_compute_with_decimal_backend():
+    calc = Calculator(backend='decimal:5')
+    assert calc.compute(DivideCommand(Decimal(1), Decimal(3))) == Decimal('0.33333')
+
+def test_compute_backend_per_request():
+    calc = Calculator()
+    result = calc.compute(DivideCommand(Decimal(1), Decimal(3)), backend='decimal:40')
+    assert len(str(result)) == 42
+    assert len(str(calc.compute(DivideCommand(Decimal(1), Decimal(3))))) == 30
+
+def test_pool_paths_use_the_backend(capsys):
+    """Every worker-pool entry point runs commands under the calculator's backend."""
+    with Calculator(max_workers=1, start_method='fork', backend='decimal:50') as calc:
+        expected = calc.compute(DivideCommand(Decimal(1), Decimal(3)))
+        assert len(str(expected)) == 52, "compute should use 50 digits"
+        assert calc.submit(DivideCommand(Decimal(1), Decimal(3))).result() == expected
+        assert list(calc.map([DivideCommand(Decimal(1), Decimal(3))])) == [expected]
+        assert calc.compute_with_multiprocessing(DivideCommand(Decimal(1), Decimal(3))) == expected
+        nested = AddCommand(DivideCommand(Decimal(1), Decimal(3)), Decimal(0))
+        assert calc.evaluate(nested, parallel=True) == [expected]
+        assert calc.reduce(SumCommand([expected, expected])) == Decimal('0.' + '6' * 50)
@@ -0,0 +1,93 @@
+import sys
+from decimal import Decimal
+import pytest
+from calculator.calculation import Calculation
+from calculator.columnar import ColumnarHistory, pack_operand, unpack_operand
+from calculator.commands import AddCommand, DivideCommand
+from calculator.operations import add, multiply
+from calculator.plugins.factorial_plugin import FactorialCommand
+from calculator.plugins.modpow_plugin import ModPowCommand
+
+@pytest.mark.parametrize("value", [
+    Decimal('1.25'), Decimal('-3'), Decimal('0'), Decimal('1E+5'), 7, -2 ** 63, 2.5, -0.0,
+])
+def test_pack_round_trip(value):
+    """Packable numbers come back with the same value and type."""
+    packed = pack_operand(value)
+    assert packed is not None
+    restored = unpack_operand(*packed)
+    assert type(restored) is type(value)
+    assert str(restored) == str(value)
+
+@pytest.mark.parametrize("value", [
+    Decimal('NaN'), Decimal('-0'), Decimal('1E-200'), Decimal(2 ** 70), 2 ** 64, True, 'x',
+])
+def test_pack_rejects_unpackable(value):
+    """Values that do not fit the fixed-width columns are not packed."""
+    assert pack_operand(value) is None
+
+def test_columnar_history_rebuilds_entries():
+    """Entries are rebuilt lazily as equivalent Calculation and Command objects."""
+    history = ColumnarHistory()
+    history.append(Calculation(Decimal('1.5'), Decimal('2'), add))
+    history.append(DivideCommand(Decimal('9'), Decimal(2 ** 70)))
+    first, second = history
+    assert isinstance(first, Calculation) and first.operation is add
+    assert first.perform() == Decimal('3.5')
+    assert isinstance(second, DivideCommand) and second.b == Decimal(2 ** 70)
+    assert history[-1].a == Decimal('9')
+
+def test_columnar_history_evicts_oldest():
+    """A bounded columnar history behaves like a ring buffer."""
+    history = ColumnarHistory(2)
+    evicted = [history.append(AddCommand(i, Decimal('NaN'))) for i in range(4)]
+    assert evicted[:2] == [None, None]
+    assert evicted[2].a == 0 and evicted[3].a == 1
+    assert [entry.a for entry in history] == [2, 3]
+    assert history.first_seq == 2 and history.get_by_seq(3).a == 3
+    with pytest.raises(IndexError, match="has been evicted"):
+        history.get_by_seq(1)
+    history.clear()
+    assert len(history) == 0
+
+def test_columnar_history_mixed_arity():
+    """Rows widen for ternary commands and keep the operands of earlier rows."""
+    history = ColumnarHistory(3)
+    history.append(FactorialCommand(5))
+    history.append(AddCommand(1, 2 ** 70))
+    history.append(ModPowCommand(3, 4, Decimal('5')))
+    evicted = history.append(FactorialCommand(Decimal('3')))
+    assert isinstance(evicted, FactorialCommand) and evicted.a == 5
+    assert [entry.result for entry in history] == [1 + 2 ** 70, 1, 6]
+    assert history[1].modulus == Decimal('5') and history[0].b == 2 ** 70
+
+def test_columnar_history_keeps_command_results(monkeypatch):
+    """Commands are rebuilt with their stored result instead of executing again."""
+    history = ColumnarHistory(3)
+    history.append(Calculation(Decimal('1'), Decimal('2'), add))
+    first, second, pending = AddCommand(Decimal('1.5'), 2), FactorialCommand(30), AddCommand(1, 2)
+    assert first.result == Decimal('3.5') and second.result == 265252859812191058636308480000000
+    for command in (first, second, pending):
+        history.append(command)
+    executions = []
+    monkeypatch.setattr(AddCommand, 'execute', lambda self: executions.append(self) or self.a + self.b)
+    monkeypatch.setattr(FactorialCommand, 'execute', lambda self: executions.append(self))
+    restored = list(history)
+    assert restored[0].result == Decimal('3.5') and type(restored[0].result) is Decimal
+    assert restored[1].result == 265252859812191058636308480000000, "Results beyond int64 are kept too"
+    assert executions == [], "Stored results should not be recomputed"
+    assert restored[2].result == 3 and len(executions) == 1, "A result never computed is computed on demand"
+
+def test_columnar_history_is_compact():
+    """Column storage is an order of magnitude smaller than the entry objects."""
+    history = ColumnarHistory()
+    entries = [Calculation(Decimal(i), Decimal('0.5'), multiply) for i in range(1000)]
+    for entry in entries:
+        history.append(entry)
+    object_bytes = sum(sys.getsizeof(e) + sys.getsizeof(e.a) + sys.getsizeof(e.b) for e in entries)
+    assert history.nbytes() * 10 <= object_bytes
+
+def test_calculation_and_commands_use_slots():
+    """Calculation and Command objects have no per-instance __dict__."""
+    assert not hasattr(Calculation(Decimal('1'), Decimal('2'), add), '__dict__')
+    assert not hasattr(AddCommand(1, 2), '__dict__')
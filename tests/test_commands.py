@@ -32,3 +32,20 @@ def test_divide_command_by_zero_repr():
     divide_command = DivideCommand(10, 0)
     with pytest.raises(ValueError, match="Cannot divide by zero"):
         divide_command.execute()
+
+# Test that results are computed once and stored on the command
+def test_command_result_is_stored():
+    calls = []
+
+    class CountingCommand(AddCommand):
+        __slots__ = ()
+
+        def execute(self):
+            calls.append(1)
+            return super().execute()
+
+    command = CountingCommand(2, 3)
+    assert command.result == 5
+    assert repr(command) == "Add 2 and 3 = 5"
+    assert repr(command) == "Add 2 and 3 = 5"
+    assert len(calls) == 1, "repr should reuse the stored result"
@@ -0,0 +1,63 @@
+from decimal import Decimal
+import pytest
+from calculator.calculator import Calculator
+from calculator.commands import AddCommand, DivideCommand, MultiplyCommand, SubtractCommand
+from calculator.dag import CommandGraph, operand_names
+from calculator.plugins.modpow_plugin import ModPowCommand
+
+def test_operand_names():
+    """Operand slots are found on the command class, without the stored result."""
+    assert operand_names(AddCommand) == ('a', 'b')
+    assert operand_names(ModPowCommand) == ('a', 'b', 'modulus')
+
+def test_identical_subcommands_share_a_node():
+    """Equal subcommands, even separate objects, are computed once."""
+    graph = CommandGraph()
+    first = AddCommand(MultiplyCommand(2, 3), 1)
+    second = SubtractCommand(MultiplyCommand(2, 3), 1)
+    graph.add(first)
+    graph.add(second)
+    assert len(graph) == 3, "The two MultiplyCommand(2, 3) should be deduplicated"
+    assert Calculator().evaluate(first, second) == [7, 5]
+    assert second.a.result == 6, "Every equivalent command receives the shared result"
+
+def test_only_requested_commands_are_evaluated():
+    """Commands outside the requested subgraph are left alone."""
+    graph = CommandGraph()
+    wanted = graph.add(AddCommand(1, 2))
+    unwanted = DivideCommand(1, 0)
+    graph.add(unwanted)
+    graph.evaluate([wanted])
+    assert graph.results == {wanted: 3}, "Only the requested node should be computed"
+
+def test_long_chains():
+    """Deep dependency chains do not recurse."""
+    command = Decimal('0')
+    for _ in range(5000):
+        command = AddCommand(command, Decimal('1'))
+    calc = Calculator()
+    assert calc.evaluate(command) == [Decimal('5000')]
+    assert calc.history == [command], "Only the requested commands are added to history"
+
+def test_evaluate_in_parallel():
+    """Independent branches run on the worker pool and errors propagate."""
+    with Calculator(max_workers=2) as calc:
+        left = MultiplyCommand(AddCommand(1, 2), AddCommand(3, 4))
+        right = DivideCommand(SubtractCommand(10, 4), 3)
+        assert calc.evaluate(AddCommand(left, right), parallel=True) == [23.0]
+        with pytest.raises(ValueError, match="Cannot divide by zero"):
+            calc.evaluate(DivideCommand(1, SubtractCommand(2, 2)), parallel=True)
+
+def test_command_operands_outside_evaluate():
+    """compute, execute and repr resolve command operands too, instead of raising TypeError."""
+    from calculator.plugins.factorial_plugin import FactorialCommand
+    nested = AddCommand(MultiplyCommand(2, 3), 1)
+    calc = Calculator()
+    assert calc.compute(nested) == 7 and nested.a.result == 6
+    assert repr(nested) == "Add Multiply 2 and 3 = 6 and 1 = 7"
+    assert FactorialCommand(AddCommand(2, 1)).execute() == 6
+    assert ModPowCommand(2, SubtractCommand(12, 2), MultiplyCommand(10, 10)).execute() == 24
+    with pytest.raises(ValueError, match="Cannot divide by zero"):
+        calc.compute(DivideCommand(1, SubtractCommand(2, 2)))
+    with pytest.raises(TypeError):
+        AddCommand('1', 2).execute()  # Other invalid operands still fail as before
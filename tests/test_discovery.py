@@ -0,0 +1,112 @@
+import json
+import pytest
+from calculator.calculator import Calculator
+from calculator.commands import AddCommand
+from calculator.discovery import (PluginRegistry, discover_package_plugins, find_command,
+                                  load_manifest, load_target)
+
+PLUGIN_SOURCE = '''from calculator.commands import Command
+
+class {name}Command(Command):
+    __slots__ = ('a', 'b')
+
+    def __init__(self, a, b):
+        self.a = a
+        self.b = b
+
+    def execute(self):
+        return self.a {symbol} self.b
+
+def register():
+    return {name}Command
+'''
+
+@pytest.fixture
+def plugin_package(tmp_path, monkeypatch):
+    """A throwaway plugin package on sys.path."""
+    package = tmp_path / "extra_plugins"
+    package.mkdir()
+    (package / "__init__.py").write_text("")
+    (package / "modulo_plugin.py").write_text(PLUGIN_SOURCE.format(name='Modulo', symbol='%'))
+    (package / "helpers.py").write_text("")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    return package
+
+def test_discover_package_plugins():
+    """Bundled plugins are found by module name."""
+    plugins = discover_package_plugins()
+    assert plugins['add'] == 'calculator.plugins.add_plugin'
+    assert set(plugins) >= {'add', 'subtract', 'multiply', 'divide'}
+
+def test_manifest_is_cached_and_invalidated(plugin_package, tmp_path):
+    """The manifest is reused until the plugin directory changes."""
+    (tmp_path / "cache").mkdir()  # Keep the manifest out of the sys.path entry being watched
+    manifest_path = str(tmp_path / "cache" / "manifest.json")
+    plugins = load_manifest(manifest_path, package='extra_plugins')
+    assert plugins == {'modulo': 'extra_plugins.modulo_plugin'}
+
+    # A cached manifest is trusted while its signature matches
+    with open(manifest_path, encoding='utf-8') as manifest_file:
+        manifest = json.load(manifest_file)
+    manifest['plugins']['cached'] = 'extra_plugins.cached_plugin'
+    with open(manifest_path, 'w', encoding='utf-8') as manifest_file:
+        json.dump(manifest, manifest_file)
+    assert 'cached' in load_manifest(manifest_path, package='extra_plugins')
+
+    # Adding a plugin changes the directory mtime and forces a rescan
+    (plugin_package / "power_plugin.py").write_text(PLUGIN_SOURCE.format(name='Power', symbol='**'))
+    plugins = load_manifest(manifest_path, package='extra_plugins')
+    assert set(plugins) == {'modulo', 'power'}
+
+def test_entry_point_plugins_are_included(plugin_package, tmp_path, monkeypatch):
+    """Entry point plugins are merged into the manifest."""
+    monkeypatch.setattr('calculator.discovery.discover_entry_point_plugins',
+                        lambda group: {'double': 'extra_plugins.modulo_plugin:ModuloCommand'})
+    plugins = load_manifest(str(tmp_path / "manifest.json"), package='extra_plugins')
+    assert plugins['double'] == 'extra_plugins.modulo_plugin:ModuloCommand'
+
+def test_load_target_accepts_modules_classes_and_register_functions(plugin_package):
+    """Targets may be a module, a class or a register function."""
+    module_target = load_target('extra_plugins.modulo_plugin')
+    assert module_target.__name__ == 'ModuloCommand'
+    assert load_target('extra_plugins.modulo_plugin:ModuloCommand') is module_target
+    assert load_target('extra_plugins.modulo_plugin:register') is module_target
+
+def test_registry_imports_lazily(plugin_package):
+    """Plugins are only imported when their operation is first used."""
+    registry = PluginRegistry({'modulo': 'extra_plugins.modulo_plugin', 'add': AddCommand})
+    assert 'modulo' in registry and not registry.is_loaded('modulo')
+    assert registry['modulo'](7, 4).execute() == 3
+    assert registry.is_loaded('modulo')
+    assert registry.get('missing') is None
+    assert sorted(registry) == ['add', 'modulo'] and len(registry) == 2
+
+def test_registry_reports_broken_plugins():
+    """A plugin that cannot be imported raises ImportError naming the operation."""
+    registry = PluginRegistry({'broken': 'extra_plugins_missing.nothing_plugin'})
+    with pytest.raises(ImportError, match="Failed to load plugin: broken"):
+        registry['broken']
+
+def test_lazy_discovery_waits_for_the_first_lookup(tmp_path):
+    """A lazy registry reads the manifest on first use; builtins still take precedence."""
+    path = tmp_path / "manifest.json"
+    registry = PluginRegistry.discover(builtins={'add': AddCommand}, manifest_path=str(path), lazy=True)
+    assert not path.exists(), "Creating the registry should not touch the manifest"
+    assert 'factorial' in registry and path.exists()
+    assert registry['add'] is AddCommand
+
+def test_find_command_reports_why_an_operation_is_unknown():
+    """Missing operations and broken plugins both come back as error messages."""
+    registry = PluginRegistry({'add': AddCommand, 'broken': 'extra_plugins_missing.nothing_plugin'})
+    assert find_command(registry, 'add') == (AddCommand, None)
+    assert find_command(registry, 'modulus') == (None, "Unknown operation: modulus")
+    command_class, error = find_command(registry, 'broken')
+    assert command_class is None
+    assert error.startswith("Unknown operation: broken (Failed to load plugin: broken: No module named")
+
+def test_calculator_creates_discovered_commands(tmp_path):
+    """Calculator.create_command falls back to discovered plugins."""
+    calc = Calculator()
+    registry = calc.discover_plugins(str(tmp_path / "manifest.json"))
+    assert 'multiply' in registry
+    assert calc.create_command('multiply', 3, 4).execute() == 12
@@ -0,0 +1,78 @@
+from decimal import Decimal, localcontext
+import pytest
+from calculator.expression import (APPLY, CONST, LOAD, compile_expression, evaluate, tokenize)
+from calculator.operations import add, divide, multiply
+
+@pytest.mark.parametrize("text, value", [
+    ("1 + 2 * 3", Decimal('7')),
+    ("(1 + 2) * 3", Decimal('9')),
+    ("10 / 4", Decimal('2.5')),
+    ("8 - 3 - 2", Decimal('3')),
+    ("-2 * -3", Decimal('6')),
+    ("+.5 + 1.5e1", Decimal('15.5')),
+])
+def test_evaluate_constants(text, value):
+    """Arithmetic follows the usual precedence and associativity."""
+    assert evaluate(text) == value
+
+def test_evaluate_with_variables():
+    """Variables are bound from a mapping or keyword arguments."""
+    assert evaluate("(a + b) * c / 2", a=1, b=2, c=4) == Decimal('6')
+    assert evaluate("x * x", {'x': '1.5'}) == Decimal('2.25')
+
+def test_constant_folding():
+    """Constant sub-expressions are computed at compile time."""
+    compiled = compile_expression("a * (2 + 3) / 10")
+    assert compiled.instructions == (
+        (LOAD, 'a'), (CONST, Decimal('5')), (APPLY, multiply),
+        (CONST, Decimal('10')), (APPLY, divide))
+    assert compile_expression("2 * (3 + 4)").is_constant
+    assert compiled.variables == ('a',)
+
+def test_compiled_expression_is_cached():
+    """The same text compiles only once."""
+    assert compile_expression("a + b + 1") is compile_expression("a + b + 1")
+
+def test_folded_constants_follow_the_decimal_context():
+    """An expression compiled at one precision is not reused at another."""
+    assert len(str(evaluate("x * (1/3)", x=1))) == 30
+    with localcontext() as context:
+        context.prec = 50
+        assert evaluate("x * (1/3)", x=1) == Decimal(1) / Decimal(3), "The folded 1/3 should have 50 digits"
+    assert len(str(evaluate("x * (1/3)", x=1))) == 30
+
+def test_evaluate_many():
+    """One compiled expression evaluates many sets of bindings."""
+    compiled = compile_expression("a + b")
+    assert compiled.instructions[-1] == (APPLY, add)
+    assert list(compiled.evaluate_many({'a': i, 'b': 1} for i in range(3))) == [1, 2, 3]
+
+def test_division_by_zero_is_not_folded():
+    """Folding leaves division by zero to be raised at evaluation time."""
+    compiled = compile_expression("1 / 0")
+    assert not compiled.is_constant
+    with pytest.raises(ValueError, match="Cannot divide by zero"):
+        compiled.evaluate()
+
+@pytest.mark.parametrize("text, message", [
+    ("", "empty expression"),
+    ("1 +", "unexpected end"),
+    ("(1 + 2", "missing '\\)'"),
+    ("1 2", "unexpected '2'"),
+    ("2 ^ 3", "unexpected character '\\^'"),
+    (")", "unexpected '\\)'"),
+])
+def test_invalid_expressions(text, message):
+    """Malformed expressions raise ValueError."""
+    with pytest.raises(ValueError, match=message):
+        compile_expression(text)
+
+def test_missing_variable():
+    """Evaluating without a required variable raises ValueError."""
+    with pytest.raises(ValueError, match="Missing value for variable: b"):
+        evaluate("a + b", a=1)
+
+def test_tokenize():
+    """Numbers, names and symbols are tokenized."""
+    assert tokenize("x1*(2.5)") == [('name', 'x1'), ('sym', '*'), ('sym', '('),
+                                     ('num', '2.5'), ('sym', ')')]
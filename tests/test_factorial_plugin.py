@@ -0,0 +1,25 @@
+import math
+from decimal import Decimal
+import pytest
+from calculator.plugins.factorial_plugin import FactorialCommand, register
+
+def test_factorial_command():
+    """Small factorials come from the table and large ones are exact."""
+    assert FactorialCommand(5).execute() == 120, "FactorialCommand execute method failed"
+    assert FactorialCommand(Decimal('0')).execute() == Decimal('1')
+    assert FactorialCommand(1000).execute() == math.factorial(1000)
+
+def test_factorial_command_errors():
+    """Negative, fractional and oversized arguments raise ValueError."""
+    with pytest.raises(ValueError, match="Factorial is not defined for negative numbers."):
+        FactorialCommand(-1).execute()
+    with pytest.raises(ValueError, match="must be an integer"):
+        FactorialCommand(Decimal('2.5')).execute()
+    with pytest.raises(ValueError, match="exceeds the limit of 20000"):
+        FactorialCommand(10 ** 6).execute()
+    with pytest.raises(ValueError, match="size in bits exceeds the limit of 15"):
+        FactorialCommand(Decimal('1e50000000')).execute()  # Refused before converting to int
+
+def test_factorial_command_register():
+    """Test the register function for FactorialCommand"""
+    assert register() == FactorialCommand, "FactorialCommand register function failed"
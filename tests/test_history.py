@@ -0,0 +1,115 @@
+from decimal import Decimal
+import pytest
+from calculator.calculation import Calculation
+from calculator.commands import AddCommand
+from calculator.history import (RingBuffer, HistoryView, OperationIndex, ShardedAppendBuffer,
+                                DropOldest, SpillToDisk,
+                                make_eviction_policy, operation_name)
+from calculator.operations import multiply
+from calculator.plugins.factorial_plugin import FactorialCommand
+
+def test_ring_buffer_unbounded():
+    """Without a capacity the buffer never evicts."""
+    buffer = RingBuffer()
+    assert all(buffer.append(i) is None for i in range(100))
+    assert len(buffer) == 100 and buffer[0] == 0 and buffer[-1] == 99
+
+def test_ring_buffer_evicts_oldest():
+    """A bounded buffer returns the evicted item and keeps insertion order."""
+    buffer = RingBuffer(3)
+    evicted = [buffer.append(i) for i in range(5)]
+    assert evicted == [None, None, None, 0, 1]
+    assert list(buffer) == [2, 3, 4]
+    assert buffer[0] == 2 and buffer[-1] == 4
+    with pytest.raises(IndexError):
+        buffer[3]
+
+def test_ring_buffer_rejects_invalid_capacity():
+    """Capacity must be positive."""
+    with pytest.raises(ValueError, match="capacity must be a positive integer"):
+        RingBuffer(0)
+
+def test_history_view_is_read_only_and_live():
+    """The view reflects new items and cannot be modified."""
+    buffer = RingBuffer(2)
+    view = HistoryView(buffer)
+    buffer.append('a')
+    buffer.append('b')
+    buffer.append('c')
+    assert list(view) == ['b', 'c'] and view[-1] == 'c' and view[0:1] == ['b']
+    with pytest.raises(TypeError):
+        view[0] = 'x'
+    assert not hasattr(view, 'append')
+
+def test_operation_name():
+    """Calculations and Commands both resolve to an operation name."""
+    assert operation_name(Calculation(Decimal('1'), Decimal('2'), multiply)) == 'multiply'
+    assert operation_name(AddCommand(1, 2)) == 'add'
+
+def test_spill_to_disk(tmp_path):
+    """Evicted entries are appended to the spill file and can be read back."""
+    policy = SpillToDisk(str(tmp_path / "spill.jsonl"))
+    policy.evict(AddCommand(Decimal('1.5'), Decimal('2')))
+    policy.evict(FactorialCommand(5))
+    assert list(policy.read()) == [{'operation': 'add', 'arity': 2, 'operands': ['1.5', '2']},
+                                   {'operation': 'factorial', 'arity': 1, 'operands': ['5']}]
+    policy.close()
+
+def test_spill_read_without_file(tmp_path):
+    """Reading a spill file that was never written yields nothing."""
+    assert list(SpillToDisk(str(tmp_path / "missing.jsonl")).read()) == []
+
+def test_make_eviction_policy():
+    """Eviction policies are created by name."""
+    assert isinstance(make_eviction_policy('drop_oldest'), DropOldest)
+    with pytest.raises(ValueError, match="spill eviction requires a spill_path"):
+        make_eviction_policy('spill')
+    with pytest.raises(ValueError, match="Unknown eviction policy: lru"):
+        make_eviction_policy('lru')
+
+def test_operation_index_counts_and_slices():
+    """The index tracks counts and slices per operation."""
+    index = OperationIndex()
+    for seq, name in enumerate(['add', 'divide', 'add', 'add']):
+        index.add(name, seq, float(seq))
+    assert index.count('add') == 3 and index.count('divide') == 1 and index.count('pow') == 0
+    assert index.seqs('add') == [0, 2, 3]
+    assert index.seqs('add', -2) == [2, 3]
+    assert index.seqs_between('add', 1.0, 2.5) == [2]
+    index.evict('add')
+    assert index.seqs('add') == [2, 3]
+    index.evict_before(3)
+    assert index.operations() == ['add'] and index.seqs('add') == [3]
+
+def test_operation_index_compacts_after_many_evictions():
+    """Evicting many entries keeps lookups correct after compaction."""
+    index = OperationIndex()
+    for seq in range(200):
+        index.add('add', seq, float(seq))
+    for _ in range(150):
+        index.evict('add')
+    assert index.count('add') == 50
+    assert index.seqs('add', 0, 2) == [150, 151]
+    assert index.seqs_between('add', 198.0, 1000.0) == [198, 199]
+
+def test_ring_buffer_get_by_seq():
+    """Items can be fetched by their sequence number until evicted."""
+    buffer = RingBuffer(2)
+    for item in 'abc':
+        buffer.append(item)
+    assert buffer.first_seq == 1 and buffer.get_by_seq(2) == 'c'
+    with pytest.raises(IndexError, match="history entry 0 has been evicted"):
+        buffer.get_by_seq(0)
+
+def test_sharded_buffer_merges_in_sequence_order():
+    """Items queued by several threads drain in the order they were appended."""
+    import threading
+    buffer = ShardedAppendBuffer()
+    buffer.append('main-0')
+    worker = threading.Thread(target=lambda: [buffer.append(f'worker-{i}') for i in range(3)])
+    worker.start()
+    worker.join()
+    buffer.append('main-1')
+    assert len(buffer) == 5
+    assert list(buffer.drain()) == ['main-0', 'worker-0', 'worker-1', 'worker-2', 'main-1']
+    assert list(buffer.drain()) == [] and len(buffer) == 0
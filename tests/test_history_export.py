@@ -0,0 +1,91 @@
+import math
+from decimal import Decimal
+import pytest
+from calculator.calculation import Calculation
+from calculator.commands import AddCommand, DivideCommand
+from calculator.history_export import MAGIC, export_entries, import_entries
+from calculator.operations import add, multiply
+from calculator.plugins.factorial_plugin import FactorialCommand
+from calculator.plugins.modpow_plugin import ModPowCommand
+from calculator.reduction import SumCommand
+
+ENTRIES = [
+    Calculation(Decimal('1.50'), Decimal('-2'), add),
+    AddCommand(3, 2 ** 80),  # Too large for a packed column; stored as an object
+    DivideCommand(0.1, True),
+    Calculation(Decimal('NaN'), Decimal('1E+300'), multiply),
+]
+
+def describe(entry):
+    """Operation, types and values of an entry, without executing it."""
+    kind = entry.operation if isinstance(entry, Calculation) else type(entry)
+    return kind, type(entry.a), str(entry.a), type(entry.b), str(entry.b)
+
+@pytest.mark.parametrize("fmt", ["binary", "csv"])
+def test_export_round_trip(tmp_path, fmt):
+    """Entries come back with their operation, operand types and exact values."""
+    path = tmp_path / f"history.{fmt}"
+    assert export_entries(iter(ENTRIES * 3), str(path), fmt, chunk_size=5) == 12
+    assert [describe(entry) for entry in import_entries(str(path))] == [describe(entry) for entry in ENTRIES * 3]
+
+def test_binary_export_is_compact(tmp_path):
+    """Packed operands take a fixed-width column slot, not text."""
+    path = tmp_path / "history.bin"
+    export_entries((Calculation(Decimal(value), Decimal('0.5'), add) for value in range(10000)), str(path))
+    assert path.read_bytes().startswith(MAGIC)
+    assert path.stat().st_size < 10000 * 25, "Each entry should take about 24 bytes"
+
+def test_export_errors(tmp_path):
+    """Unknown formats and damaged files raise ValueError."""
+    with pytest.raises(ValueError, match="Unknown export format: xml"):
+        export_entries([], str(tmp_path / "history.xml"), 'xml')
+    path = tmp_path / "history.bin"
+    export_entries(ENTRIES, str(path))
+    path.write_bytes(path.read_bytes()[:-3])
+    with pytest.raises(ValueError, match="Truncated history export"):
+        list(import_entries(str(path)))
+    (tmp_path / "other.csv").write_text("op,a,b\n")
+    with pytest.raises(ValueError, match="Not a history CSV export"):
+        list(import_entries(str(tmp_path / "other.csv")))
+
+@pytest.mark.parametrize("target", ["builtins:print", "calculator.registry:Operation",
+                                    "calculator.commands:operand_names", "calculator.operations:add"])
+def test_import_refuses_untrusted_references(tmp_path, capsys, target):
+    """Only registered operations and command classes are resolved from an import."""
+    path = tmp_path / "history.csv"
+    path.write_text(f"operation,kind,target,result,arity,operands\nx,K,{target},,2,I111,I222\n")
+    with pytest.raises(ValueError, match="untrusted history reference"):
+        list(import_entries(str(path)))
+    assert capsys.readouterr().out == "", "Nothing named by the file should have been called"
+
+@pytest.mark.parametrize("fmt", ["binary", "csv"])
+def test_export_round_trip_any_arity(tmp_path, fmt):
+    """Unary, ternary and reduction commands keep every operand."""
+    entries = [FactorialCommand(5), ModPowCommand(3, 2 ** 70, Decimal('7')), AddCommand(1, 2),
+               SumCommand([Decimal('1.5'), 2], 64), FactorialCommand(Decimal('4'))]
+    path = tmp_path / f"history.{fmt}"
+    assert export_entries(entries, str(path), fmt, chunk_size=3) == 5
+    restored = list(import_entries(str(path)))
+    assert [type(entry) for entry in restored] == [type(entry) for entry in entries]
+    assert [entry.result for entry in restored] == [120, pow(3, 2 ** 70, 7), 3, Decimal('3.5'), 24]
+    assert restored[1].modulus == Decimal('7') and type(restored[4].a) is Decimal
+    assert restored[3].values == [Decimal('1.5'), 2] and restored[3].chunk_size == 64
+
+@pytest.mark.parametrize("fmt", ["binary", "csv"])
+def test_export_keeps_command_results(tmp_path, fmt, monkeypatch):
+    """Stored results are exported and restored, so importing does not execute commands again."""
+    entries = [AddCommand(Decimal('1'), Decimal('2')), FactorialCommand(30), DivideCommand(1, 3),
+               AddCommand(2, 2)]
+    for entry in entries[:3]:
+        entry.result  # Computed, as for commands in the history; the last one never ran
+    path = tmp_path / f"history.{fmt}"
+    export_entries(entries, str(path), fmt)
+
+    def refuse(self):
+        raise AssertionError("Imported commands should not execute")
+    monkeypatch.setattr(AddCommand, 'execute', refuse)
+    monkeypatch.setattr(FactorialCommand, 'execute', refuse)
+    monkeypatch.setattr(DivideCommand, 'execute', refuse)
+    restored = list(import_entries(str(path)))
+    assert [entry.result for entry in restored[:3]] == [Decimal('3'), math.factorial(30), 1 / 3]
+    assert not hasattr(restored[3], '_result'), "Entries without a result are restored without one"
@@ -0,0 +1,118 @@
+import os
+from decimal import Decimal
+import pytest
+from calculator.calculation import Calculation
+from calculator.commands import AddCommand, DivideCommand
+from calculator.history_log import HistoryLog, decode_entry, encode_entry
+from calculator.operations import add, multiply
+from calculator.plugins.factorial_plugin import FactorialCommand
+from calculator.plugins.modpow_plugin import ModPowCommand
+
+@pytest.fixture
+def log_path(tmp_path):
+    return str(tmp_path / "history.log")
+
+def test_encode_decode_round_trip():
+    """Calculations and Commands keep their operation and operand types."""
+    calc = decode_entry(encode_entry(Calculation(Decimal('1.50'), 2, add)))
+    assert calc.operation is add and calc.a == Decimal('1.50') and calc.b == 2
+    command = decode_entry(encode_entry(DivideCommand(0.1, True)))
+    assert isinstance(command, DivideCommand) and command.a == 0.1 and command.b is True
+
+def test_encode_decode_any_arity():
+    """Records carry an arity, so unary and ternary commands keep every operand."""
+    unary = decode_entry(encode_entry(FactorialCommand(Decimal('5'))))
+    assert isinstance(unary, FactorialCommand) and unary.a == Decimal('5') and unary.result == 120
+    ternary = decode_entry(encode_entry(ModPowCommand(3, 4, 5)))
+    assert (ternary.a, ternary.b, ternary.modulus) == (3, 4, 5), "All three operands should be restored"
+    with pytest.raises(ValueError, match="expected 3"):
+        decode_entry(encode_entry(ModPowCommand(3, 4, 5))[:-3])
+
+def test_encode_rejects_unknown_operand_types():
+    """Only numeric operands can be logged."""
+    with pytest.raises(TypeError, match="Cannot log operand of type str"):
+        encode_entry(AddCommand('1', 2))
+
+def test_decode_refuses_untrusted_references():
+    """A record naming anything but an operation or command class is rejected, not called."""
+    with pytest.raises(ValueError, match="untrusted history reference: builtins:print"):
+        decode_entry(b'\x1f'.join([b'x', b'K', b'builtins:print', b'2', b'I1', b'I2']))
+    with pytest.raises(ValueError, match="untrusted history reference: calculator.commands:AddCommand"):
+        decode_entry(b'\x1f'.join([b'add', b'C', b'calculator.commands:AddCommand', b'2', b'I1', b'I2']))
+
+def test_log_persists_across_reopen(log_path):
+    """Entries written before closing are available after reopening."""
+    with HistoryLog(log_path, sync_every=2) as log:
+        for value in range(5):
+            log.append(AddCommand(Decimal(value), Decimal('1')))
+        assert log[4].a == Decimal('4')  # Readable before the log is closed
+    with HistoryLog(log_path) as log:
+        assert len(log) == 5
+        assert [entry.a for entry in log] == [Decimal(value) for value in range(5)]
+        assert [entry.a for entry in log.tail(2)] == [Decimal('3'), Decimal('4')]
+
+def test_log_queries_without_decoding(log_path):
+    """Operations can be counted and filtered from the raw payloads."""
+    with HistoryLog(log_path) as log:
+        log.append(Calculation(Decimal('2'), Decimal('3'), multiply))
+        log.append(AddCommand(1, 2))
+        log.append(Calculation(Decimal('4'), Decimal('5'), multiply))
+        assert log.count_operation('multiply') == 2
+        assert [calc.a for calc in log.find_by_operation('multiply')] == [Decimal('2'), Decimal('4')]
+        assert log.raw(1).startswith(b'add\x1f')
+
+def test_log_recovers_torn_tail(log_path):
+    """A partially written final record is truncated on open."""
+    with HistoryLog(log_path) as log:
+        log.append(AddCommand(1, 2))
+        log.append(AddCommand(3, 4))
+    with open(log_path, 'r+b') as log_file:
+        log_file.seek(-3, 2)
+        log_file.truncate()
+    with HistoryLog(log_path) as log:
+        assert len(log) == 1
+        log.append(AddCommand(5, 6))
+    with HistoryLog(log_path) as log:
+        assert [entry.a for entry in log] == [1, 5]
+
+def test_log_checks_every_record_crc(log_path):
+    """A record corrupted before the tail is caught on read, replay and compaction."""
+    with HistoryLog(log_path) as log:
+        for value in range(3):
+            log.append(AddCommand(value, 7))
+    data = bytearray(open(log_path, 'rb').read())
+    data[data.index(b'I7')] = ord('D')  # Still decodes, but the first record's CRC no longer matches
+    open(log_path, 'wb').write(bytes(data))
+    with HistoryLog(log_path) as log:
+        assert len(log) == 3, "Opening only scans the headers"
+        assert [entry.a for entry in log.tail(2)] == [1, 2]
+        with pytest.raises(ValueError, match="Corrupt history log record at byte 8"):
+            list(log.tail(3))
+        with pytest.raises(ValueError, match="Corrupt history log record"):
+            list(log)
+        with pytest.raises(ValueError, match="Corrupt history log record"):
+            log.compact()  # Rewriting would give the corrupt payload a valid CRC
+        assert log.count_operation('add') == 3
+    assert os.listdir(os.path.dirname(log_path)) == ['history.log'], "The compaction file is removed"
+
+def test_log_clear_and_compact(log_path):
+    """Clear markers hide earlier entries and compaction drops them from disk."""
+    with HistoryLog(log_path) as log:
+        log.append(AddCommand(1, 1))
+        log.clear()
+        for value in range(4):
+            log.append(AddCommand(value, 0))
+    with HistoryLog(log_path) as log:
+        assert [entry.a for entry in log] == [0, 1, 2, 3]
+        log.compact(keep_last=2)
+        assert [entry.a for entry in log] == [2, 3]
+        log.append(AddCommand(9, 9))
+    with HistoryLog(log_path) as log:
+        assert [entry.a for entry in log] == [2, 3, 9]
+
+def test_log_rejects_foreign_files(log_path):
+    """Files without the log header are refused."""
+    with open(log_path, 'wb') as log_file:
+        log_file.write(b'not a log')
+    with pytest.raises(ValueError, match="Not a history log"):
+        HistoryLog(log_path)
@@ -0,0 +1,40 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+# Cold-start budget for `import main`, in milliseconds. Generous so a loaded CI machine passes;
+# set CALCULATOR_IMPORT_BUDGET_MS to tighten or loosen it
+IMPORT_BUDGET_MS = float(os.environ.get('CALCULATOR_IMPORT_BUDGET_MS', '500'))
+# Modules that `import main` leaves to the code paths that use them. Checked by name as well as
+# timed, so a regression shows up even on a machine fast enough to stay within the budget
+HEAVY_MODULES = ('numpy', 'mmap', 'asyncio', 'multiprocessing', 'concurrent.futures',
+                 'calculator.history_log', 'calculator.shared_batch', 'calculator.server',
+                 'calculator.batch', 'calculator.cache', 'calculator.dag', 'calculator.metrics',
+                 'calculator.pool', 'calculator.reduction')
+
+def import_time_ms(module: str) -> float:
+    """Cumulative import time of a module in a fresh interpreter, from -X importtime."""
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                               cwd=ROOT, capture_output=True, text=True, check=True)
+    for line in completed.stderr.splitlines():
+        fields = [field.strip() for field in line.split('|')]
+        if len(fields) == 3 and fields[2] == module:
+            return int(fields[1]) / 1000  # Reported in microseconds
+    raise AssertionError(f"{module} missing from -X importtime output")
+
+@pytest.mark.slow
+def test_main_import_time_budget():
+    """Importing main stays within the cold-start budget (best of three runs)."""
+    best = min(import_time_ms('main') for _ in range(3))
+    assert best <= IMPORT_BUDGET_MS, f"import main took {best:.1f} ms, budget is {IMPORT_BUDGET_MS} ms"
+
+def test_main_defers_heavy_imports():
+    """NumPy, mmap, the event loop, process pools and optional features are only imported when used."""
+    script = f'import json, sys, main; print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))'
+    completed = subprocess.run([sys.executable, '-c', script], cwd=ROOT, capture_output=True, text=True,
+                               check=True)
+    assert json.loads(completed.stdout) == [], f"Imported at startup: {completed.stdout.strip()}"
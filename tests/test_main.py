@@ -1,6 +1,14 @@
+import io
+import os
+import pstats
+import subprocess
+import sys
+import tracemalloc
 import pytest
 from decimal import Decimal
-from main import calculate_and_store, display_menu, prompt_for_numbers, interactive_calculator
+from calculator.commands import AddCommand
+from calculator.discovery import PluginRegistry
+from main import calculate_and_store, display_menu, prompt_for_numbers, interactive_calculator, run_batch, main
 
 @pytest.mark.parametrize("a_string, b_string, operation_string, expected_string", [
     ("5", "3", 'add', "The result of add between 5 and 3 is 8"),
@@ -74,3 +82,155 @@ def test_unknown_command(capsys):
     calculate_and_store("10", "5", "modulus")
     captured = capsys.readouterr().out.strip()
     assert "Unknown operation: modulus" in captured
+
+# Tests for batch mode
+def test_run_batch_from_file(tmp_path):
+    """run_batch reads a file of records and writes CSV results."""
+    source = tmp_path / "ops.csv"
+    source.write_text("add,1,2\ndivide,1,0\nmultiply,3,4\n")
+    output = tmp_path / "results.csv"
+    assert run_batch(str(source), str(output), 'csv') == 3
+    lines = output.read_text().splitlines()
+    assert lines[0] == "op,operands,result,error"
+    assert lines[1] == "add,1 2,3,"
+    assert lines[2] == "divide,1 0,,Cannot divide by zero."
+    assert lines[3] == "multiply,3 4,12,"
+
+def test_run_batch_closes_input_when_output_fails(tmp_path, monkeypatch):
+    """A failure to open the output file does not leak the opened input file."""
+    source = tmp_path / "ops.csv"
+    source.write_text("add,1,2\n")
+    opened = []
+    real_open = open
+
+    def tracking_open(path, *args, **kwargs):
+        stream = real_open(path, *args, **kwargs)
+        opened.append(stream)
+        return stream
+    monkeypatch.setattr("builtins.open", tracking_open)
+    with pytest.raises(OSError):
+        run_batch(str(source), str(tmp_path / "missing" / "results.csv"))
+    assert len(opened) == 1 and opened[0].closed, "The input file should be closed"
+
+def test_run_batch_unary_and_ternary_plugins(tmp_path):
+    """Batch records carry as many operands as their operation takes."""
+    source = tmp_path / "ops.csv"
+    source.write_text("factorial,5\nmodpow,2,10,1000\nfactorial,5,0\nmodpow,2,10\n")
+    output = tmp_path / "results.csv"
+    assert run_batch(str(source), str(output)) == 4
+    assert output.read_text().splitlines()[1:] == [
+        "factorial,5,120,", "modpow,2 10 1000,24,",
+        "factorial,5 0,,Malformed record: expected 'factorial' and 1 operand",
+        "modpow,2 10,,Malformed record: expected 'modpow' and 3 operands"]
+
+def test_main_batch_from_stdin(monkeypatch, capsys):
+    """main --batch without a path reads records from stdin."""
+    monkeypatch.setattr("sys.stdin", io.StringIO('{"op": "subtract", "a": "10", "b": "4"}\n'))
+    main(["--batch", "--format", "jsonl"])
+    captured = capsys.readouterr().out
+    assert '"result": "6"' in captured
+
+def test_main_without_batch_runs_interactive(monkeypatch, capsys):
+    """main without --batch starts the interactive calculator."""
+    inputs = iter(["exit"])
+    monkeypatch.setattr("builtins.input", lambda _: next(inputs))
+    main([])
+    assert "Goodbye!" in capsys.readouterr().out
+
+def test_calculate_and_store_with_backends(capsys):
+    """calculate_and_store converts operands with the selected backend."""
+    calculate_and_store("7", "2", "divide", "float")
+    assert "The result of divide between 7 and 2 is 3.5" in capsys.readouterr().out
+    calculate_and_store("1", "3", "divide", "decimal:3")
+    assert "is 0.333" in capsys.readouterr().out
+    calculate_and_store("1.5", "2", "add", "int")
+    assert "Invalid number input: 1.5 or 2 is not a valid number." in capsys.readouterr().out
+
+def test_run_batch_with_precision(tmp_path):
+    """Batch mode evaluates records under the backend's precision."""
+    source = tmp_path / "ops.csv"
+    source.write_text("divide,2,3\n")
+    output = tmp_path / "results.csv"
+    run_batch(str(source), str(output), 'csv', 'decimal:4')
+    assert output.read_text().splitlines()[1] == "divide,2 3,0.6667,"
+
+def test_main_profile_interactive(monkeypatch, capsys, tmp_path):
+    """--profile writes pstats, tracemalloc and text reports for the session."""
+    inputs = iter(["add", "2", "3", "exit"])
+    monkeypatch.setattr("builtins.input", lambda _: next(inputs))
+    prefix = str(tmp_path / "profiles" / "session")
+    main(["--profile", prefix])
+    captured = capsys.readouterr()
+    assert "Goodbye!" in captured.out
+    assert f"{prefix}.pstats" in captured.err, "The report locations should be printed"
+    assert pstats.Stats(f"{prefix}.pstats").total_calls > 0
+    assert tracemalloc.Snapshot.load(f"{prefix}.tracemalloc").traces is not None
+    report = (tmp_path / "profiles" / "session.txt").read_text()
+    assert "functions by cumulative time" in report and "allocation sites" in report
+    assert "entries:" in report and "(+1)" in report, "The history should have grown by one entry"
+
+def test_interactive_calculator_prompts_for_operation_arity(monkeypatch, capsys):
+    """Operations are prompted for as many operands as their registry entry declares."""
+    inputs = iter(["factorial", "5", "modpow", "2", "10", "1000", "exit"])
+    monkeypatch.setattr("builtins.input", lambda _: next(inputs))
+    interactive_calculator()
+    captured = capsys.readouterr().out
+    assert "The result of factorial of 5 is 120" in captured
+    assert "The result of modpow between 2, 10 and 1000 is 24" in captured
+
+def test_serve_passes_the_backend(monkeypatch):
+    """--serve hands --backend to the server."""
+    calls = []
+    monkeypatch.setattr("main.run_server", lambda *args: calls.append(args))
+    main(["--serve", "127.0.0.1:0", "--offload", "divide", "--backend", "decimal:50"])
+    (address, offload, backend), = calls
+    assert (address, offload, backend.precision) == ("127.0.0.1:0", ["divide"], 50)
+
+@pytest.mark.parametrize("spec, message", [
+    ("decimal:abc", "Invalid decimal precision: abc"), ("complex", "Unknown numeric backend: complex"),
+    ("decimal:50:round_sideways", "Unknown rounding mode: ROUND_SIDEWAYS"),
+])
+def test_invalid_backend_is_a_usage_error(capsys, spec, message):
+    """--backend is validated while parsing arguments, before any prompt or batch work."""
+    with pytest.raises(SystemExit) as exit_info:
+        main(["--batch", "--backend", spec])
+    assert exit_info.value.code == 2
+    assert f"argument --backend: {message}" in capsys.readouterr().err
+
+def test_run_batch_int_backend_divides_exactly(tmp_path):
+    """With the int backend, division gives exact ints and inexact quotients are errors."""
+    source = tmp_path / "ops.csv"
+    source.write_text(f"divide,8,2\ndivide,7,2\ndivide,{3 * 10 ** 40 + 3},3\n")
+    output = tmp_path / "results.csv"
+    run_batch(str(source), str(output), 'csv', 'int')
+    assert output.read_text().splitlines()[1:] == [
+        "divide,8 2,4,", "divide,7 2,,7 / 2 is not a whole number; use the float or decimal backend.",
+        f"divide,{3 * 10 ** 40 + 3} 3,{10 ** 40 + 1},"]
+
+def test_import_does_not_discover_plugins(tmp_path):
+    """Importing main neither reads nor writes the plugin manifest; the first lookup does."""
+    manifest = tmp_path / "manifest.json"
+    script = (f"import os, main; print(os.path.exists({str(manifest)!r}), "
+              f"'add' in main.operation_mappings, os.path.exists({str(manifest)!r}))")
+    completed = subprocess.run([sys.executable, '-c', script], cwd=os.path.dirname(os.path.dirname(__file__)),
+                               env={**os.environ, 'CALCULATOR_PLUGIN_MANIFEST': str(manifest)},
+                               capture_output=True, text=True, check=True)
+    assert completed.stdout.split() == ['False', 'True', 'True']
+
+def test_broken_plugin_is_an_unknown_operation(monkeypatch, capsys, tmp_path):
+    """A plugin that fails to import is reported, not raised, in the CLI and batch mode."""
+    registry = PluginRegistry({'add': AddCommand, 'broken': 'extra_plugins_missing.nothing_plugin'})
+    monkeypatch.setattr("main.operation_mappings", registry)
+    inputs = iter(["broken", "add", "1", "2", "exit"])
+    monkeypatch.setattr("builtins.input", lambda _: next(inputs))
+    interactive_calculator()
+    captured = capsys.readouterr().out
+    assert "Unknown operation: broken (Failed to load plugin: broken: No module named" in captured
+    assert "The result of add between 1 and 2 is 3" in captured, "The session should keep going"
+    calculate_and_store("1", "2", "broken")
+    assert "Unknown operation: broken" in capsys.readouterr().out
+    source, output = tmp_path / "ops.csv", tmp_path / "results.csv"
+    source.write_text("broken,1,2\nadd,1,2\n")
+    assert run_batch(str(source), str(output)) == 2
+    rows = output.read_text().splitlines()
+    assert rows[1].startswith("broken,1 2,,Unknown operation: broken") and rows[2] == "add,1 2,3,"
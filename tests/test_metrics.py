@@ -0,0 +1,50 @@
+import json
+import pytest
+from calculator.metrics import Histogram, Metrics, bucket_index, bucket_upper_bound
+
+def test_buckets_are_contiguous_and_bounded():
+    """Every duration lands in a bucket whose upper bound is within about 12%."""
+    previous = -1
+    for nanoseconds in list(range(0, 200)) + [10 ** 3, 10 ** 6, 123456789]:
+        index = bucket_index(nanoseconds)
+        upper = bucket_upper_bound(index)
+        assert nanoseconds <= upper <= nanoseconds * 1.125 + 1
+        assert index >= previous
+        previous = index
+
+def test_histogram_percentiles():
+    """Percentiles come from the bucket counts."""
+    histogram = Histogram()
+    for microseconds in range(1, 101):
+        histogram.record(microseconds * 1e-6)
+    assert histogram.count == 100
+    assert histogram.percentile(50) == pytest.approx(50e-6, rel=0.13)
+    assert histogram.percentile(99) == pytest.approx(99e-6, rel=0.13)
+    assert histogram.percentile(100) == pytest.approx(100e-6)
+    assert Histogram().percentile(50) == 0.0
+
+def test_metrics_snapshot_and_json():
+    """Snapshots contain counters, errors and latency summaries."""
+    metrics = Metrics()
+    metrics.record('add', 'compute', 2e-6)
+    metrics.record('divide', 'compute', 3e-6, error=True)
+    metrics.count('add', 'pool_map', 5)
+    snapshot = json.loads(metrics.to_json())
+    assert snapshot['add/compute']['commands'] == 1
+    assert snapshot['divide/compute']['errors'] == 1
+    assert snapshot['add/pool_map'] == {'operation': 'add', 'path': 'pool_map', 'commands': 5,
+                                        'errors': 0, 'latency': None}
+    metrics.reset()
+    assert metrics.snapshot() == {}
+
+def test_metrics_prometheus_export():
+    """The Prometheus export has counters and cumulative histogram buckets."""
+    metrics = Metrics()
+    metrics.record('add', 'compute', 2e-6)
+    metrics.record('add', 'compute', 2e-3)
+    text = metrics.to_prometheus()
+    assert 'calculator_commands_total{operation="add",path="compute"} 2' in text
+    assert '# TYPE calculator_command_duration_seconds histogram' in text
+    assert 'calculator_command_duration_seconds_bucket{operation="add",path="compute",le="5e-06"} 1' in text
+    assert 'calculator_command_duration_seconds_bucket{operation="add",path="compute",le="+Inf"} 2' in text
+    assert 'calculator_command_duration_seconds_count{operation="add",path="compute"} 2' in text
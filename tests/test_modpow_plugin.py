@@ -0,0 +1,30 @@
+from decimal import Decimal
+import pytest
+from calculator.plugins.modpow_plugin import ModPowCommand, register
+
+def test_modpow_command():
+    """Modular exponentiation matches pow() and keeps Decimal operands Decimal."""
+    assert ModPowCommand(4, 13, 497).execute() == 445, "ModPowCommand execute method failed"
+    assert ModPowCommand(Decimal('2'), Decimal(10 ** 18), Decimal('1000000007')).execute() == \
+        Decimal(pow(2, 10 ** 18, 1000000007))
+    assert ModPowCommand(3, -1, 7).execute() == 5, "Negative exponents use the modular inverse"
+
+def test_modpow_command_errors():
+    """Zero moduli, fractional operands and oversized moduli raise ValueError."""
+    with pytest.raises(ValueError, match="Modulus must not be zero."):
+        ModPowCommand(2, 3, 0).execute()
+    with pytest.raises(ValueError, match="Exponent must be an integer"):
+        ModPowCommand(2, Decimal('1.5'), 7).execute()
+    with pytest.raises(ValueError, match="Modulus size in bits exceeds the limit"):
+        ModPowCommand(2, 3, 1 << 200000).execute()
+    # Huge Decimals are refused before they are converted to int
+    with pytest.raises(ValueError, match="Exponent size in bits exceeds the limit"):
+        ModPowCommand(2, Decimal('1e50000000'), 7).execute()
+    with pytest.raises(ValueError, match="Modulus size in bits exceeds the limit"):
+        ModPowCommand(2, 3, Decimal('1e50000000')).execute()
+    with pytest.raises(ValueError, match="Base size in bits exceeds the limit"):
+        ModPowCommand(Decimal('1e50000000'), 3, 7).execute()
+
+def test_modpow_command_register():
+    """Test the register function for ModPowCommand"""
+    assert register() == ModPowCommand, "ModPowCommand register function failed"
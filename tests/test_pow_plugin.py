@@ -0,0 +1,31 @@
+import decimal
+from decimal import Decimal
+import pytest
+from calculator.plugins.pow_plugin import PowCommand, register
+
+def test_pow_command_integers():
+    """Integer powers are exact."""
+    assert PowCommand(3, 40).execute() == 3 ** 40, "PowCommand integer power failed"
+    assert PowCommand(2, -2).execute() == 0.25
+
+def test_pow_command_decimal():
+    """Decimal powers are squared with guard digits and rounded once to the context."""
+    with decimal.localcontext() as context:
+        context.prec = 50
+        assert PowCommand(Decimal('2'), Decimal('100')).execute() == Decimal(2 ** 100)
+    assert PowCommand(Decimal('1.0001'), Decimal('10000')).execute() == Decimal('1.0001') ** 10000
+    assert PowCommand(Decimal('4'), Decimal('-1')).execute() == Decimal('0.25')
+    assert PowCommand(Decimal('4'), Decimal('0.5')).execute() == Decimal('2'), "Fractional exponents should work"
+
+def test_pow_command_limit():
+    """Integer results beyond the configured size are refused before any work is done."""
+    with pytest.raises(ValueError, match="exceeds the limit"):
+        PowCommand(10, 10 ** 9).execute()
+    with pytest.raises(ValueError, match="Exponent size in bits exceeds the limit of 64"):
+        PowCommand(Decimal('2'), Decimal('1e50000000')).execute()  # Refused before converting to int
+    with pytest.raises(ValueError, match="Exponent size in bits exceeds the limit of 64"):
+        PowCommand(1, 2 ** 64).execute()
+
+def test_pow_command_register():
+    """Test the register function for PowCommand"""
+    assert register() == PowCommand, "PowCommand register function failed"
@@ -0,0 +1,59 @@
+import math
+from array import array
+from decimal import Decimal
+import pytest
+from calculator.calculator import Calculator
+from calculator.history import operation_name
+from calculator.metrics import Metrics
+from calculator.reduction import (MaxCommand, MinCommand, ProductCommand, SumCommand,
+                                  iter_chunks, pairwise_sum)
+
+def test_sum_is_compensated():
+    """Float sums are correctly rounded, unlike a running total."""
+    values = [0.1] * 10000
+    assert SumCommand(values, chunk_size=128).execute() == math.fsum(values)
+    assert SumCommand([1e100, 1.0, -1e100]).execute() == 1.0, "Cancellation should not lose the small term"
+
+def test_pairwise_sum_of_decimals():
+    """Decimal sums are split recursively and keep their type."""
+    values = [Decimal('0.1')] * 1000
+    assert pairwise_sum(values) == Decimal('100.0')
+    assert SumCommand(values, chunk_size=7).execute() == Decimal('100.0')
+
+def test_reductions_over_a_stream():
+    """Generators are read chunk by chunk and every reduction agrees with the builtins."""
+    assert SumCommand((value for value in range(100001)), chunk_size=1000).execute() == 5000050000
+    assert ProductCommand(iter(range(1, 21)), chunk_size=3).execute() == math.factorial(20)
+    assert MinCommand(iter([5, -2, 9]), chunk_size=2).execute() == -2
+    assert MaxCommand(iter([5, -2, 9]), chunk_size=2).execute() == 9
+
+def test_empty_reductions():
+    """Sum and product have identities; min and max of nothing are errors."""
+    assert SumCommand([]).execute() == 0
+    assert ProductCommand(iter(())).execute() == 1
+    with pytest.raises(ValueError, match="Cannot take the min of an empty sequence."):
+        MinCommand([]).execute()
+
+def test_iter_chunks_buffers():
+    """Buffers are sliced into picklable arrays of the same type."""
+    chunks = list(iter_chunks(memoryview(array('d', [1.0, 2.0, 3.0])), 2))
+    assert [chunk.tolist() for chunk in chunks] == [[1.0, 2.0], [3.0]]
+    assert all(isinstance(chunk, array) and chunk.typecode == 'd' for chunk in chunks)
+    with pytest.raises(ValueError, match="chunk_size must be at least 1"):
+        list(iter_chunks([1], 0))
+
+def test_reduction_command_names_and_repr():
+    """Reduction commands are named after their operation in history and metrics."""
+    command = SumCommand([1, 2, 3])
+    assert operation_name(command) == 'sum'
+    assert repr(command) == "Sum = 6"
+
+def test_calculator_reduce_in_parallel():
+    """Chunks reduce on worker processes and the partial results are combined."""
+    with Calculator(max_workers=2, metrics=Metrics(), cache_size=8) as calc:
+        command = SumCommand(array('d', [0.5] * 50000), chunk_size=4096)
+        assert calc.reduce(command) == 25000.0
+        assert command.result == 25000.0, "The result should be stored on the command"
+        assert calc.reduce(MaxCommand(iter(range(30000)), chunk_size=1000)) == 29999
+        assert calc.metrics.snapshot()['sum/pool_reduce']['commands'] == 1
+        assert calc.compute(ProductCommand([2, 3, 4])) == 24, "Reductions bypass the result cache"
@@ -0,0 +1,70 @@
+import operator
+import pickle
+from array import array
+from decimal import Decimal
+import pytest
+from calculator import operations
+from calculator.batch import compute_batch
+from calculator.calculation import Calculation
+from calculator.commands import AddCommand, DivideCommand, operation_arity
+from calculator.plugins import divide_plugin
+from calculator.plugins.factorial_plugin import FactorialCommand
+from calculator.plugins.modpow_plugin import ModPowCommand
+from calculator.registry import REGISTRY, Operation, OperationRegistry
+
+def test_builtin_operations_are_registered():
+    """The operations module, commands and plugins share the registry's operations."""
+    for name in ('add', 'subtract', 'multiply', 'divide'):
+        operation = REGISTRY[name]
+        assert operation.arity == 2, f"{name} should take two operands"
+        assert getattr(operations, name) is operation, f"operations.{name} should be the registered operation"
+        assert operation.__module__ == 'calculator.operations', "References should resolve through calculator.operations"
+    assert DivideCommand.operation is divide_plugin.DivideCommand.operation is REGISTRY['divide']
+
+def test_divide_by_zero_is_the_same_error_everywhere():
+    """Every scalar entry point raises the registry's ValueError for a zero divisor."""
+    attempts = [lambda: operations.divide(1, 0), lambda: DivideCommand(1, 0).execute(),
+                lambda: divide_plugin.DivideCommand(1, 0).execute(),
+                lambda: Calculation(Decimal('1'), Decimal('0'), operations.divide).perform()]
+    for attempt in attempts:
+        with pytest.raises(ValueError) as error:
+            attempt()
+        assert str(error.value) == "Cannot divide by zero.", "Messages should match across entry points"
+
+def test_set_kernels_reaches_every_entry_point():
+    """A kernel swapped in the registry is used by direct calls and calculations alike."""
+    registry = OperationRegistry()
+    operation = registry.register(Operation('halve', 2, operator.truediv, invalid=lambda x, y: y == 0))
+    registry.set_kernels('halve', scalar=operator.floordiv)
+    assert operation(7, 2) == 3, "The call should use the new scalar kernel"
+    assert Calculation(7, 2, operation).perform() == 3, "Calculations should use the new scalar kernel"
+    with pytest.raises(ValueError, match="Invalid operands for halve."):
+        operation(7, 0)
+    with pytest.raises(ValueError, match="Unknown kernel"):
+        registry.set_kernels('halve', invalid=None)
+    with pytest.raises(ValueError, match="already registered"):
+        registry.register(Operation('halve', 2, operator.truediv))
+
+def test_batch_masks_invalid_operands_of_registered_operations():
+    """Operations without a batch kernel still mask operands their check rejects."""
+    operation = REGISTRY.register(Operation('checked_subtract', 2, operator.sub,
+                                            invalid=lambda x, y: y < 0, module=__name__))
+    try:
+        result = compute_batch('checked_subtract', array('q', [5, 5, 5]), array('q', [1, -1, 2]))
+        assert list(result.values) == [4, 0, 3], "Masked results should be zero"
+        assert list(result.mask) == [0, 1, 0], "The negative operand should be masked"
+    finally:
+        REGISTRY._operations.pop(operation.name)
+
+def test_operations_pickle_by_name():
+    """Calculations sent to worker processes keep the registered operation."""
+    calculation = pickle.loads(pickle.dumps(Calculation(Decimal('1'), Decimal('4'), operations.divide)))
+    assert calculation.operation is operations.divide, "Unpickling should return the registered operation"
+    assert pickle.loads(pickle.dumps(ModPowCommand.operation)) is ModPowCommand.operation
+
+def test_operation_arity():
+    """Command classes report how many operands their operation takes."""
+    assert operation_arity(AddCommand) == 2
+    assert operation_arity(FactorialCommand) == 1
+    assert operation_arity(ModPowCommand) == 3
+    assert FactorialCommand(5).execute() == 120, "Plugin commands should dispatch through their operation"
@@ -0,0 +1,154 @@
+import asyncio
+import pytest
+from calculator.calculator import Calculator
+from calculator.commands import AddCommand, DivideCommand, MultiplyCommand
+from calculator.discovery import PluginRegistry
+from calculator.plugins.factorial_plugin import FactorialCommand
+from calculator.plugins.modpow_plugin import ModPowCommand
+from calculator.server import CalculatorServer, send_requests
+
+mappings = {'add': AddCommand, 'multiply': MultiplyCommand, 'divide': DivideCommand,
+            'factorial': FactorialCommand, 'modpow': ModPowCommand}
+
+def run_with_server(client, **options):
+    """Start a server on a free port, run the client coroutine against it and shut down."""
+    async def scenario():
+        server = CalculatorServer(mappings, **options)
+        await server.start(port=0)
+        try:
+            return await client(server)
+        finally:
+            await server.close()
+    return asyncio.run(scenario())
+
+def test_pipelined_requests_are_answered_in_order():
+    """Several requests on one connection are answered in the order sent."""
+    lines = ["add 1 2", "divide 1 0", "multiply 3 x", "modulus 1 2", "add 1", "divide 9 3"]
+    responses = run_with_server(lambda server: send_requests(lines, port=server.address[1]))
+    assert responses == [
+        "OK 3",
+        "ERR Cannot divide by zero.",
+        "ERR Invalid number input: 3 or x is not a valid number.",
+        "ERR Unknown operation: modulus",
+        "ERR Malformed request: expected 'add' and 2 operands",
+        "OK 3",
+    ]
+
+def test_broken_plugin_is_an_unknown_operation():
+    """A plugin that fails to import is answered with an error and the connection keeps going."""
+    registry = PluginRegistry({'add': AddCommand, 'broken': 'extra_plugins_missing.nothing_plugin'})
+
+    async def scenario():
+        server = CalculatorServer(registry)
+        await server.start(port=0)
+        try:
+            return await send_requests(["broken 1 2", "add 1 2"], port=server.address[1])
+        finally:
+            await server.close()
+    responses = asyncio.run(scenario())
+    assert responses[0].startswith("ERR Unknown operation: broken (Failed to load plugin: broken")
+    assert responses[1] == "OK 3"
+
+def test_requests_take_the_operation_arity():
+    """Unary and ternary operations read one and three operands."""
+    lines = ["factorial 5", "modpow 3 4 5", "modpow 3 4", "factorial 1 2", "modpow 3 x 5"]
+    responses = run_with_server(lambda server: send_requests(lines, port=server.address[1]))
+    assert responses == [
+        "OK 120",
+        "OK 1",
+        "ERR Malformed request: expected 'modpow' and 3 operands",
+        "ERR Malformed request: expected 'factorial' and 1 operand",
+        "ERR Invalid number input: 3 or x or 5 is not a valid number.",
+    ]
+
+class ResetWriter:
+    """A stream writer whose client has reset the connection."""
+
+    def __init__(self):
+        self.closed = False
+
+    def write(self, data):
+        pass
+
+    async def drain(self):
+        raise ConnectionResetError("Connection reset by peer")
+
+    def close(self):
+        self.closed = True
+
+def test_failed_writer_ends_the_connection():
+    """A writer that dies stops the reader instead of leaving it blocked on the pipeline."""
+    async def scenario():
+        server = CalculatorServer(mappings, max_pending=1)
+        reader, writer = asyncio.StreamReader(), ResetWriter()
+        reader.feed_data(b"add 1 2\n" * 10)  # No EOF: the client never stops sending
+        try:
+            await asyncio.wait_for(server.handle_connection(reader, writer), timeout=5)
+        finally:
+            await server.close()
+        return writer.closed
+    assert asyncio.run(scenario()), "The transport should be closed"
+
+def test_concurrent_clients():
+    """Many clients are served at the same time."""
+    async def clients(server):
+        port = server.address[1]
+        requests = [[f"add {i} {j}" for j in range(20)] for i in range(10)]
+        return await asyncio.gather(*(send_requests(lines, port=port) for lines in requests))
+    results = run_with_server(clients)
+    assert results[3][5] == "OK 8"
+    assert all(len(responses) == 20 for responses in results)
+
+def test_backpressure_with_small_pipeline():
+    """A pipeline bound smaller than the request count still answers everything."""
+    lines = [f"multiply {i} 2" for i in range(200)]
+    responses = run_with_server(lambda server: send_requests(lines, port=server.address[1]),
+                                max_pending=2)
+    assert responses[-1] == "OK 398" and len(responses) == 200
+
+def test_offloaded_operations_use_worker_pool():
+    """Offloaded operations run on the process pool and still report errors."""
+    calculator = Calculator(max_workers=1, start_method='fork')
+    responses = run_with_server(
+        lambda server: send_requests(["divide 10 4", "divide 1 0"], port=server.address[1]),
+        calculator=calculator, offload=['divide'])
+    assert responses == ["OK 2.5", "ERR Cannot divide by zero."]
+
+def test_unix_socket(tmp_path):
+    """The server can listen on a Unix socket."""
+    path = str(tmp_path / "calc.sock")
+
+    async def scenario():
+        server = CalculatorServer(mappings)
+        await server.start(path=path)
+        try:
+            return await send_requests(["add 2 2"], path=path)
+        finally:
+            await server.close()
+    assert asyncio.run(scenario()) == ["OK 4"]
+
+def test_quit_closes_connection():
+    """`quit` ends the connection after pending answers are written."""
+    async def client(server):
+        reader, writer = await asyncio.open_connection('127.0.0.1', server.address[1])
+        writer.write(b"add 1 1\n\nquit\nadd 2 2\n")
+        data = await reader.read()
+        writer.close()
+        return data
+    assert run_with_server(client) == b"OK 2\n"
+
+def test_invalid_max_pending():
+    """The pipeline bound must be positive."""
+    with pytest.raises(ValueError, match="max_pending must be at least 1"):
+        CalculatorServer(mappings, max_pending=0)
+
+def test_backend_precision_applies_to_every_request():
+    """The server's backend sets the precision inline and on the worker pool."""
+    calculator = Calculator(max_workers=1, start_method='fork', backend='decimal:50')
+    responses = run_with_server(
+        lambda server: send_requests(["divide 1 3", "add 1 3"], port=server.address[1]),
+        calculator=calculator, offload=['divide'], backend='decimal:50')
+    assert responses == ["OK 0." + "3" * 50, "OK 4"]
+    responses = run_with_server(lambda server: send_requests(["divide 2 3"], port=server.address[1]),
+                                backend='decimal:40')
+    assert responses == ["OK 0." + "6" * 39 + "7"]
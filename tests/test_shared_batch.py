@@ -0,0 +1,117 @@
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from multiprocessing import shared_memory
+import pytest
+from calculator.batch import compute_batch
+from calculator.calculator import Calculator
+from calculator.metrics import Metrics
+from calculator.registry import REGISTRY
+from calculator.shared_batch import SharedBatch, operand_typecode, slice_bounds
+
+def test_slice_bounds_cover_the_range():
+    """Slices are contiguous, cover every element and respect the minimum size."""
+    assert slice_bounds(10, 3, min_size=1) == [(0, 4), (4, 8), (8, 10)]
+    assert slice_bounds(10, 8, min_size=5) == [(0, 5), (5, 10)], "Slices should not shrink below min_size"
+    assert slice_bounds(0, 4) == []
+
+def test_operand_typecode():
+    """Integers map to int64, floats to double, anything else is rejected."""
+    assert operand_typecode([1, 2, 3]) == 'q'
+    assert operand_typecode([1, 2.5]) == 'd'
+    assert operand_typecode(array('i', [1])) == 'q'
+    with pytest.raises(ValueError, match="int or float operands"):
+        operand_typecode([Decimal('1')])
+
+def test_shared_batch_computes_in_place():
+    """Slices computed by separate workers land in the shared result block."""
+    with SharedBatch.from_operands([1.0, 2.0, 3.0, 4.0], [4.0, 0.0, 2.0, 1.0]) as batch, \
+            ThreadPoolExecutor(2) as executor:
+        # Threads attach to the blocks by name exactly like worker processes do
+        result = batch.compute('divide', executor, parts=2)
+        assert isinstance(result.values, memoryview), "Results should be read without copying"
+        assert result.values.tolist() == [0.25, 0.0, 1.5, 4.0]
+        assert result.mask.tolist() == [0, 1, 0, 0], "Mask should flag the zero divisor"
+        assert result.error_count == 1
+
+def test_shared_batch_filled_in_place():
+    """Operands can be written straight into the shared blocks."""
+    with SharedBatch(3, 'q', 'q') as batch, ThreadPoolExecutor(1) as executor:
+        batch.a[:] = array('q', [1, 2, 3])
+        batch.b[:] = array('q', [10, 20, 30])
+        result = batch.compute('multiply', executor)
+        assert result.values.format == 'q', "Integer operands should give integer results"
+        assert result.values.tolist() == [10, 40, 90]
+
+def test_shared_batch_errors():
+    """Unknown operations and mismatched lengths raise ValueError."""
+    with pytest.raises(ValueError, match="differ in length"):
+        SharedBatch.from_operands([1], [1, 2])
+    with SharedBatch.from_operands([1], [2]) as batch, ThreadPoolExecutor(1) as executor:
+        with pytest.raises(ValueError, match="Unknown operation: modulus"):
+            batch.compute('modulus', executor)
+
+def test_calculator_compute_batch_shared():
+    """Worker processes compute the batch through shared memory, bypassing history."""
+    with Calculator(max_workers=2, metrics=Metrics()) as calc:
+        with calc.compute_batch_shared('add', list(range(10000)), [1] * 10000) as batch:
+            assert batch.result.values.tolist() == list(range(1, 10001))
+            assert batch.result.error_count == 0
+        assert calc.history == [], "Batch computations should not be stored in history"
+        assert calc.metrics.snapshot()['add/shared_batch']['commands'] == 10000
+
+def assert_unlinked(names):
+    """Every named shared memory block has been freed."""
+    for name in names:
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
+
+def test_shared_batch_worker_error_reaches_caller(monkeypatch):
+    """A kernel error in a worker is raised unchanged and the shared blocks are still freed."""
+    def failing(x, y):
+        raise ArithmeticError("kernel failed")
+    scalar = REGISTRY['subtract'].scalar
+    REGISTRY.set_kernels('subtract', scalar=failing)
+    try:
+        with ThreadPoolExecutor(1) as executor:
+            batch = SharedBatch.from_operands([1] * 3, [4] * 3)
+            names = batch.names
+            with pytest.raises(ArithmeticError, match="kernel failed"):  # Not a BufferError from closing
+                batch.compute('subtract', executor)
+            batch.close()
+        assert_unlinked(names)
+
+        created = []
+        from_operands = SharedBatch.from_operands.__func__
+
+        def recording_from_operands(cls, a, b):
+            batch = from_operands(cls, a, b)
+            created.append(batch.names)
+            return batch
+        monkeypatch.setattr(SharedBatch, 'from_operands', classmethod(recording_from_operands))
+        with Calculator(max_workers=1, start_method='fork') as calc:  # Forked workers see the failing kernel
+            with pytest.raises(ArithmeticError, match="kernel failed"):
+                calc.compute_batch_shared('subtract', [1] * 3, [4] * 3)
+        assert_unlinked(created[0])
+    finally:
+        REGISTRY.set_kernels('subtract', scalar=scalar)
+
+def test_shared_batch_int64_overflow_gives_exact_ints():
+    """Results beyond int64 come back as exact ints, matching compute_batch."""
+    a, b = [2 ** 62, 3, -2 ** 62], [4, 5, 4]
+    with SharedBatch.from_operands(a, b) as batch, ThreadPoolExecutor(2) as executor:
+        result = batch.compute('multiply', executor)
+        assert list(result.values) == [2 ** 64, 15, -2 ** 64]
+        assert list(result.values) == list(compute_batch('multiply', array('q', a), array('q', b)).values)
+        assert result.error_count == 0
+    with Calculator(max_workers=1) as calc:
+        with calc.compute_batch_shared('add', [2 ** 63 - 1] * 5000, [1] * 5000) as batch:
+            assert batch.result.values == [2 ** 63] * 5000
+
+def test_shared_batch_rejects_operands_beyond_int64():
+    """Unsigned and Python ints that int64 cannot hold are refused instead of overflowing on copy."""
+    with pytest.raises(ValueError, match="fit in int64"):
+        SharedBatch.from_operands(array('Q', [2 ** 64 - 1]), array('Q', [1]))
+    with pytest.raises(ValueError, match="fit in int64"):
+        SharedBatch.from_operands([2 ** 70], [1])
+    assert operand_typecode(array('Q', [2 ** 63 - 1])) == 'q'
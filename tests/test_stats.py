@@ -0,0 +1,71 @@
+import random
+import statistics
+from decimal import Decimal
+import pytest
+from calculator.commands import DivideCommand
+from calculator.stats import SKIPPED, OperationStats, RunningStats, stats_value
+
+def test_running_stats_sliding_window():
+    """Adding and removing values keeps the aggregates of the current window exact."""
+    rng = random.Random(7)
+    values = [rng.uniform(-100, 100) for _ in range(500)]
+    stats = RunningStats()
+    for position, value in enumerate(values):
+        stats.add(value)
+        if position >= 50:
+            assert stats.remove_oldest() == values[position - 50], "The oldest value should leave first"
+        window = values[max(position - 49, 0):position + 1]
+        assert stats.count == len(window)
+        assert (stats.minimum, stats.maximum) == (min(window), max(window))
+    assert stats.mean == pytest.approx(statistics.fmean(window))
+    assert stats.variance == pytest.approx(statistics.pvariance(window))
+
+def test_running_stats_empty():
+    """An emptied window reports no extremes and cannot shrink further."""
+    stats = RunningStats()
+    stats.add(Decimal('2'))
+    stats.remove_oldest()
+    assert stats.summary() == {'count': 0, 'total': 0, 'mean': 0.0, 'min': None, 'max': None, 'variance': 0.0}
+    with pytest.raises(ValueError, match="no values to remove"):
+        stats.remove_oldest()
+
+def test_operation_stats_skips_failures():
+    """Entries whose command raises hold a place in the window but are never counted."""
+    stats = OperationStats()
+    stats.add('divide', stats_value(DivideCommand(Decimal('1'), Decimal('0'))))
+    stats.add('divide', stats_value(DivideCommand(Decimal('6'), Decimal('3'))))
+    assert stats.get('divide').count == 1
+    stats.evict('divide')
+    assert stats.get('divide').count == 1, "A failed entry was never counted"
+    stats.evict('divide')
+    assert stats.get('divide') is None and list(stats.operations()) == []
+
+def test_running_stats_values_beyond_float_range():
+    """Results too large for a float move the accumulators to Decimal instead of failing."""
+    stats = RunningStats()
+    for value in (3, 10 ** 400, 2 * 10 ** 400):
+        stats.add(value)
+    assert stats.total == 3 * 10 ** 400 + 3, "The total stays an exact int"
+    assert isinstance(stats.mean, Decimal) and stats.mean == Decimal('1E+400'), "Mean should not be inf"
+    assert stats.variance == pytest.approx(Decimal(2) / 3 * Decimal('1E+800'), rel=Decimal('1E-20'))
+    assert (stats.minimum, stats.maximum) == (3, 2 * 10 ** 400)
+    assert stats.remove_oldest() == 3
+    assert stats.mean == Decimal('1.5E+400')
+
+def test_stats_value_skips_non_finite_results():
+    """NaN and infinite results are not aggregated, so they cannot poison the mean."""
+    assert stats_value(DivideCommand(float('inf'), 1.0)) is SKIPPED
+    assert stats_value(DivideCommand(Decimal('NaN'), Decimal('1'))) is SKIPPED
+    assert stats_value(DivideCommand(Decimal('1E+400'), Decimal('1'))) == Decimal('1E+400')
+
+def test_running_stats_without_window():
+    """Without a window no values are kept, so only the aggregates and current extremes remain."""
+    stats = RunningStats(windowed=False)
+    for value in range(1000):
+        stats.add(value)
+    stats.add(SKIPPED)
+    assert (stats.count, len(stats), stats.total) == (1000, 1001, sum(range(1000)))
+    assert (stats.minimum, stats.maximum) == (0, 999)
+    assert len(stats._minima) == len(stats._maxima) == 1, "Only the current extremes are kept"
+    with pytest.raises(ValueError, match="values are not kept"):
+        stats.remove_oldest()
@@ -0,0 +1,80 @@
+import io
+import json
+import pytest
+from calculator.commands import AddCommand, DivideCommand
+from calculator.plugins.factorial_plugin import FactorialCommand
+from calculator.plugins.modpow_plugin import ModPowCommand
+from calculator.streaming import read_records, evaluate_records, write_results
+
+mappings = {'add': AddCommand, 'divide': DivideCommand, 'factorial': FactorialCommand, 'modpow': ModPowCommand}
+
+def test_read_records_csv_and_jsonl():
+    """CSV lines, JSON lines, headers and blank lines are all handled."""
+    stream = io.StringIO('op,a,b\nadd, 1, 2\n\n{"op": "Divide", "a": 4, "b": 2}\nbad line\n')
+    records = list(read_records(stream))
+    assert records == [('add', '1', '2'), ('divide', '4', '2'), (None, 'bad line')]
+
+def test_read_records_quoted_fields_and_crlf():
+    """CSV records follow the csv module: quoted fields, embedded commas and CRLF endings."""
+    stream = io.StringIO('op,a,b\r\nadd,"1",2\r\n"multiply", " 3 ",4\r\n"add,x",1,2\r\nadd,"1\n2",3\r\n"add,1',
+                         newline='')
+    assert list(read_records(stream)) == [
+        ('add', '1', '2'), ('multiply', '3', '4'), ('add,x', '1', '2'), ('add', '1\n2', '3'),
+        (None, '"add,1')]
+
+def test_read_records_is_lazy():
+    """Records are produced one at a time rather than read up front."""
+    records = read_records(iter(['add,1,2\n', 'add,3,4\n']))
+    assert next(records) == ('add', '1', '2')
+
+def test_read_records_any_number_of_operands():
+    """CSV and JSON records carry as many operands as they list."""
+    stream = io.StringIO('factorial,5\nmodpow,2,10,7\n{"op": "factorial", "a": 4}\n'
+                         '{"op": "modpow", "operands": [3, 4, 5]}\nadd\n{"op": "add", "operands": 1}\n')
+    assert list(read_records(stream)) == [
+        ('factorial', '5'), ('modpow', '2', '10', '7'), ('factorial', '4'), ('modpow', '3', '4', '5'),
+        (None, 'add'), (None, '{"op": "add", "operands": 1}')]
+
+def test_evaluate_records_reports_errors_inline():
+    """Per-record errors are yielded as rows instead of stopping the stream."""
+    records = [('add', '1', '2'), ('divide', '1', '0'), ('add', 'x', '1'),
+               ('modulus', '1', '2'), (None, 'oops'), ('divide', '9', '3')]
+    rows = list(evaluate_records(records, mappings))
+    assert rows[0] == ('add', ('1', '2'), '3', '')
+    assert rows[1][3] == "Cannot divide by zero."
+    assert rows[2][3] == "Invalid number input: x or 1 is not a valid number."
+    assert rows[3][3] == "Unknown operation: modulus"
+    assert rows[4][3] == "Malformed record: oops"
+    assert rows[5] == ('divide', ('9', '3'), '3', '')
+
+def test_evaluate_records_checks_operation_arity():
+    """Unary and ternary plugins run with their own operand counts; other counts are reported per row."""
+    records = [('factorial', '5'), ('modpow', '2', '10', '1000'), ('factorial', '5', '0'),
+               ('modpow', '2', '10'), ('add', '1')]
+    rows = list(evaluate_records(records, mappings))
+    assert rows[0] == ('factorial', ('5',), '120', '')
+    assert rows[1] == ('modpow', ('2', '10', '1000'), '24', '')
+    assert rows[2][3] == "Malformed record: expected 'factorial' and 1 operand"
+    assert rows[3][3] == "Malformed record: expected 'modpow' and 3 operands"
+    assert rows[4][3] == "Malformed record: expected 'add' and 2 operands"
+
+def test_write_results_csv():
+    """CSV output includes a header row and one row per result."""
+    out = io.StringIO()
+    count = write_results([('add', ('1', '2'), '3', ''), ('factorial', ('5',), '120', '')], out, 'csv')
+    assert count == 2
+    assert out.getvalue() == "op,operands,result,error\nadd,1 2,3,\nfactorial,5,120,\n"
+
+def test_write_results_jsonl_in_chunks():
+    """JSONL output is written in chunks and empty fields become null."""
+    out = io.StringIO()
+    rows = (('add', (str(i), '1'), str(i + 1), '') for i in range(10))
+    assert write_results(rows, out, 'jsonl', chunk_size=3) == 10
+    lines = out.getvalue().splitlines()
+    assert len(lines) == 10
+    assert json.loads(lines[-1]) == {'op': 'add', 'operands': ['9', '1'], 'result': '10', 'error': None}
+
+def test_write_results_unknown_format():
+    """Unsupported formats are rejected."""
+    with pytest.raises(ValueError, match="Unknown output format: xml"):
+        write_results([], io.StringIO(), 'xml')
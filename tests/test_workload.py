@@ -0,0 +1,59 @@
+import json
+from decimal import Decimal
+import pytest
+from calculator.commands import AddCommand, DivideCommand, MultiplyCommand, SubtractCommand
+from calculator.workload import OPERATIONS, WorkloadGenerator, main
+
+def test_same_seed_same_workload():
+    """A seed reproduces the workload exactly; chunking does not change it."""
+    first = list(WorkloadGenerator(42).records(1000, chunk_size=1000))
+    assert first == list(WorkloadGenerator(42).records(1000, chunk_size=1000))
+    assert first != list(WorkloadGenerator(43).records(1000, chunk_size=1000))
+
+def test_records_are_in_range():
+    """Operations come from the given set and operands have at most `digits` digits."""
+    generator = WorkloadGenerator(1, operations=('add', 'divide'), digits=3)
+    records = list(generator.records(5000, chunk_size=700))
+    assert len(records) == 5000
+    assert {op for op, _, _ in records} == {'add', 'divide'}
+    assert all(isinstance(value, Decimal) and 0 <= value < 1000 for _, x, y in records for value in (x, y))
+    assert not any(op == 'divide' and y == 0 for op, _, y in records), "Zero divisors should be replaced"
+
+def test_arrays_are_bulk_chunks():
+    """arrays() returns the operation names and int64 operand arrays of one chunk."""
+    names, a_values, b_values = WorkloadGenerator(0, digits=1).arrays(256)
+    assert len(names) == 256 and set(names) <= set(OPERATIONS)
+    assert a_values.typecode == b_values.typecode == 'q'
+    assert max(a_values) <= 9
+
+def test_streams_are_lazy():
+    """An unbounded stream only generates what is consumed."""
+    records = WorkloadGenerator(0).records(None, chunk_size=10)
+    assert len([next(records) for _ in range(25)]) == 25
+
+def test_lines_and_commands():
+    """Request lines match the batch and server formats, and commands are built lazily."""
+    generator = WorkloadGenerator(5)
+    op_name, a_text, b_text = next(generator.lines(1, 'csv')).split(',')
+    assert op_name in OPERATIONS and a_text.isdigit() and b_text.isdigit()
+    assert set(json.loads(next(generator.lines(1, 'jsonl')))) == {'op', 'a', 'b'}
+    assert len(next(generator.lines(1, 'server')).split()) == 3
+    with pytest.raises(ValueError, match="Unknown workload format: xml"):
+        generator.lines(1, 'xml')
+    mappings = {'add': AddCommand, 'subtract': SubtractCommand,
+                'multiply': MultiplyCommand, 'divide': DivideCommand}
+    assert all(command.execute() is not None for command in generator.commands(200, mappings))
+
+def test_workload_cli(capsys):
+    """The module writes reproducible request lines to stdout."""
+    main(['3', '--seed', '7', '--format', 'server'])
+    lines = capsys.readouterr().out.splitlines()
+    assert lines == list(WorkloadGenerator(7).lines(3, 'server'))
+
+@pytest.mark.parametrize("digits", ['0', '10', 'two'])
+def test_workload_cli_rejects_bad_digits(capsys, digits):
+    """Out-of-range or non-numeric --digits is a usage error, not a traceback."""
+    with pytest.raises(SystemExit) as excinfo:
+        main(['3', '--digits', digits])
+    assert excinfo.value.code == 2
+    assert "argument --digits" in capsys.readouterr().err